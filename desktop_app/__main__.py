@@ -1,4 +1,11 @@
 import sys
+
+# Configure start-up tracing before PyQt6 and friends are imported so that
+# module import times are captured.
+from .utils.startup import startup_timer
+
+startup_timer.configure(sys.argv)
+
 from .main import main
 
 if __name__ == '__main__':
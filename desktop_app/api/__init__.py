@@ -0,0 +1 @@
+"""Headless HTTP/JSON API for desktop_app (run with ``python -m desktop_app.api.server``)."""
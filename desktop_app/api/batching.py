@@ -0,0 +1,57 @@
+"""Request batching: lookups that arrive together share one query."""
+
+import asyncio
+
+
+class Batcher:
+    """Coalesce concurrent ``get(key)`` calls into one ``fetch(keys)``.
+
+    ``fetch`` is a coroutine function taking a list of distinct keys and
+    returning ``{key: value}``; keys it leaves out resolve to None. A batch
+    is sent ``window_ms`` after its first key, or at once when it reaches
+    ``max_size`` keys. Scanners at several kiosks thus cost one SQL round
+    trip per window instead of one per scan.
+    """
+
+    def __init__(self, fetch, window_ms: float = 2.0, max_size: int = 200):
+        self.fetch = fetch
+        self.window = window_ms / 1000.0
+        self.max_size = max_size
+        self.batches = 0
+        self.keys = 0
+        self._pending = {}
+        self._timer = None
+
+    async def get(self, key):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(key, []).append(future)
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            self.batches += 1
+            self.keys += len(pending)
+            asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending):
+        try:
+            found = await self.fetch(list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for key, futures in pending.items():
+            value = found.get(key)
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
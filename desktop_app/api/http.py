@@ -0,0 +1,95 @@
+"""Minimal HTTP/1.1 framing for the API server: JSON in, JSON out, keep-alive."""
+
+import asyncio
+import json
+from typing import Dict, NamedTuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+MAX_HEADER_LINES = 100
+MAX_BODY = 1024 * 1024
+KEEPALIVE_S = 30.0
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    """Ends a request with ``status`` and ``{"error": message}``."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except ValueError as e:
+            raise HttpError(400, f"Invalid JSON body: {e}")
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """The next request on the connection, or None once the client is done."""
+    try:
+        line = await asyncio.wait_for(reader.readline(), KEEPALIVE_S)
+    except asyncio.TimeoutError:
+        return None
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HttpError(400, "Too many headers")
+    if version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+        headers["connection"] = "close"
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length")
+    if length > MAX_BODY:
+        raise HttpError(413, f"Body larger than {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length > 0 else b""
+
+    url = urlsplit(target)
+    query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+    return Request(method.upper(), unquote(url.path), query, headers, body)
+
+
+def encode_response(status: int, payload, keep_alive: bool = True) -> bytes:
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + data
@@ -0,0 +1,343 @@
+"""Headless HTTP/JSON API for kiosks and order tablets: catalog, pricing, checkout.
+
+Usage:
+    python -m desktop_app.api.server [--host 127.0.0.1] [--port 8765] [--user admin]
+        [--workers N] [--token TOKEN] [--batch-window-ms 2]
+
+Endpoints (JSON bodies; amounts are strings in pesos, e.g. "12.50"):
+    GET  /health
+    GET  /products?q=&category_id=&limit=50   catalog search by name or SKU
+    GET  /products/sku/<sku>                   one product by SKU
+    POST /cart/price   {"items": [{"sku": ..., "qty": 2} | {"product_id": 5, "qty": 1}]}
+    POST /checkout     {"items": [...], "payment": {"method": "cash", "cash_received": "500"},
+                        "customer_name": ..., "customer_phone": ...}
+
+It runs the same services as the desktop app against the configured
+database. One asyncio loop parses requests; the SQL runs on --workers
+threads (default DB_POOL_SIZE), each with its own task session, so every
+thread can hold a pooled connection without waiting. SKU lookups that
+arrive within --batch-window-ms share one query. Sales are recorded
+under --user (POS_API_USER). With --token (POS_API_TOKEN) set, requests
+other than /health need "Authorization: Bearer <token>".
+"""
+
+import argparse
+import asyncio
+import hmac
+import os
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from ..controllers.database import DB_POOL_SIZE, init_db, session_scope
+from ..controllers.instrumentation import track_action
+from ..models import PAYMENT_METHODS, User
+from ..services import NotFound, OutOfStock, ServiceError
+from ..services import cart as cart_service
+from ..services import catalog
+from ..services import checkout as checkout_service
+from ..utils.helpers import PH_VAT_RATE_BP
+from ..utils.money import Money
+from .batching import Batcher
+from .http import HttpError, encode_response, read_request
+
+HOST = os.getenv('POS_API_HOST', '127.0.0.1')
+PORT = int(os.getenv('POS_API_PORT', '8765'))
+API_USER = os.getenv('POS_API_USER', 'admin')
+API_TOKEN = os.getenv('POS_API_TOKEN', '')
+
+SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 200
+
+
+def _money(amount: Money) -> str:
+    return str(amount.to_decimal())
+
+
+def product_json(row: catalog.ProductRow) -> dict:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "sku": row.sku,
+        "category_id": row.category_id,
+        "category": row.category_name,
+        "price": _money(row.price),
+        "stock": row.stock,
+        "is_service": row.is_service,
+        "vat_status": row.vat_status,
+    }
+
+
+def priced_json(priced: cart_service.PricedCart) -> dict:
+    summary = priced.summary
+    return {
+        "lines": [
+            {"product_id": line.product_id, "name": line.name, "price": _money(line.price),
+             "qty": line.qty, "total": _money(line.total), "vat_status": line.vat_status}
+            for line in priced.lines
+        ],
+        "vatable": _money(summary.vatable),
+        "vat": _money(summary.vat),
+        "exempt": _money(summary.exempt),
+        "zero_rated": _money(summary.zero_rated),
+        "total": _money(summary.total),
+    }
+
+
+def _price_checked(session, cart):
+    """``price_cart`` after the same stock checks the Sales screen makes."""
+    products = cart_service.cart_products(session, cart)
+    missing = set(cart) - {p.id for p in products}
+    if missing:
+        raise NotFound(f"Product #{min(missing)} no longer exists.")
+    for p in products:
+        cart_service.check_quantity(p, cart[p.id])
+    return cart_service.price_cart(session, cart, PH_VAT_RATE_BP)
+
+
+def _checkout(session, user_id, cart, payment, customer_name, customer_phone):
+    priced = _price_checked(session, cart)
+    if payment.cash_received is not None and payment.cash_received < priced.total:
+        raise ServiceError(f"Cash received is less than the total of {priced.total.format()}")
+    result = checkout_service.checkout(session, user_id, cart, payment, customer_name, customer_phone)
+    return priced, result
+
+
+def _body(request) -> dict:
+    body = request.json()
+    if not isinstance(body, dict):
+        raise HttpError(400, "The request body must be a JSON object")
+    return body
+
+
+def _payment(data) -> checkout_service.Payment:
+    if not isinstance(data, dict):
+        raise HttpError(400, "payment must be an object")
+    method = data.get("method", "cash")
+    if method not in PAYMENT_METHODS:
+        raise HttpError(400, f"payment.method must be one of {', '.join(PAYMENT_METHODS)}")
+    cash = data.get("cash_received")
+    if cash is not None and (isinstance(cash, bool) or not isinstance(cash, (int, float, str))):
+        raise HttpError(400, "payment.cash_received must be an amount")
+    try:
+        cash = Money.of(cash) if cash is not None and method == "cash" else None
+    except (ArithmeticError, ValueError):
+        # e.g. "NaN" or "Infinity"
+        raise HttpError(400, "payment.cash_received must be an amount")
+    return checkout_service.Payment(method, cash, (data.get("gcash_ref") or "").strip() or None)
+
+
+class ApiServer:
+    """Routes requests to the services; see the module docstring."""
+
+    def __init__(self, user_id: int, workers: int = DB_POOL_SIZE, token: str = API_TOKEN,
+                 batch_window_ms: float = 2.0, batch_max: int = 200):
+        self.user_id = user_id
+        self.token = token
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pos-api")
+        self.sku_batcher = Batcher(self._fetch_skus, batch_window_ms, batch_max)
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/products"): self.search,
+            ("POST", "/cart/price"): self.price,
+            ("POST", "/checkout"): self.checkout,
+        }
+        self._server = None
+        self._connections = {}
+
+    # -- plumbing ---------------------------------------------------------
+
+    async def run_db(self, fn, *args, commit: bool = False):
+        """``fn(session, *args)`` on a worker thread, in a task session."""
+        def task():
+            with track_action(f"api.{fn.__name__.lstrip('_')}"), session_scope(commit=commit) as session:
+                return fn(session, *args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, task)
+
+    async def _fetch_skus(self, skus):
+        return await self.run_db(catalog.products_by_sku, skus)
+
+    def _authorized(self, request) -> bool:
+        if not self.token or request.path == "/health":
+            return True
+        given = request.headers.get("authorization", "")
+        return hmac.compare_digest(given.encode(), f"Bearer {self.token}".encode())
+
+    async def dispatch(self, request):
+        if not self._authorized(request):
+            raise HttpError(401, "Missing or wrong API token")
+        if request.path.startswith("/products/sku/"):
+            handler = self.by_sku if request.method == "GET" else None
+        else:
+            handler = self.routes.get((request.method, request.path))
+            if handler is None and any(path == request.path for _, path in self.routes):
+                raise HttpError(405, f"{request.method} not allowed on {request.path}")
+        if handler is None:
+            raise HttpError(404, f"No such endpoint: {request.method} {request.path}")
+        try:
+            return await handler(request)
+        except NotFound as e:
+            raise HttpError(404, str(e))
+        except OutOfStock as e:
+            raise HttpError(409, str(e))
+        except ServiceError as e:
+            raise HttpError(422, str(e))
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                keep_alive, request = True, None
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.headers.get("connection", "").lower() != "close"
+                    status, payload = 200, await self.dispatch(request)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    # A request we couldn't parse leaves the stream out of step
+                    keep_alive = keep_alive and request is not None
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    traceback.print_exc()
+                    print(f"API error: {e}")
+                    status, payload = 500, {"error": "Internal server error"}
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _cart(self, items):
+        """``{product_id: qty}`` from request items, SKUs resolved in a batch."""
+        if not isinstance(items, list) or not items:
+            raise HttpError(400, "items must be a non-empty list")
+        for item in items:
+            qty = item.get("qty", 1) if isinstance(item, dict) else None
+            if not isinstance(qty, int) or isinstance(qty, bool) or qty <= 0:
+                raise HttpError(400, "each item needs a positive integer qty")
+            if not isinstance(item.get("product_id"), int) and not item.get("sku"):
+                raise HttpError(400, "each item needs a product_id or a sku")
+        skus = [str(item["sku"]) for item in items if not isinstance(item.get("product_id"), int)]
+        rows = dict(zip(skus, await asyncio.gather(*(self.sku_batcher.get(sku) for sku in skus))))
+        cart = {}
+        for item in items:
+            pid = item.get("product_id")
+            if not isinstance(pid, int):
+                row = rows[str(item["sku"])]
+                if row is None:
+                    raise HttpError(404, f"Unknown SKU {item['sku']}")
+                pid = row.id
+            cart[pid] = cart.get(pid, 0) + item.get("qty", 1)
+        return cart
+
+    # -- endpoints --------------------------------------------------------
+
+    async def health(self, request):
+        return {"status": "ok", "sku_batches": self.sku_batcher.batches, "sku_lookups": self.sku_batcher.keys}
+
+    async def search(self, request):
+        try:
+            limit = min(int(request.query.get("limit", SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+            category_id = int(request.query["category_id"]) if request.query.get("category_id") else None
+        except ValueError:
+            raise HttpError(400, "limit and category_id must be integers")
+        if limit < 1:
+            raise HttpError(400, "limit must be at least 1")
+        rows = await self.run_db(catalog.search_products, request.query.get("q", ""), category_id, True, limit)
+        return {"products": [product_json(row) for row in rows]}
+
+    async def by_sku(self, request):
+        sku = request.path[len("/products/sku/"):]
+        row = await self.sku_batcher.get(sku) if sku else None
+        if row is None:
+            raise HttpError(404, f"Unknown SKU {sku}")
+        return product_json(row)
+
+    async def price(self, request):
+        cart = await self._cart(_body(request).get("items"))
+        return priced_json(await self.run_db(_price_checked, cart))
+
+    async def checkout(self, request):
+        body = _body(request)
+        for field in ("customer_name", "customer_phone"):
+            if not isinstance(body.get(field), (str, type(None))):
+                raise HttpError(400, f"{field} must be a string or null")
+        cart = await self._cart(body.get("items"))
+        payment = _payment(body.get("payment") or {})
+        # checkout() commits its own unit of work
+        priced, result = await self.run_db(_checkout, self.user_id, cart, payment,
+                                           body.get("customer_name"), body.get("customer_phone"))
+        return {
+            **priced_json(priced),
+            "transaction_id": result.transaction_id,
+            "change": _money(result.change) if result.change is not None else None,
+            "created_at": result.created_at.isoformat() if result.created_at else None,
+        }
+
+    # -- lifecycle --------------------------------------------------------
+
+    async def start(self, host: str = HOST, port: int = PORT):
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        # Idle keep-alive connections see EOF and end their handlers
+        for writer in list(self._connections.values()):
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+
+def resolve_user(username: str):
+    with session_scope(commit=False) as session:
+        user = session.query(User).filter_by(username=username).first()
+        return user.id if user else None
+
+
+async def serve(host: str, port: int, server: ApiServer):
+    listener = await server.start(host, port)
+    print(f"POS API listening on http://{host}:{port}", file=sys.stderr)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--user", default=API_USER, help="username sales are recorded under")
+    parser.add_argument("--workers", type=int, default=DB_POOL_SIZE, help="database threads (default DB_POOL_SIZE)")
+    parser.add_argument("--token", default=API_TOKEN, help="require this bearer token")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0, help="how long SKU lookups wait to share a query")
+    args = parser.parse_args(argv)
+
+    init_db()
+    user_id = resolve_user(args.user)
+    if user_id is None:
+        print(f"No user named {args.user!r}; pass --user or set POS_API_USER", file=sys.stderr)
+        return 2
+    server = ApiServer(user_id, args.workers, args.token, args.batch_window_ms)
+    try:
+        asyncio.run(serve(args.host, args.port, server))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
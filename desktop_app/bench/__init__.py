@@ -0,0 +1 @@
+"""Command-line benchmarks for desktop_app (run with ``python -m desktop_app.bench.<name>``)."""
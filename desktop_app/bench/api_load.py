@@ -0,0 +1,254 @@
+"""Load-test the API server: p50/p99 latency per endpoint under concurrent clients.
+
+Usage:
+    python -m desktop_app.bench.api_load [--url http://127.0.0.1:8765] [--token T]
+        [--concurrency 16] [--duration 10] [--checkout-share 0.05]
+        [--scale 0.01] [--seed N] [--data-dir DIR] [--workers N] [--json PATH]
+
+Without --url, the seeded dataset that ``bench.screens`` caches in --data-dir
+is copied to a temp dir, and a server (``desktop_app.api.server``) is started
+on it for the duration of the run. Each client keeps one connection open and
+sends a weighted mix of requests:
+- SKU lookups (half of the mix);
+- catalog searches;
+- cart pricing;
+- card checkouts (--checkout-share).
+Latency is measured from sending a request to reading the end of its
+response. Statuses of 500 and above and broken connections count as errors.
+A 409 on checkout means that product sold out, which is expected on small
+datasets.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+from ..utils.helpers import project_root
+from .screens import _commit, dataset
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class _Client:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port, token=""):
+        self.host, self.port = host, port
+        self.auth = f"Authorization: Bearer {token}\r\n" if token else ""
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n{self.auth}"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = json.loads(await self.reader.readexactly(length)) if length else None
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class _Results:
+    def __init__(self):
+        self.samples = {}
+        self.statuses = {}
+        self.errors = 0
+
+    def add(self, endpoint, ms, status):
+        self.samples.setdefault(endpoint, []).append(ms)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+        if status >= 500:
+            self.errors += 1
+
+    def summary(self, elapsed):
+        rows = []
+        for endpoint, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            rows.append({
+                "endpoint": endpoint,
+                "requests": len(ordered),
+                "p50_ms": round(_percentile(ordered, 0.50), 2),
+                "p99_ms": round(_percentile(ordered, 0.99), 2),
+                "max_ms": round(ordered[-1], 2),
+                "statuses": {str(k): v for k, v in sorted(self.statuses[endpoint].items())},
+            })
+        everything = sorted(ms for samples in self.samples.values() for ms in samples)
+        return {
+            "seconds": round(elapsed, 2),
+            "requests": len(everything),
+            "rps": round(len(everything) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(_percentile(everything, 0.50), 2),
+            "p99_ms": round(_percentile(everything, 0.99), 2),
+            "errors": self.errors,
+            "endpoints": rows,
+        }
+
+
+async def _catalog(host, port, token):
+    client = _Client(host, port, token)
+    try:
+        status, payload = await client.request("GET", "/products?limit=200")
+    finally:
+        client.close()
+    if status != 200:
+        raise SystemExit(f"catalog request failed with {status}: {payload}")
+    products = [p for p in payload["products"] if p["sku"]]
+    if not products:
+        raise SystemExit("the catalog has no products with SKUs")
+    return products
+
+
+async def _worker(n, host, port, token, products, deadline, checkout_share, results):
+    rng = random.Random(n)
+    client = _Client(host, port, token)
+    weights = [0.5, 0.25, 0.25 - checkout_share, checkout_share]
+    kinds = ["sku", "search", "price", "checkout"]
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            if kind == "sku":
+                method, path, body = "GET", f"/products/sku/{quote(rng.choice(products)['sku'])}", None
+            elif kind == "search":
+                method, path, body = "GET", f"/products?q={quote(rng.choice(products)['name'][:6])}&limit=20", None
+            else:
+                items = [{"sku": p["sku"], "qty": 1} for p in rng.sample(products, rng.randint(1, 5))]
+                if kind == "price":
+                    method, path, body = "POST", "/cart/price", {"items": items}
+                else:
+                    method, path, body = "POST", "/checkout", {"items": items, "payment": {"method": "card"}}
+            start = time.perf_counter()
+            try:
+                status, _ = await client.request(method, path, body)
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                client.close()
+                status = 599
+            results.add(kind, (time.perf_counter() - start) * 1000.0, status)
+    finally:
+        client.close()
+
+
+async def run_load(host, port, token="", concurrency=16, duration=10.0, checkout_share=0.05):
+    products = await _catalog(host, port, token)
+    results = _Results()
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        _worker(n, host, port, token, products, deadline, checkout_share, results)
+        for n in range(concurrency)
+    ))
+    return results.summary(time.perf_counter() - start)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(host, port, proc, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"API server exited with {proc.returncode}")
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("API server did not start in time")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--token", default=os.getenv('POS_API_TOKEN', ''))
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--checkout-share", type=float, default=0.05, help="fraction of requests that check out")
+    parser.add_argument("--scale", type=float, default=0.01, help="generate_data scale of the started server's data")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "pos_bench"))
+    parser.add_argument("--workers", type=int, default=0, help="server database threads (default DB_POOL_SIZE)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+    if not 0 <= args.checkout_share <= 0.25:
+        parser.error("--checkout-share must be between 0 and 0.25")
+
+    proc = tmp = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        data_dir = Path(args.data_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        path = dataset(data_dir, args.scale, args.seed, date.today() - timedelta(days=1))
+        tmp = tempfile.TemporaryDirectory()
+        work = Path(tmp.name) / "api.db"
+        shutil.copyfile(path, work)
+        host, port = "127.0.0.1", _free_port()
+        cmd = [sys.executable, "-m", "desktop_app.api.server", f"--host={host}", f"--port={port}"]
+        if args.workers:
+            cmd.append(f"--workers={args.workers}")
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{work}", POS_API_TOKEN=args.token)
+        proc = subprocess.Popen(cmd, cwd=str(project_root()), env=env, stdout=sys.stderr)
+        _wait_healthy(host, port, proc)
+
+    try:
+        summary = asyncio.run(run_load(host, port, args.token, args.concurrency, args.duration, args.checkout_share))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+        if tmp is not None:
+            tmp.cleanup()
+
+    print(f"{summary['requests']} requests in {summary['seconds']:.1f}s ({summary['rps']:.0f}/s), "
+          f"{args.concurrency} clients: p50 {summary['p50_ms']:.1f} ms, p99 {summary['p99_ms']:.1f} ms")
+    print(f"  {'endpoint':<10}{'requests':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}  statuses")
+    for row in summary["endpoints"]:
+        statuses = " ".join(f"{k}x{v}" for k, v in row["statuses"].items())
+        print(f"  {row['endpoint']:<10}{row['requests']:>9}{row['p50_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+              f"{row['max_ms']:>9.1f}  {statuses}")
+
+    if args.json:
+        report = {"commit": _commit(), "concurrency": args.concurrency,
+                  "scale": None if args.url else args.scale, **summary}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
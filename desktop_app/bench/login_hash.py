@@ -0,0 +1,58 @@
+"""Benchmark password hash cost against login latency.
+
+Usage:
+    python -m desktop_app.bench.login_hash [--rounds N] [METHOD ...]
+
+Each METHOD is a Werkzeug method string (e.g. "pbkdf2:sha256:600000"). The
+"verify" column is what a cashier waits for on every login; pick the
+strongest method whose verify time is still acceptable on the lane PCs and
+set it as PASSWORD_HASH_METHOD in .env.
+"""
+
+import argparse
+import statistics
+import time
+
+from ..utils.passwords import PASSWORD_HASH_METHOD, hash_password, verify_password
+
+DEFAULT_METHODS = [
+    "pbkdf2:sha256:60000",
+    "pbkdf2:sha256:260000",
+    "pbkdf2:sha256:600000",
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+]
+
+
+def _median_ms(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(samples)
+
+
+def bench_method(method, rounds=5, password="correct horse battery"):
+    stored = hash_password(password, method=method)
+    hash_ms = _median_ms(lambda: hash_password(password, method=method), rounds)
+    verify_ms = _median_ms(lambda: verify_password(stored, password), rounds)
+    return {"method": stored.split("$", 1)[0], "hash_ms": hash_ms, "verify_ms": verify_ms}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("methods", nargs="*")
+    args = parser.parse_args(argv)
+
+    methods = args.methods or DEFAULT_METHODS
+    print(f"Configured PASSWORD_HASH_METHOD: {PASSWORD_HASH_METHOD or '(werkzeug default)'}")
+    print(f"{'method':<28}{'hash ms':>10}{'verify ms':>12}")
+    for method in methods:
+        r = bench_method(method, rounds=args.rounds)
+        print(f"{r['method']:<28}{r['hash_ms']:>10.1f}{r['verify_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Benchmark the integer-cents Money type against the Decimal helpers.
+
+Usage:
+    python -m desktop_app.bench.money [--carts N] [--lines N] [--check N]
+
+Times the cart path (sum price * qty, VAT breakdown, format the three
+labels) both ways, with and without converting the database prices first,
+formats a long report column with format_currency's old Decimal path
+versus the memoized CurrencyFormatter.format_many, and splits VAT for a
+column of receipt totals row by row versus ``utils.vat.vat_cents``.
+It first checks that Money gives the same results as the Decimal
+implementation for every amount from -N to N cents, and exits non-zero if
+any amount differs.
+"""
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+
+from ..utils.helpers import PH_VAT_RATE, PH_VAT_RATE_BP, compute_ph_vat_breakdown, round_money
+from ..utils.currency import CurrencyFormatter
+from ..utils.money import Money
+from ..utils.vat import split_cents, vat_cents
+
+# The Decimal reference formats pesos the old way, whatever POS_LOCALE says.
+php = CurrencyFormatter("PHP", "en_PH", symbol="₱")
+
+
+def decimal_format(amount) -> str:
+    """format_currency as it was before Money: Decimal round, then float."""
+    return f"₱{float(round_money(amount)):,.2f}"
+
+
+def check_exact(limit: int, rate_bp: int = PH_VAT_RATE_BP):
+    """Yield a description of every amount where Money and Decimal disagree."""
+    rate = Decimal(rate_bp) / 10000
+    for cents in range(-limit, limit + 1):
+        money = Money(cents)
+        dec = Decimal(cents) / 100
+        if Money.of(dec) != money or money.to_decimal() != round_money(dec):
+            yield f"{cents}: conversion"
+        if php.format(money) != decimal_format(dec):
+            yield f"{cents}: format {php.format(money)!r} != {decimal_format(dec)!r}"
+        for inclusive in (True, False):
+            expected = compute_ph_vat_breakdown(dec, rate, prices_include_vat=inclusive)
+            got = tuple(m.to_decimal() for m in money.vat_breakdown(rate_bp, inclusive))
+            if got != expected:
+                yield f"{cents}: vat inclusive={inclusive} {got} != {expected}"
+    for inclusive in (True, False):
+        amounts = range(-limit, limit + 1)
+        for cents, vatable, vat, total in zip(amounts, *split_cents(amounts, rate_bp, inclusive)):
+            expected = compute_ph_vat_breakdown(Decimal(cents) / 100, rate, prices_include_vat=inclusive)
+            if tuple(Money(c).to_decimal() for c in (vatable, vat, total)) != expected:
+                yield f"{cents}: split_cents inclusive={inclusive}"
+    # Floats go through str(), so the usual binary noise doesn't leak in.
+    for value, cents in ((0.1 + 0.2, 30), (1.005, 101), (2.675, 268), (-0.005, -1)):
+        if Money.of(value).cents != cents:
+            yield f"float {value!r}: {Money.of(value).cents} != {cents}"
+
+
+def make_carts(count, lines, catalog=300, seed=7):
+    """Random carts drawn from a fixed catalog of shelf prices."""
+    rng = random.Random(seed)
+    prices = [Decimal(rng.randint(1, 500000)) / 100 for _ in range(catalog)]
+    return [
+        [(rng.choice(prices), rng.randint(1, 12)) for _ in range(lines)]
+        for _ in range(count)
+    ]
+
+
+def decimal_cart(cart):
+    gross = Decimal("0")
+    for price, qty in cart:
+        gross += Decimal(str(price)) * int(qty)
+    vatable, vat, total = compute_ph_vat_breakdown(gross, prices_include_vat=True)
+    return [decimal_format(vatable), decimal_format(vat), decimal_format(total)]
+
+
+def money_cart(cart):
+    gross = Money.sum_lines(cart)
+    vatable, vat, total = gross.vat_breakdown(PH_VAT_RATE_BP)
+    return php.format_many((vatable, vat, total))
+
+
+def decimal_totals(cart):
+    """Same, with prices already loaded as Decimal (no conversion)."""
+    gross = sum(price * qty for price, qty in cart)
+    vatable, vat, total = compute_ph_vat_breakdown(gross, prices_include_vat=True)
+    return [decimal_format(vatable), decimal_format(vat), decimal_format(total)]
+
+
+def money_totals(cart):
+    gross = Money.sum_lines(cart)
+    vatable, vat, total = gross.vat_breakdown(PH_VAT_RATE_BP)
+    return php.format_many((vatable, vat, total))
+
+
+def _time_ms(fn, carts):
+    start = time.perf_counter()
+    results = [fn(cart) for cart in carts]
+    return (time.perf_counter() - start) * 1000.0, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--carts", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=8)
+    parser.add_argument("--check", type=int, default=200000, help="check every amount up to this many cents")
+    args = parser.parse_args(argv)
+
+    mismatches = list(check_exact(args.check))
+    for line in mismatches[:20]:
+        print("MISMATCH", line)
+    if mismatches:
+        print(f"{len(mismatches)} mismatches between Money and Decimal")
+        return 1
+    print(f"Money matches Decimal for every amount within ±{args.check} cents (VAT {PH_VAT_RATE * 100}%)")
+
+    carts = make_carts(args.carts, args.lines)
+    money_carts = [[(Money.of(price), qty) for price, qty in cart] for cart in carts]
+    print(f"{args.carts} carts x {args.lines} lines")
+    print(f"{'':<28}{'decimal ms':>12}{'money ms':>12}{'speedup':>10}")
+    scenarios = [
+        ("convert + total + format", decimal_cart, carts, money_cart, carts),
+        ("total + format (loaded)", decimal_totals, carts, money_totals, money_carts),
+    ]
+    # A report column: one formatted cell per row, many repeated amounts.
+    column = [price * qty for cart in carts for price, qty in cart]
+    scenarios.append(("format column", lambda col: [decimal_format(a) for a in col], [column],
+                      php.format_many, [column]))
+    # A day of receipt totals through the batch VAT split.
+    receipts = [sum(price * qty for price, qty in cart) for cart in carts]
+    scenarios.append((
+        "VAT column",
+        lambda col: [compute_ph_vat_breakdown(a)[1] for a in col], [receipts],
+        lambda col: [Money(v).to_decimal() for v in vat_cents(col)], [[Money.of(a).cents for a in receipts]],
+    ))
+    for label, dec_fn, dec_input, money_fn, money_input in scenarios:
+        dec_ms, dec_results = _time_ms(dec_fn, dec_input)
+        money_ms, money_results = _time_ms(money_fn, money_input)
+        if dec_results != money_results:
+            print(f"{label}: results differ between Money and Decimal")
+            return 1
+        print(f"{label:<28}{dec_ms:>12.1f}{money_ms:>12.1f}{dec_ms / money_ms:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Frame-time harness for the card shadow rendering modes.
+
+Usage:
+    python -m desktop_app.bench.render [--frames N] [--modes effect,cached,none] [--json PATH] [--grab DIR]
+
+Builds the dashboard plus a grid of every card widget for each shadow mode,
+then times synchronous repaints and resize+repaint cycles. Runs headless
+(QT_QPA_PLATFORM defaults to "offscreen"); pass --grab to save a screenshot
+per mode for a visual comparison.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QGridLayout, QScrollArea, QVBoxLayout, QWidget
+
+from ..views.screens.dashboard import DashboardScreen
+from ..views.theme import apply_theme
+from ..views.widgets import (
+    MetricCard, ModernCard, ProductCard, QuickActionCard, SHADOW_MODES, set_shadow_mode,
+)
+
+
+def build_window(cards=24):
+    window = QWidget()
+    layout = QVBoxLayout(window)
+
+    dashboard = DashboardScreen()
+    dashboard.reload_data = lambda: None  # rendering only; no database needed
+    layout.addWidget(dashboard, 1)
+
+    grid_host = QWidget()
+    grid = QGridLayout(grid_host)
+    kinds = [
+        lambda i: MetricCard(f"Metric {i}", str(i)),
+        lambda i: QuickActionCard(f"Action {i}", "new_sale.png"),
+        lambda i: ProductCard(f"Product {i}", f"₱{i}.00"),
+        lambda i: ModernCard(),
+    ]
+    for i in range(cards):
+        grid.addWidget(kinds[i % len(kinds)](i), i // 6, i % 6)
+    scroll = QScrollArea()
+    scroll.setWidgetResizable(True)
+    scroll.setWidget(grid_host)
+    layout.addWidget(scroll, 1)
+
+    window.resize(1280, 900)
+    return window
+
+
+def _stats(samples):
+    samples = sorted(samples)
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0],
+        "max_ms": samples[-1],
+    }
+
+
+def bench_mode(app, mode, frames=60, grab_dir=None):
+    set_shadow_mode(mode)
+    window = build_window()
+    window.show()
+    app.processEvents()
+
+    repaint = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        window.repaint()
+        repaint.append((time.perf_counter() - start) * 1000.0)
+
+    resize = []
+    for i in range(frames):
+        start = time.perf_counter()
+        window.resize(1100 + (i % 10) * 20, 800 + (i % 7) * 15)
+        app.processEvents()
+        window.repaint()
+        resize.append((time.perf_counter() - start) * 1000.0)
+
+    if grab_dir:
+        window.resize(1280, 900)
+        app.processEvents()
+        window.grab().save(os.path.join(grab_dir, f"render_{mode}.png"))
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return {"mode": mode, "repaint": _stats(repaint), "resize": _stats(resize)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--modes", default=",".join(SHADOW_MODES))
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--grab", help="save a screenshot per mode into this directory")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    app.setStyle("Fusion")
+    apply_theme(app)
+
+    results = [bench_mode(app, m.strip(), args.frames, args.grab) for m in args.modes.split(",") if m.strip()]
+
+    print(f"{'mode':<8}{'repaint med':>13}{'p95':>8}{'resize med':>12}{'p95':>8}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['repaint']['median_ms']:>13.2f}{r['repaint']['p95_ms']:>8.2f}"
+              f"{r['resize']['median_ms']:>12.2f}{r['resize']['p95_ms']:>8.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Time every screen's data path headless, at several data scales.
+
+Usage:
+    python -m desktop_app.bench.screens [--scales 0.01,0.1] [--repeat N] [--seed N]
+        [--data-dir DIR] [--json PATH] [--skip-export]
+
+For each scale, a seeded dataset is generated once (``tools.generate_data``)
+and cached in --data-dir; its file name includes the scale, seed and end
+date. Every run then works on a fresh copy of that dataset, in a separate
+interpreter with the offscreen Qt platform. The run times the following
+and counts the SQL statements each one issues:
+- screen refreshes and search keystrokes;
+- add-to-cart and checkout;
+- receipt rendering;
+- the report and receipt exports.
+
+Dialogs are answered automatically: checkout pays by card and skips the
+receipt prompt. --json writes everything with the commit id, so runs can
+be compared across commits.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from ..utils.helpers import project_root
+
+SEARCH_TEXT = "Item 00"
+
+
+def _stats(samples):
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "median_ms": statistics.median(samples),
+        # Nearest rank: never below the median, the max for small runs
+        "p95_ms": samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)],
+        "max_ms": samples[-1],
+    }
+
+
+class _Recorder:
+    """Times callables and counts the statements they send to the engine."""
+
+    def __init__(self, engine, app):
+        from sqlalchemy import event
+
+        self.app = app
+        self.queries = 0
+        self.results = []
+        self.errors = []
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.queries += 1
+
+    def measure(self, name, fn, repeat=1, setup=None):
+        times, queries = [], []
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            self.app.processEvents()
+            before = self.queries
+            start = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - start) * 1000.0)
+            queries.append(self.queries - before)
+        result = {"name": name, **_stats(times), "queries": statistics.median(queries)}
+        self.results.append(result)
+        print(f"  {name:<28}{result['median_ms']:>10.1f} ms{result['queries']:>8.0f} q", file=sys.stderr)
+        return result
+
+
+def _answer_dialogs(recorder, export_path):
+    """Replace modal dialogs with fixed answers so nothing blocks."""
+    from PyQt6.QtWidgets import QFileDialog, QInputDialog, QMessageBox
+
+    def error(parent, title, text, *a, **k):
+        recorder.errors.append(f"{title}: {text}")
+
+    QMessageBox.question = staticmethod(lambda *a, **k: QMessageBox.StandardButton.No)
+    QMessageBox.information = staticmethod(lambda *a, **k: QMessageBox.StandardButton.Ok)
+    QMessageBox.warning = staticmethod(error)
+    QMessageBox.critical = staticmethod(error)
+    QInputDialog.getDouble = staticmethod(lambda parent, title, label, value, *a, **k: (value, True))
+    QInputDialog.getText = staticmethod(lambda *a, **k: ("", True))
+    QFileDialog.getSaveFileName = staticmethod(lambda *a, **k: (export_path, ""))
+
+
+def run_child(repeat, skip_export, workdir):
+    """Benchmark the database in DATABASE_URL; returns the result dict."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+
+    from ..controllers import dashboard_metrics, db_session, init_db, receipt_renderer
+    from ..controllers.database import engine
+    from ..controllers.receipt_export import export_receipts
+    from ..models import Product, Transaction, User
+    from ..views.screens.customers import CustomersScreen
+    from ..views.screens.dashboard import DashboardScreen
+    from ..views.screens.products import ProductsScreen
+    from ..views.screens.reports import ReportsScreen
+    from ..views.screens.sales import SalesScreen
+    from ..views.screens.settings import SettingsScreen
+    from ..views.theme import apply_theme
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    apply_theme(app)
+    init_db()
+    rec = _Recorder(engine, app)
+    _answer_dialogs(rec, str(workdir / "report.csv"))
+
+    admin = db_session.query(User).filter_by(username="admin").one()
+    counts = {
+        "products": db_session.query(Product).count(),
+        "transactions": db_session.query(Transaction).count(),
+    }
+    screens = {}
+    for key, cls in [("dashboard", DashboardScreen), ("products", ProductsScreen), ("sales", SalesScreen),
+                     ("customers", CustomersScreen), ("reports", ReportsScreen), ("settings", SettingsScreen)]:
+        screen = cls()
+        screen.set_user(admin)
+        screen.resize(1280, 800)
+        screens[key] = screen
+
+    def cold_dashboard():
+        dashboard_metrics.ready = False
+
+    rec.measure("dashboard.bootstrap", screens["dashboard"].load_data, 1, setup=cold_dashboard)
+    rec.measure("dashboard.refresh", screens["dashboard"].load_data, repeat)
+    for key in ("products", "sales", "customers", "reports", "settings"):
+        rec.measure(f"{key}.refresh", screens[key].reload_data, repeat)
+
+    def type_into(line_edit):
+        def run():
+            for i in range(1, len(SEARCH_TEXT) + 1):
+                line_edit.setText(SEARCH_TEXT[:i])
+        return run
+
+    def clear(line_edit):
+        return lambda: line_edit.setText("")
+
+    per_key = len(SEARCH_TEXT)
+    for name, line_edit in [("products.search", screens["products"].search_input),
+                            ("sales.search", screens["sales"].search_input),
+                            ("customers.search", screens["customers"].customer_search),
+                            ("transactions.search", screens["customers"].tx_search)]:
+        r = rec.measure(f"{name} ({per_key} keys)", type_into(line_edit), repeat, setup=clear(line_edit))
+        r["per_key_ms"] = r["median_ms"] / per_key
+        line_edit.setText("")
+
+    sales = screens["sales"]
+    stocked = [
+        pid for (pid,) in db_session.query(Product.id)
+        .filter(Product.is_service == False, Product.stock >= 5)
+        .order_by(Product.id).limit(3)
+    ]
+
+    def empty_cart():
+        sales.cart = {}
+        sales._refresh_cart_table()
+
+    def add_three():
+        for pid in stocked:
+            sales.add_to_cart(pid)
+
+    def fill_cart():
+        empty_cart()
+        add_three()
+        sales.payment_method.setCurrentIndex(sales.payment_method.findData("card"))
+
+    rec.measure("sales.add_to_cart (3 items)", add_three, repeat, setup=empty_cart)
+    rec.measure("sales.checkout", sales.checkout, repeat, setup=fill_cart)
+
+    recent = [tx_id for (tx_id,) in db_session.query(Transaction.id).order_by(Transaction.id.desc()).limit(repeat)]
+    ids = iter(recent * 2)
+    rec.measure("receipt.html (cold)", lambda: receipt_renderer.html(next(ids)), len(recent),
+                setup=receipt_renderer.invalidate)
+    rec.measure("receipt.escpos (cold)", lambda: receipt_renderer.escpos(next(ids)), len(recent),
+                setup=receipt_renderer.invalidate)
+
+    rec.measure("reports.export_csv", screens["reports"].export_report, max(1, repeat // 2))
+    if not skip_export:
+        # The last day of generated sales
+        day = date.today() - timedelta(days=1)
+        rec.measure("receipts.export_pdf (1 day)",
+                    lambda: export_receipts(day, day, str(workdir / "receipts.pdf"), workers=1), 1)
+
+    return {"data": counts, "results": rec.results, "errors": rec.errors}
+
+
+def dataset(data_dir: Path, scale: float, seed: int, end: date) -> Path:
+    """Path of the cached dataset for ``scale``, generating it if needed."""
+    path = data_dir / f"pos_s{scale:g}_seed{seed}_{end.isoformat()}.db"
+    if not path.exists():
+        print(f"generating scale {scale:g} -> {path}", file=sys.stderr)
+        partial = path.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        subprocess.run(
+            [sys.executable, "-m", "desktop_app.tools.generate_data", f"--database=sqlite:///{partial}",
+             f"--scale={scale}", f"--seed={seed}", f"--end={end.isoformat()}"],
+            cwd=str(project_root()), check=True,
+        )
+        partial.rename(path)
+    return path
+
+
+def run_scale(path: Path, repeat: int, skip_export: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp) / "bench.db"
+        shutil.copyfile(path, work)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{work}", QT_QPA_PLATFORM="offscreen")
+        cmd = [sys.executable, "-m", "desktop_app.bench.screens", "--child", f"--repeat={repeat}", f"--workdir={tmp}"]
+        if skip_export:
+            cmd.append("--skip-export")
+        out = subprocess.run(cmd, cwd=str(project_root()), env=env, check=True, stdout=subprocess.PIPE, text=True)
+    return json.loads(out.stdout)
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(project_root()),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="0.01,0.1", help="comma-separated generate_data scales (1 = 100k transactions)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "pos_bench"))
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--skip-export", action="store_true", help="skip the receipt PDF export")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        # stdout carries the JSON; anything the app prints goes to stderr.
+        out, sys.stdout = sys.stdout, sys.stderr
+        result = run_child(args.repeat, args.skip_export, Path(args.workdir))
+        json.dump(result, out)
+        return 0
+
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    # Sales end yesterday, so today's checkouts and the dashboard windows
+    # line up the same way on every run that day.
+    end = date.today() - timedelta(days=1)
+    report = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    for scale in [float(s) for s in args.scales.split(",") if s.strip()]:
+        path = dataset(data_dir, scale, args.seed, end)
+        print(f"scale {scale:g}", file=sys.stderr)
+        report["scales"][f"{scale:g}"] = run_scale(path, args.repeat, args.skip_export)
+
+    for scale, run in report["scales"].items():
+        print(f"scale {scale}: {run['data']['products']} products, {run['data']['transactions']} transactions")
+        print(f"  {'case':<30}{'median ms':>10}{'p95 ms':>10}{'queries':>9}")
+        for r in run["results"]:
+            print(f"  {r['name']:<30}{r['median_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['queries']:>9.0f}")
+        for e in run["errors"]:
+            print(f"  ERROR {e}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(run["errors"] for run in report["scales"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Cold-start budget check against a throwaway SQLite database.
+
+Usage:
+    python -m desktop_app.bench.startup_budget [--budget-ms MS] [--runs N] [--report PATH]
+
+Launches ``python -m desktop_app --trace-startup`` in a fresh interpreter
+with the offscreen Qt platform, waits for the first paint and reads the
+trace. Exits with status 1 when the median time to first paint exceeds the
+budget, so it can gate CI or a release checklist.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from ..utils.helpers import project_root
+
+DEFAULT_BUDGET_MS = float(os.getenv('POS_STARTUP_BUDGET_MS', '3000'))
+
+
+def run_once(workdir: Path, run: int, timeout: float = 60.0) -> dict:
+    trace_path = workdir / f"trace_{run}.json"
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{workdir / 'startup.db'}",
+        "QT_QPA_PLATFORM": "offscreen",
+        "POS_STARTUP_EXIT": "1",
+        "POS_STARTUP_REPORT": "",
+    })
+    subprocess.run(
+        [sys.executable, "-m", "desktop_app", f"--trace-startup={trace_path}"],
+        cwd=str(project_root()),
+        env=env,
+        timeout=timeout,
+        check=True,
+    )
+    with open(trace_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--report", help="write the slowest run's trace here")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        # Run 0 also creates the schema and the admin user.
+        traces = [run_once(workdir, i) for i in range(args.runs)]
+
+    paints = [t["first_paint_ms"] or t["total_ms"] for t in traces]
+    median = statistics.median(paints)
+    slowest = max(traces, key=lambda t: t["first_paint_ms"] or t["total_ms"])
+
+    for i, t in enumerate(traces):
+        print(f"run {i}: first paint {paints[i]:.0f} ms, imports {t['import_ms']:.0f} ms")
+    for span in slowest["spans"]:
+        print(f"  {span['name']:<28}{span['duration_ms']:>9.1f} ms")
+    print(f"median first paint: {median:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(slowest, f, indent=2)
+
+    if median > args.budget_ms:
+        print("FAIL: startup budget exceeded", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 """Controllers package for desktop_app: database and other controllers."""
 
-from .database import init_db, db_session
+from .database import init_db, db_session, session_scope
+from .auth import authenticate, user_roster
+from .metrics import dashboard_metrics
+from .receipts import receipt_renderer
 
-__all__ = ["init_db", "db_session"]
+__all__ = ["init_db", "db_session", "session_scope", "authenticate", "user_roster", "dashboard_metrics", "receipt_renderer"]
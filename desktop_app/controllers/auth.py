@@ -0,0 +1,99 @@
+"""Authentication helpers that are safe to call off the GUI thread."""
+
+from collections import namedtuple
+
+from .database import new_session
+from ..utils.passwords import hash_password, needs_rehash, verify_password, verify_pin
+
+
+def authenticate(username: str, password: str):
+    """Check credentials and return the matching user id, or None.
+
+    Uses its own short-lived session so it can run in a worker thread without
+    touching the GUI thread's identity map. Hashes made with outdated cost
+    parameters are upgraded on a successful login.
+    """
+    from ..models import User
+
+    session = new_session()
+    try:
+        user = session.query(User).filter(User.username == username).first()
+        if not user or not verify_password(user.password_hash, password):
+            return None
+
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            session.commit()
+
+        return user.id
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+RosterEntry = namedtuple("RosterEntry", "id username role pin_hash")
+
+
+class UserRoster:
+    """Locally cached list of users who can quick-switch on this terminal.
+
+    Only users with a PIN are listed. The cache is loaded once and reused for
+    every switch; call ``invalidate()`` after users or PINs change.
+    """
+
+    MAX_PIN_FAILURES = 5
+
+    def __init__(self):
+        self._entries = None
+        self._failures = {}
+
+    def refresh(self):
+        from ..models import User
+
+        session = new_session()
+        try:
+            rows = (
+                session.query(User.id, User.username, User.role, User.pin_hash)
+                .filter(User.pin_hash.isnot(None))
+                .order_by(User.username)
+                .all()
+            )
+        finally:
+            session.close()
+        self._entries = {r.id: RosterEntry(r.id, r.username, r.role, r.pin_hash) for r in rows}
+
+    def invalidate(self):
+        self._entries = None
+
+    def entries(self):
+        if self._entries is None:
+            self.refresh()
+        return list(self._entries.values())
+
+    def is_locked(self, user_id) -> bool:
+        return self._failures.get(user_id, 0) >= self.MAX_PIN_FAILURES
+
+    def verify_pin(self, user_id, pin):
+        """Return the roster entry when the PIN matches, otherwise None.
+
+        Too many wrong PINs lock the user out of quick switching until they
+        sign in with their password (see ``reset_failures``).
+        """
+        if self._entries is None:
+            self.refresh()
+        entry = self._entries.get(user_id)
+        if entry is None or self.is_locked(user_id):
+            return None
+        if verify_pin(entry.pin_hash, pin):
+            self._failures.pop(user_id, None)
+            return entry
+        self._failures[user_id] = self._failures.get(user_id, 0) + 1
+        return None
+
+    def reset_failures(self, user_id):
+        self._failures.pop(user_id, None)
+
+
+user_roster = UserRoster()
@@ -0,0 +1,177 @@
+"""Change feed: product, stock and category writes, for the other terminals.
+
+Every flush that inserts, updates or deletes a Product or Category appends
+one ``change_log`` row per object (an ``after_flush`` hook on all sessions).
+The rows are written in the same transaction as the change, so other
+terminals only see them once it commits. Bulk UPDATE/DELETE statements
+bypass the flush, so services that use them call ``record`` themselves.
+
+Terminals read the log with ``ChangeFeed.poll``, which, like
+``DashboardMetrics``, only reads rows with ``id > cursor``: one indexed
+range query per poll however long the log is. Rows older than
+POS_CHANGE_LOG_DAYS (default 7) are pruned when a feed starts. Set
+POS_CHANGE_FEED=0 to stop writing the log.
+"""
+
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple
+
+from sqlalchemy import event, func, insert
+from sqlalchemy.orm import Session
+
+ENABLED = os.getenv('POS_CHANGE_FEED', '1') != '0'
+KEEP_DAYS = int(os.getenv('POS_CHANGE_LOG_DAYS', '7'))
+# Identifies this process's rows, so a terminal can skip its own changes.
+TERMINAL_ID = (os.getenv('POS_TERMINAL_ID') or f"{socket.gethostname()}:{os.getpid()}")[:64]
+
+PRODUCT = "product"
+CATEGORY = "category"
+UPSERT = "upsert"
+DELETE = "delete"
+
+_installed = False
+
+
+class Changes(NamedTuple):
+    """What changed since the last poll: ``{id: op}`` per entity, last op wins."""
+    products: Dict[int, str]
+    categories: Dict[int, str]
+
+    def __bool__(self):
+        return bool(self.products or self.categories)
+
+
+def _entity(obj):
+    from ..models import Category, Product
+
+    if isinstance(obj, Product):
+        return PRODUCT
+    if isinstance(obj, Category):
+        return CATEGORY
+    return None
+
+
+def _rows(entries):
+    now = datetime.utcnow()
+    return [
+        {"entity": entity, "entity_id": entity_id, "op": op, "origin": TERMINAL_ID, "created_at": now}
+        for entity, entity_id, op in entries
+    ]
+
+
+def record(session, entity: str, ids, op: str = UPSERT):
+    """Log a change the flush hook can't see (e.g. a bulk UPDATE)."""
+    from ..models import ChangeLog
+
+    rows = _rows((entity, entity_id, op) for entity_id in dict.fromkeys(ids) if entity_id is not None)
+    if ENABLED and rows:
+        session.execute(insert(ChangeLog), rows)
+
+
+def _after_flush(session, flush_context):
+    from ..models import ChangeLog
+
+    entries = {}
+    for obj in session.new:
+        entity = _entity(obj)
+        if entity:
+            entries[(entity, obj.id)] = UPSERT
+    for obj in session.dirty:
+        entity = _entity(obj)
+        if entity and session.is_modified(obj, include_collections=False):
+            entries[(entity, obj.id)] = UPSERT
+    for obj in session.deleted:
+        entity = _entity(obj)
+        if entity:
+            entries[(entity, obj.id)] = DELETE
+    if entries:
+        session.connection().execute(
+            ChangeLog.__table__.insert(),
+            _rows((entity, entity_id, op) for (entity, entity_id), op in entries.items()),
+        )
+
+
+def install():
+    """Hook every session's flushes once (no-op when disabled)."""
+    global _installed
+    if ENABLED and not _installed:
+        event.listen(Session, "after_flush", _after_flush)
+        _installed = True
+
+
+def prune(session, days: int = KEEP_DAYS) -> int:
+    """Delete log rows older than ``days``; returns how many went."""
+    from ..models import ChangeLog
+
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = session.query(ChangeLog).filter(ChangeLog.created_at < cutoff).delete(synchronize_session=False)
+    session.commit()
+    return deleted
+
+
+class ChangeFeed:
+    """Reads ``change_log`` incrementally; see the module docstring.
+
+    The first poll starts at the end of the log, so a terminal only hears
+    about changes made after it started (its screens load fresh anyway).
+    Changes made by this process are included by default, so one screen's
+    edit also reaches the other screens; ``skip_own`` passes over them.
+    """
+
+    BATCH = 1000
+    # Ids are handed out at insert but become visible at commit, so a
+    # lower id can appear after a higher one was read. Each poll re-reads
+    # the last LOOKBACK ids and skips the ones it has already seen.
+    LOOKBACK = 200
+
+    def __init__(self, skip_own: bool = False):
+        self.skip_own = skip_own
+        self.cursor = None
+        self._seen = set()
+
+    def start(self, session):
+        from ..models import ChangeLog
+
+        try:
+            prune(session)
+        except Exception as e:
+            session.rollback()
+            print(f"Error pruning change log: {e}")
+        self.cursor = session.query(func.max(ChangeLog.id)).scalar() or 0
+        self._seen = {i for (i,) in session.query(ChangeLog.id).filter(ChangeLog.id > self.cursor - self.LOOKBACK)}
+
+    def poll(self, session) -> Changes:
+        """Changes logged since the last poll."""
+        from ..models import ChangeLog
+
+        changes = Changes({}, {})
+        if self.cursor is None:
+            self.start(session)
+            return changes
+        start = self.cursor - self.LOOKBACK
+        while True:
+            rows = (
+                session.query(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op, ChangeLog.origin)
+                .filter(ChangeLog.id > start)
+                .order_by(ChangeLog.id)
+                .limit(self.BATCH)
+                .all()
+            )
+            for log_id, entity, entity_id, op, origin in rows:
+                start = log_id
+                if log_id in self._seen:
+                    continue
+                self._seen.add(log_id)
+                self.cursor = max(self.cursor, log_id)
+                if self.skip_own and origin == TERMINAL_ID:
+                    continue
+                target = changes.products if entity == PRODUCT else changes.categories if entity == CATEGORY else None
+                if target is not None:
+                    target[entity_id] = op
+            if len(rows) < self.BATCH:
+                break
+        floor = self.cursor - self.LOOKBACK
+        self._seen = {i for i in self._seen if i > floor}
+        return changes
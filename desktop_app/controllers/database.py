@@ -1,8 +1,15 @@
 from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+import contextlib
+from contextlib import contextmanager
 import os
+import threading
+import time
+import traceback
+import weakref
 from dotenv import load_dotenv
+from ..utils.startup import startup_timer
 
 # Load environment variables
 load_dotenv()
@@ -14,17 +21,122 @@ DB_HOST = os.getenv('DB_HOST', '127.0.0.1')
 DB_PORT = os.getenv('DB_PORT', '3306')
 DB_NAME = os.getenv('DB_NAME', 'pos_db')
 
-# Create database engine
-DATABASE_URI = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
-engine = create_engine(DATABASE_URI, pool_recycle=3600)
+# Create database engine. DATABASE_URL overrides the MySQL settings, e.g.
+# "sqlite:///pos.db" for a local lane or for benchmarks.
+DATABASE_URI = os.getenv('DATABASE_URL') or f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+_connect_args = {'check_same_thread': False} if DATABASE_URI.startswith('sqlite') else {}
+# Connection pool: sessions borrow a connection per transaction. The GUI needs
+# one or two; the API server (desktop_app.api) holds one per worker thread.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+_pool_args = {}
+if not DATABASE_URI.startswith('sqlite'):
+    # SQLite gets SingletonThreadPool/NullPool (or, from SQLAlchemy 2.0,
+    # QueuePool for files), which on 1.4 reject these arguments.
+    _pool_args = {'pool_size': DB_POOL_SIZE, 'max_overflow': DB_MAX_OVERFLOW}
+engine = create_engine(DATABASE_URI, pool_recycle=3600, connect_args=_connect_args, **_pool_args)
 db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 
 Base = declarative_base()
 Base.query = db_session.query_property()
 
 
+# Session-per-task. ``db_session`` belongs to the GUI thread (and its ORM
+# objects to the GUI's identity map). Any other task, such as a worker thread,
+# a batch job or a process, opens a session of its own with ``session_scope``
+# or ``new_session``. Those sessions are tracked: one that is garbage-collected
+# without close() is reported as a leak, and ``open_sessions()`` lists the
+# ones still open.
+_HELPER_FILES = {
+    __file__,
+    contextlib.__file__,
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "services", "uow.py"),
+}
+
+
+class _TaskInfo:
+    __slots__ = ("thread", "opened", "where")
+
+    def __init__(self):
+        self.thread = threading.current_thread().name
+        self.opened = time.monotonic()
+        # The caller that asked for the session, past the session helpers
+        frames = [f for f in traceback.extract_stack(limit=12)[:-1] if f.filename not in _HELPER_FILES]
+        self.where = f"{frames[-1].filename}:{frames[-1].lineno}" if frames else "?"
+
+    def describe(self) -> str:
+        return f"opened in thread {self.thread} at {self.where} {time.monotonic() - self.opened:.1f}s ago"
+
+
+_open_tasks = {}
+_open_lock = threading.Lock()
+
+
+def _report_leak(key, info):
+    with _open_lock:
+        _open_tasks.pop(key, None)
+    print(f"Session leak: session {info.describe()} was never closed")
+
+
+class TaskSession(Session):
+    """Session that unregisters itself from the leak tracker on close()."""
+
+    def close(self):
+        finalizer = getattr(self, "_leak_finalizer", None)
+        if finalizer is not None:
+            finalizer.detach()
+            with _open_lock:
+                _open_tasks.pop(id(self), None)
+        super().close()
+
+
+_task_factory = sessionmaker(class_=TaskSession, autocommit=False, autoflush=False, bind=engine)
+
+
+def new_session() -> TaskSession:
+    """A tracked session of its own; the caller must close() it."""
+    session = _task_factory()
+    info = _TaskInfo()
+    with _open_lock:
+        _open_tasks[id(session)] = info
+    session._leak_finalizer = weakref.finalize(session, _report_leak, id(session), info)
+    return session
+
+
+@contextmanager
+def session_scope(commit: bool = True):
+    """Session for one task: committed on success (unless ``commit`` is
+    False), rolled back on error, always closed."""
+    session = new_session()
+    try:
+        yield session
+        if commit:
+            session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def open_sessions():
+    """Descriptions of the task sessions that are still open."""
+    with _open_lock:
+        return [info.describe() for info in _open_tasks.values()]
+
+
+def report_open_sessions():
+    """Print a warning for each task session still open (e.g. at exit)."""
+    for description in open_sessions():
+        print(f"Session leak: session {description} is still open")
+
+
 def ensure_schema():
     insp = inspect(engine)
+    if engine.dialect.name == 'sqlite':
+        vat_status_type = "VARCHAR(10) NOT NULL DEFAULT 'vatable'"
+    else:
+        vat_status_type = "ENUM('vatable','exempt','zero_rated') NOT NULL DEFAULT 'vatable'"
 
     with engine.begin() as conn:
         if insp.has_table('products'):
@@ -39,11 +151,33 @@ def ensure_schema():
                 conn.execute(text('ALTER TABLE products ADD COLUMN created_at DATETIME'))
             if 'cost_price' not in cols:
                 conn.execute(text('ALTER TABLE products ADD COLUMN cost_price DECIMAL(10,2) NOT NULL DEFAULT 0.00'))
+            if 'vat_status' not in cols:
+                conn.execute(text(f'ALTER TABLE products ADD COLUMN vat_status {vat_status_type}'))
+            if 'version' not in cols:
+                conn.execute(text('ALTER TABLE products ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
+            keys = insp.get_indexes('products') + insp.get_unique_constraints('products')
+            if not any(k['column_names'] == ['sku'] and k.get('unique', True) for k in keys):
+                conn.execute(text("UPDATE products SET sku = NULL WHERE sku = ''"))
+                dupes = conn.execute(text(
+                    'SELECT sku FROM products WHERE sku IS NOT NULL GROUP BY sku HAVING COUNT(*) > 1'
+                )).scalars().all()
+                if dupes:
+                    print(f"Duplicate product SKUs, not indexed until fixed: {', '.join(dupes[:10])}")
+                else:
+                    conn.execute(text('CREATE UNIQUE INDEX uq_products_sku ON products (sku)'))
+
+        if insp.has_table('categories'):
+            cols = {c['name'] for c in insp.get_columns('categories')}
+            if 'version' not in cols:
+                conn.execute(text('ALTER TABLE categories ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
 
         if insp.has_table('transactions'):
-            cols = {c['name'] for c in insp.get_columns('transactions')}
+            cols = {c['name']: c for c in insp.get_columns('transactions')}
             if 'payment_method' not in cols:
-                conn.execute(text("ALTER TABLE transactions ADD COLUMN payment_method ENUM('cash','card','check') NOT NULL DEFAULT 'cash'"))
+                conn.execute(text("ALTER TABLE transactions ADD COLUMN payment_method ENUM('cash','card','check','gcash') NOT NULL DEFAULT 'cash'"))
+            elif 'gcash' not in getattr(cols['payment_method']['type'], 'enums', ['gcash']):
+                # MySQL ENUMs from before GCash reject (or blank) it
+                conn.execute(text("ALTER TABLE transactions MODIFY COLUMN payment_method ENUM('cash','card','check','gcash') NOT NULL DEFAULT 'cash'"))
             if 'customer_name' not in cols:
                 conn.execute(text('ALTER TABLE transactions ADD COLUMN customer_name VARCHAR(255)'))
             if 'customer_phone' not in cols:
@@ -61,6 +195,8 @@ def ensure_schema():
             cols = {c['name'] for c in insp.get_columns('transaction_items')}
             if 'cost_price' not in cols:
                 conn.execute(text('ALTER TABLE transaction_items ADD COLUMN cost_price DECIMAL(10,2) NOT NULL DEFAULT 0.00'))
+            if 'vat_status' not in cols:
+                conn.execute(text(f'ALTER TABLE transaction_items ADD COLUMN vat_status {vat_status_type}'))
 
         if insp.has_table('stock_changes'):
             cols = {c['name'] for c in insp.get_columns('stock_changes')}
@@ -73,29 +209,41 @@ def ensure_schema():
                 conn.execute(text("ALTER TABLE users ADD COLUMN role ENUM('admin','employee') NOT NULL DEFAULT 'employee'"))
             if 'created_at' not in cols:
                 conn.execute(text('ALTER TABLE users ADD COLUMN created_at DATETIME'))
+            if 'pin_hash' not in cols:
+                conn.execute(text('ALTER TABLE users ADD COLUMN pin_hash VARCHAR(255) NULL'))
 
 
 def init_db():
     # Import all models here to ensure they are registered with SQLAlchemy
-    from ..models import User, Product, Category, Transaction, TransactionItem, StockChange
-    
+    from ..models import User, Product, Category, Transaction, TransactionItem, StockChange, ChangeLog
+    from .changefeed import install as install_change_feed
+    from .instrumentation import install
+
+    # Time every statement from here on (see controllers.instrumentation)
+    install(engine)
+    # Log product and category writes for the other terminals
+    install_change_feed()
+
     # Create all tables
-    Base.metadata.create_all(bind=engine)
+    with startup_timer.span("init_db:create_all"):
+        Base.metadata.create_all(bind=engine)
 
-    ensure_schema()
+    with startup_timer.span("init_db:ensure_schema"):
+        ensure_schema()
     
     # Create admin user if not exists
-    from werkzeug.security import generate_password_hash
+    from ..utils.passwords import hash_password
     
-    admin = User.query.filter_by(username='admin').first()
-    if not admin:
-        admin = User(
-            username='admin',
-            password_hash=generate_password_hash('admin'),
-            role='admin'
-        )
-        db_session.add(admin)
-        db_session.commit()
+    with startup_timer.span("init_db:admin_bootstrap"):
+        admin = User.query.filter_by(username='admin').first()
+        if not admin:
+            admin = User(
+                username='admin',
+                password_hash=hash_password('admin'),
+                role='admin'
+            )
+            db_session.add(admin)
+            db_session.commit()
 
 
 class BaseModel:
@@ -0,0 +1,341 @@
+"""SQL instrumentation: per-statement latency, attribution and a slow-query log.
+
+``install(engine)`` hooks ``before_cursor_execute`` / ``after_cursor_execute``.
+Every statement is timed and charged to the current action. That is the
+innermost ``track_action`` block if one is active; otherwise it is the
+nearest application function on the call stack (e.g.
+``views.screens.sales._load_products``).
+
+Latencies go into fixed log-scale histograms, one per statement and one per
+action. The histograms roll over every POS_SQL_STATS_WINDOW seconds
+(default 600): a report covers the current window plus the previous one.
+Statements slower than POS_SLOW_QUERY_MS (default 200) are kept for the
+diagnostics tab. When POS_SLOW_QUERY_LOG names a file, they are also
+appended there. Set POS_SQL_INSTRUMENT=0 to skip the hooks.
+
+``track_action`` blocks (and ``@tracked`` slots) are also timed as a whole
+into ``action_timings``, which the event-loop watchdog shares.
+
+This module must stay free of Qt imports.
+"""
+
+import functools
+import inspect
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+SLOW_QUERY_MS = float(os.getenv('POS_SLOW_QUERY_MS', '200'))
+SLOW_QUERY_LOG = os.getenv('POS_SLOW_QUERY_LOG', '')
+STATS_WINDOW_S = float(os.getenv('POS_SQL_STATS_WINDOW', '600'))
+ENABLED = os.getenv('POS_SQL_INSTRUMENT', '1') != '0'
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+MAX_STATEMENTS = 500
+SLOW_KEPT = 200
+OTHER = "<other statements>"
+
+_action: ContextVar[Optional[str]] = ContextVar("pos_action", default=None)
+_APP_PACKAGE = __name__.rsplit(".", 2)[0]  # "desktop_app"
+_SKIP_MODULES = (__name__, f"{_APP_PACKAGE}.controllers.database")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@contextmanager
+def track_action(name: str):
+    """Charge SQL inside the block to ``name`` and time the block itself."""
+    token = _action.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        action_timings.add(name, (time.perf_counter() - start) * 1000.0)
+        _action.reset(token)
+
+
+def tracked(name: Optional[str] = None):
+    """Decorator running a slot inside ``track_action(name or qualname)``.
+
+    Extra positional arguments are dropped, the way Qt treats a plain slot
+    connected to a signal with more arguments (e.g. ``clicked(bool)``).
+    """
+    def decorate(fn):
+        label = name or fn.__qualname__
+        code = fn.__code__
+        takes = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track_action(label):
+                return fn(*args[:takes], **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_action() -> Optional[str]:
+    return _action.get()
+
+
+def _caller_action() -> str:
+    """Nearest application function on the stack, outside the DB plumbing."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(_APP_PACKAGE) and module not in _SKIP_MODULES:
+            return f"{module[len(_APP_PACKAGE) + 1:]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<external>"
+
+
+class LatencyHistogram:
+    """Counts per log-scale bucket, plus count, sum and max."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        out = LatencyHistogram()
+        out.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        out.count = self.count + other.count
+        out.total_ms = self.total_ms + other.total_ms
+        out.max_ms = max(self.max_ms, other.max_ms)
+        return out
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (capped at max)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class StatRow(NamedTuple):
+    key: str
+    calls: int
+    total_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    top_action: str
+
+
+class SlowQuery(NamedTuple):
+    at: datetime
+    ms: float
+    action: str
+    statement: str
+    params: str
+
+
+class _Window:
+    def __init__(self):
+        self.statements = {}  # statement -> [histogram, {action: calls}]
+        self.actions = {}  # action -> histogram
+
+
+class QueryStats:
+    """Thread-safe rolling SQL statistics (see module docstring)."""
+
+    def __init__(self, window_s: float = STATS_WINDOW_S, slow_ms: float = SLOW_QUERY_MS,
+                 slow_log: str = SLOW_QUERY_LOG):
+        self.window_s = window_s
+        self.slow_ms = slow_ms
+        self.slow_log = slow_log
+        self.slow = deque(maxlen=SLOW_KEPT)
+        self._lock = threading.Lock()
+        self._current = _Window()
+        self._previous = _Window()
+        self._rolled_at = time.monotonic()
+
+    def _roll(self, now):
+        if now - self._rolled_at >= self.window_s:
+            # Two windows old is stale; one window old still counts.
+            stale = now - self._rolled_at >= 2 * self.window_s
+            self._previous = _Window() if stale else self._current
+            self._current = _Window()
+            self._rolled_at = now
+
+    def record(self, statement: str, ms: float, action: str, params=None):
+        statement = _WHITESPACE.sub(" ", statement).strip()
+        key = statement
+        with self._lock:
+            self._roll(time.monotonic())
+            w = self._current
+            entry = w.statements.get(key)
+            if entry is None:
+                if len(w.statements) >= MAX_STATEMENTS:
+                    key = OTHER
+                entry = w.statements.setdefault(key, [LatencyHistogram(), {}])
+            entry[0].add(ms)
+            entry[1][action] = entry[1].get(action, 0) + 1
+            hist = w.actions.get(action)
+            if hist is None:
+                hist = w.actions[action] = LatencyHistogram()
+            hist.add(ms)
+        if ms >= self.slow_ms:
+            # The statement itself, even when it is counted under OTHER
+            self._log_slow(SlowQuery(datetime.now(), ms, action, statement, _short(params)))
+
+    def _log_slow(self, entry: SlowQuery):
+        self.slow.append(entry)
+        if not self.slow_log:
+            return
+        try:
+            with open(self.slow_log, "a", encoding="utf-8") as f:
+                f.write(f"{entry.at.isoformat(timespec='seconds')}\t{entry.ms:.1f}ms\t{entry.action}\t"
+                        f"{entry.statement}\t{entry.params}\n")
+        except OSError as e:
+            print(f"Error writing slow query log: {e}")
+
+    def statements(self, limit: int = 50):
+        """Statements by total time over the rolling window."""
+        with self._lock:
+            self._roll(time.monotonic())
+            merged = {}
+            for w in (self._previous, self._current):
+                for key, (hist, actions) in w.statements.items():
+                    h, acts = merged.get(key, (LatencyHistogram(), {}))
+                    for a, n in actions.items():
+                        acts[a] = acts.get(a, 0) + n
+                    merged[key] = (h.merge(hist), acts)
+        rows = [_row(key, h, max(acts, key=acts.get)) for key, (h, acts) in merged.items()]
+        rows.sort(key=lambda r: r.total_ms, reverse=True)
+        return rows[:limit]
+
+    def actions(self):
+        """SQL time per action over the rolling window, busiest first."""
+        with self._lock:
+            self._roll(time.monotonic())
+            merged = {}
+            for w in (self._previous, self._current):
+                for action, hist in w.actions.items():
+                    merged[action] = merged.get(action, LatencyHistogram()).merge(hist)
+        rows = [_row(action, h, action) for action, h in merged.items()]
+        rows.sort(key=lambda r: r.total_ms, reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._current = _Window()
+            self._previous = _Window()
+            self._rolled_at = time.monotonic()
+            self.slow.clear()
+
+
+class ActionTimings:
+    """Rolling wall-clock latency histograms per action (same windows as SQL)."""
+
+    def __init__(self, window_s: float = STATS_WINDOW_S):
+        self.window_s = window_s
+        self._lock = threading.Lock()
+        self._current = {}
+        self._previous = {}
+        self._rolled_at = time.monotonic()
+
+    def _roll(self, now):
+        if now - self._rolled_at >= self.window_s:
+            stale = now - self._rolled_at >= 2 * self.window_s
+            self._previous = {} if stale else self._current
+            self._current = {}
+            self._rolled_at = now
+
+    def add(self, action: str, ms: float):
+        with self._lock:
+            self._roll(time.monotonic())
+            hist = self._current.get(action)
+            if hist is None:
+                hist = self._current[action] = LatencyHistogram()
+            hist.add(ms)
+
+    def rows(self):
+        """Actions by total time over the rolling window."""
+        with self._lock:
+            self._roll(time.monotonic())
+            merged = {}
+            for w in (self._previous, self._current):
+                for action, hist in w.items():
+                    merged[action] = merged.get(action, LatencyHistogram()).merge(hist)
+        rows = [_row(action, h, action) for action, h in merged.items()]
+        rows.sort(key=lambda r: r.total_ms, reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._current = {}
+            self._previous = {}
+            self._rolled_at = time.monotonic()
+
+
+def _row(key, hist, top_action):
+    return StatRow(key, hist.count, hist.total_ms, hist.percentile(50), hist.percentile(95), hist.max_ms, top_action)
+
+
+def _short(params, limit: int = 200) -> str:
+    if params is None:
+        return ""
+    text = repr(params)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+query_stats = QueryStats()
+action_timings = ActionTimings()
+_installed = set()
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("pos_query_start", []).append(time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("pos_query_start")
+    if not starts:
+        return
+    ms = (time.perf_counter() - starts.pop()) * 1000.0
+    query_stats.record(statement, ms, _action.get() or _caller_action(), parameters)
+
+
+def _error(exception_context):
+    # after_cursor_execute doesn't run for a failed statement; drop its start
+    # so it doesn't sit on the pooled connection for good
+    conn = exception_context.connection
+    starts = conn.info.get("pos_query_start") if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def install(engine, force: bool = False):
+    """Attach the timing hooks to ``engine`` once (no-op when disabled)."""
+    from sqlalchemy import event
+
+    if not (ENABLED or force) or id(engine) in _installed:
+        return
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+    event.listen(engine, "handle_error", _error)
+    _installed.add(id(engine))
@@ -0,0 +1,150 @@
+"""Dashboard KPIs kept as incrementally updated counters."""
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import func
+
+from .database import db_session
+from ..utils.kpi import LOW_STOCK_THRESHOLD, HourlyBuckets, history_start, to_cents
+
+
+def _hour_bucket(session, column):
+    """SQL expression truncating ``column`` to 'YYYY-MM-DD HH'."""
+    if session.get_bind().dialect.name == 'sqlite':
+        return func.strftime('%Y-%m-%d %H', column)
+    return func.date_format(column, '%Y-%m-%d %H')
+
+
+class DashboardMetrics:
+    """Sales, order, product and customer counters for the dashboard.
+
+    The first ``poll()`` bootstraps from the database once. After that only
+    transactions with ``id > last_seen_id`` are read, so a refresh costs one
+    indexed range query no matter how long the history is. Checkouts on this
+    terminal are pushed in through ``record_transaction`` and show up
+    immediately; the poll picks up sales made on other lanes.
+
+    Sales, orders and customers are kept in hourly buckets (see
+    ``utils.kpi.HourlyBuckets``) so today / 7-day / 30-day values and their
+    previous-period deltas never need another scan.
+    """
+
+    WINDOW_DAYS = 30
+    # Ids are handed out at insert but become visible at commit, so another
+    # lane's sale can appear below last_seen_id. Each poll re-reads the last
+    # LOOKBACK ids and skips the ones already counted (as ChangeFeed does).
+    LOOKBACK = 200
+
+    def __init__(self):
+        self.ready = False
+        self.last_seen_id = 0
+        self.product_count = 0
+        self.low_stock_count = 0
+        self.buckets = HourlyBuckets(hours=(2 * self.WINDOW_DAYS + 1) * 24)
+        # Counted ids above last_seen_id - LOOKBACK
+        self._seen = set()
+        self._products_dirty = True
+
+    def bootstrap(self, session=None):
+        """Load the counters from scratch (one-off aggregate queries)."""
+        from ..models import Transaction
+
+        session = session or db_session
+        max_id = session.query(func.max(Transaction.id)).scalar() or 0
+
+        # One row per (hour, customer) is enough to rebuild every bucket,
+        # including its distinct-customer set.
+        hour = _hour_bucket(session, Transaction.created_at)
+        rows = (
+            session.query(hour, Transaction.customer_name, func.sum(Transaction.total), func.count(Transaction.id))
+            .filter(Transaction.id <= max_id, Transaction.created_at >= history_start(self.WINDOW_DAYS))
+            .group_by(hour, Transaction.customer_name)
+            .all()
+        )
+        self.buckets.clear()
+        for h, customer_name, sales, orders in rows:
+            if not h:
+                continue
+            when = datetime.strptime(h, "%Y-%m-%d %H")
+            self.buckets.add(when, to_cents(sales), int(orders or 0), (customer_name,))
+
+        self.last_seen_id = max_id
+        self._seen = {i for i in self._seen if i > max_id} | {
+            i for (i,) in session.query(Transaction.id)
+            .filter(Transaction.id > max_id - self.LOOKBACK, Transaction.id <= max_id)
+        }
+        self._products_dirty = True
+        self.ready = True
+
+    def record_transaction(self, tx_id, total, customer_name=None, created_at=None):
+        """Count a transaction committed on this terminal."""
+        if not self.ready or tx_id <= self.last_seen_id - self.LOOKBACK or tx_id in self._seen:
+            return
+        self._seen.add(tx_id)
+        self._add(total, customer_name, created_at)
+        # A sale changes stock, so the low-stock count may have moved.
+        self._products_dirty = True
+
+    def _add(self, total, customer_name, created_at):
+        self.buckets.add(created_at or datetime.utcnow(), to_cents(total or 0), 1, (customer_name,))
+
+    def products_changed(self):
+        """Ask the next poll to recount products."""
+        self._products_dirty = True
+
+    def poll(self, session=None):
+        """Fold in transactions not counted yet, from ``last_seen_id - LOOKBACK`` up."""
+        from ..models import Product, Transaction
+
+        session = session or db_session
+        if not self.ready:
+            self.bootstrap(session)
+
+        rows = (
+            session.query(Transaction.id, Transaction.total, Transaction.customer_name, Transaction.created_at)
+            .filter(Transaction.id > self.last_seen_id - self.LOOKBACK)
+            .order_by(Transaction.id)
+            .all()
+        )
+        for tx_id, total, customer_name, created_at in rows:
+            self.last_seen_id = max(self.last_seen_id, tx_id)
+            if tx_id in self._seen:
+                continue
+            self._seen.add(tx_id)
+            self._add(total, customer_name, created_at)
+            self._products_dirty = True
+        floor = self.last_seen_id - self.LOOKBACK
+        self._seen = {i for i in self._seen if i > floor}
+
+        if self._products_dirty:
+            self.product_count = session.query(func.count(Product.id)).scalar() or 0
+            self.low_stock_count = (
+                session.query(func.count(Product.id))
+                .filter(Product.is_service == False, Product.stock <= LOW_STOCK_THRESHOLD)
+                .scalar()
+                or 0
+            )
+            self._products_dirty = False
+
+    def today(self):
+        return self.buckets.today()
+
+    def last_days(self, days):
+        return self.buckets.last_days(days)
+
+    @property
+    def total_sales(self) -> Decimal:
+        return Decimal(self.last_days(self.WINDOW_DAYS).current.sales_cents) / 100
+
+    @property
+    def orders(self) -> int:
+        return self.last_days(self.WINDOW_DAYS).current.orders
+
+    @property
+    def customers(self) -> int:
+        """Distinct customers in the last WINDOW_DAYS, the window the trend compares."""
+        return self.last_days(self.WINDOW_DAYS).current.customers
+
+
+dashboard_metrics = DashboardMetrics()
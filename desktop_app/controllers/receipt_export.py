@@ -0,0 +1,223 @@
+"""Batch receipt export for a date range, rendered in worker processes.
+
+Receipts are exported either into one PDF (every receipt starts on a new
+page) or into a zip holding one PDF per receipt. Transaction ids are split
+into chunks and handed to a process pool. Each worker opens its own database
+session and returns the rendered chunk: HTML for the single-PDF export (the
+calling process paints it into the shared PDF), finished PDF bytes for the
+zip export. Only a few chunks are in flight at a time, so memory use stays
+bounded no matter how many receipts are in the range.
+
+Qt is imported lazily and workers force the offscreen platform, so the
+export runs headless (see ``python -m desktop_app.tools.export_receipts``).
+"""
+
+import multiprocessing
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+
+from .database import db_session, new_session
+from .receipts import load_receipt, render_receipt_html
+
+EXPORT_CHUNK_SIZE = int(os.getenv('POS_EXPORT_CHUNK', '50'))
+EXPORT_WORKERS = int(os.getenv('POS_EXPORT_WORKERS', '0')) or min(4, os.cpu_count() or 1)
+# Chunks queued per worker; bounds how many rendered receipts sit in memory.
+IN_FLIGHT_PER_WORKER = 2
+# Same resolution as the screen, so the receipt CSS px sizes print 1:1.
+PDF_RESOLUTION = 96
+
+_gui_app = None
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def receipt_ids(start: date, end: date, session=None):
+    """Ids of transactions created from ``start`` through ``end`` (inclusive)."""
+    from ..models import Transaction
+
+    session = session or db_session
+    start_dt = datetime.combine(start, time.min)
+    end_dt = datetime.combine(end, time.min) + timedelta(days=1)
+    rows = (
+        session.query(Transaction.id)
+        .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
+        .order_by(Transaction.id)
+        .all()
+    )
+    return [tx_id for (tx_id,) in rows]
+
+
+def ensure_gui():
+    """Make sure a Q(Gui)Application exists; text layout needs one for fonts."""
+    global _gui_app
+    from PyQt6.QtGui import QGuiApplication
+
+    if QGuiApplication.instance() is None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        _gui_app = QGuiApplication(["receipt-export"])
+
+
+def new_pdf_writer(target):
+    """QPdfWriter for a file path or QIODevice with the receipt page setup."""
+    from PyQt6.QtCore import QMarginsF
+    from PyQt6.QtGui import QPageLayout, QPageSize, QPdfWriter
+
+    writer = QPdfWriter(target)
+    writer.setResolution(PDF_RESOLUTION)
+    writer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
+    writer.setPageMargins(QMarginsF(10, 10, 10, 10), QPageLayout.Unit.Millimeter)
+    return writer
+
+
+def paint_receipt(painter, writer, html, new_page):
+    """Lay ``html`` out on the writer's pages, starting a new page if asked."""
+    from PyQt6.QtCore import QRectF, QSizeF
+    from PyQt6.QtGui import QTextDocument
+
+    rect = writer.pageLayout().paintRectPixels(writer.resolution())
+    width, height = float(rect.width()), float(rect.height())
+
+    doc = QTextDocument()
+    doc.setHtml(html)
+    doc.setPageSize(QSizeF(width, height))
+    for page in range(doc.pageCount()):
+        if new_page or page:
+            writer.newPage()
+        painter.save()
+        painter.translate(0, -page * height)
+        doc.drawContents(painter, QRectF(0, page * height, width, height))
+        painter.restore()
+
+
+def receipt_pdf(html) -> bytes:
+    """Render one receipt to PDF bytes."""
+    from PyQt6.QtCore import QBuffer, QIODevice
+    from PyQt6.QtGui import QPainter
+
+    ensure_gui()
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    writer = new_pdf_writer(buffer)
+    painter = QPainter(writer)
+    paint_receipt(painter, writer, html, new_page=False)
+    painter.end()
+    return bytes(buffer.data())
+
+
+def _init_worker():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def _render_chunk(ids, as_pdf):
+    """Worker: render a chunk of receipts as (id, html) or (id, pdf bytes)."""
+    session = new_session()
+    try:
+        rendered = []
+        for tx_id in ids:
+            data = load_receipt(tx_id, session)
+            if data is not None:
+                rendered.append((tx_id, render_receipt_html(data)))
+    finally:
+        session.close()
+    if as_pdf:
+        return [(tx_id, receipt_pdf(html)) for tx_id, html in rendered]
+    return rendered
+
+
+class _PdfSink:
+    """Paints every receipt into one PDF."""
+
+    def __init__(self, path):
+        from PyQt6.QtGui import QPainter
+
+        ensure_gui()
+        self.writer = new_pdf_writer(path)
+        self.painter = QPainter(self.writer)
+        self.empty = True
+
+    def add(self, tx_id, html):
+        paint_receipt(self.painter, self.writer, html, new_page=not self.empty)
+        self.empty = False
+
+    def close(self):
+        self.painter.end()
+
+
+class _ZipSink:
+    """Stores one PDF per receipt in a zip archive."""
+
+    def __init__(self, path):
+        # PDFs are already compressed.
+        self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+
+    def add(self, tx_id, pdf):
+        self.zip.writestr(f"receipt_{tx_id}.pdf", pdf)
+
+    def close(self):
+        self.zip.close()
+
+
+def export_receipts(start, end, path, workers=None, chunk_size=None, progress=None, cancelled=None, session=None):
+    """Export the receipts from ``start`` through ``end`` to ``path``.
+
+    A ``.zip`` path gets one PDF per receipt; anything else a single PDF.
+    ``progress(done, total)`` is called after each chunk, and a truthy
+    ``cancelled()`` stops the export, removes the partial file and raises
+    ExportCancelled. Returns the number of receipts written.
+    """
+    ids = receipt_ids(start, end, session)
+    total = len(ids)
+    if not total:
+        return 0
+
+    workers = workers or EXPORT_WORKERS
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    as_zip = str(path).lower().endswith(".zip")
+    chunks = iter([ids[i:i + chunk_size] for i in range(0, total, chunk_size)])
+
+    sink = _ZipSink(path) if as_zip else _PdfSink(path)
+    done = 0
+    ok = False
+    # Spawn, never fork: the parent usually has a running Qt application.
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    try:
+        pending = deque()
+
+        def fill():
+            while len(pending) < workers * IN_FLIGHT_PER_WORKER:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                pending.append(pool.submit(_render_chunk, chunk, as_zip))
+
+        fill()
+        while pending:
+            if cancelled is not None and cancelled():
+                raise ExportCancelled()
+            # Consume in submission order so receipts stay sorted by id.
+            results = pending.popleft().result()
+            fill()
+            for tx_id, payload in results:
+                sink.add(tx_id, payload)
+            done += len(results)
+            if progress is not None:
+                progress(done, total)
+        ok = True
+    finally:
+        pool.shutdown(wait=ok, cancel_futures=True)
+        sink.close()
+        if not ok:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return done
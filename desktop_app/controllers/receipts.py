@@ -0,0 +1,334 @@
+"""Receipt rendering: one eager query, a precompiled template, cached HTML.
+
+The same ReceiptData also renders to an ESC/POS byte stream for thermal
+printers (see ``utils.escpos``).
+"""
+
+import html
+import os
+from collections import OrderedDict
+from datetime import datetime
+from string import Template
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import joinedload
+
+from .database import db_session
+from ..utils.escpos import EscPosBuilder
+from ..utils.helpers import format_currency, PH_VAT_RATE, PH_VAT_RATE_BP
+from ..utils.money import Money
+from ..utils.vat import EXEMPT, VATABLE, ZERO_RATED, VatSummary, receipt_summary
+
+RECEIPT_CACHE_SIZE = int(os.getenv('POS_RECEIPT_CACHE', '64'))
+
+
+class ReceiptLine(NamedTuple):
+    name: str
+    qty: int
+    price: Money
+    vat_status: str = VATABLE
+
+    @property
+    def total(self) -> Money:
+        return self.price * int(self.qty)
+
+
+class ReceiptData(NamedTuple):
+    """Everything a receipt shows, detached from the ORM session (amounts as Money)."""
+    id: int
+    created_at: datetime
+    employee: Optional[str]
+    customer_name: Optional[str]
+    customer_phone: Optional[str]
+    payment_method: str
+    cash_received: Optional[Money]
+    change_amount: Optional[Money]
+    gcash_ref: Optional[str]
+    total: Money
+    lines: Tuple[ReceiptLine, ...]
+
+
+def load_receipt(transaction_id: int, session=None) -> Optional[ReceiptData]:
+    """Load a transaction with its items, products and employee in one query."""
+    from ..models import Transaction, TransactionItem
+
+    session = session or db_session
+    tx = (
+        session.query(Transaction)
+        .options(
+            joinedload(Transaction.items).joinedload(TransactionItem.product),
+            joinedload(Transaction.employee),
+        )
+        .filter(Transaction.id == transaction_id)
+        .one_or_none()
+    )
+    if tx is None:
+        return None
+
+    lines = tuple(
+        ReceiptLine(
+            it.product.name if it.product else f"Product #{it.product_id}",
+            it.qty,
+            Money.of(it.price),
+            it.vat_status or VATABLE,
+        )
+        for it in tx.items
+    )
+    return ReceiptData(
+        id=tx.id,
+        created_at=tx.created_at,
+        employee=tx.employee.username if tx.employee else None,
+        customer_name=tx.customer_name,
+        customer_phone=tx.customer_phone,
+        payment_method=tx.payment_method,
+        cash_received=None if tx.cash_received is None else Money.of(tx.cash_received),
+        change_amount=None if tx.change_amount is None else Money.of(tx.change_amount),
+        gcash_ref=tx.gcash_ref,
+        total=Money.of(tx.total),
+        lines=lines,
+    )
+
+
+RECEIPT_CSS = """
+body { margin: 0; padding: 0; background: #ffffff; }
+.receipt { font-family: 'Segoe UI', Arial, sans-serif; font-size: 12px; color: #000000; padding: 18px; }
+.title { text-align: center; font-size: 18px; font-weight: 700; margin: 0; }
+.subtitle { text-align: center; font-size: 11px; margin-top: 3px; }
+.divider { border-top: 2px solid #00b050; margin: 12px 0; }
+
+table { width: 100%; }
+.meta { border-collapse: collapse; font-size: 11px; }
+.meta td { padding: 2px 0; }
+.meta .label { color: #000000; }
+.meta .value { text-align: right; color: #000000; }
+
+.items { border-collapse: collapse; font-size: 11px; }
+.items thead th { background: #000000; color: #ffffff; padding: 6px 6px; border: 1px solid #00b050; }
+.items tbody td { padding: 6px 6px; border-bottom: 1px solid #00b050; vertical-align: top; }
+.items td.item { width: 55%; }
+.items td.qty { width: 10%; text-align: right; }
+.items td.num { text-align: right; white-space: nowrap; }
+.items td.empty { text-align: center; padding: 14px 6px; }
+
+.totals { border-collapse: collapse; font-size: 11px; }
+.totals td { padding: 3px 0; }
+.totals .label { color: #000000; }
+.totals .value { text-align: right; color: #000000; white-space: nowrap; }
+.totals .grand td { font-size: 14px; font-weight: 700; padding-top: 10px; }
+
+.footer { text-align: center; font-size: 11px; margin-top: 12px; color: #000000; }
+.footer .line { border-top: 1px dashed #00b050; margin-top: 12px; padding-top: 10px; }
+"""
+
+# The static parts (including the CSS) are baked in once; rendering only
+# substitutes the per-receipt fields.
+RECEIPT_TEMPLATE = Template(
+    "<html><head><style>" + RECEIPT_CSS.replace("$", "$$") + "</style></head><body>"
+    "<div class='receipt'>"
+    "<div class='title'>POS Receipt</div>"
+    "<div class='subtitle'>Receipt #<b>$id</b></div>"
+    "<div class='subtitle'>$date</div>"
+    "<div class='divider'></div>"
+    "<table class='meta'>$meta</table>"
+    "<div class='divider'></div>"
+    "<table class='items'>"
+    "<thead><tr>"
+    "<th align='left'>Item</th>"
+    "<th align='right'>Qty</th>"
+    "<th align='right'>Price</th>"
+    "<th align='right'>Total</th>"
+    "</tr></thead>"
+    "<tbody>$items</tbody></table>"
+    "<div class='divider'></div>"
+    "<table class='totals'>"
+    "<tr><td class='label'>VATable Sales</td><td class='value'>$vatable</td></tr>"
+    "$non_vat_rows"
+    "<tr><td class='label'>VAT ($vat_rate%)</td><td class='value'>$vat</td></tr>"
+    "<tr class='grand'><td class='label'>Total</td><td class='value'>$total</td></tr>"
+    "</table>"
+    "<div class='footer'><div class='line'>Thank you for your purchase!</div></div>"
+    "</div></body></html>"
+)
+META_ROW = Template("<tr><td class='label'>$label</td><td class='value'>$value</td></tr>")
+ITEM_ROW = Template(
+    "<tr><td class='item'>$name</td><td class='qty'>$qty</td>"
+    "<td class='num'>$price</td><td class='num'>$total</td></tr>"
+)
+EMPTY_ROW = "<tr><td class='empty' colspan='4'>No items</td></tr>"
+
+
+def vat_summary(data: ReceiptData) -> VatSummary:
+    """VAT breakdown of the receipt total, less any exempt / zero-rated lines."""
+    exempt = zero_rated = 0
+    for line in data.lines:
+        if line.vat_status == EXEMPT:
+            exempt += line.total.cents
+        elif line.vat_status == ZERO_RATED:
+            zero_rated += line.total.cents
+    return receipt_summary(data.total.cents, exempt, zero_rated, PH_VAT_RATE_BP)
+
+
+def non_vat_rows(summary: VatSummary):
+    """(label, amount) rows for the non-VAT-able sales, only when present."""
+    rows = []
+    if summary.exempt_cents:
+        rows.append(("VAT-Exempt Sales", summary.exempt))
+    if summary.zero_rated_cents:
+        rows.append(("Zero-Rated Sales", summary.zero_rated))
+    return rows
+
+
+def render_receipt_html(data: ReceiptData) -> str:
+    meta = []
+    if data.employee:
+        meta.append(("Employee", html.escape(str(data.employee))))
+    if data.customer_name:
+        meta.append(("Customer", html.escape(str(data.customer_name))))
+    if data.customer_phone:
+        meta.append(("Phone", html.escape(str(data.customer_phone))))
+    meta.append(("Payment", html.escape(str(data.payment_method))))
+    # Show cash/gcash details if present
+    if data.cash_received is not None:
+        meta.append(("Cash Received", format_currency(data.cash_received)))
+    if data.change_amount is not None:
+        meta.append(("Change", format_currency(data.change_amount)))
+    if data.gcash_ref:
+        meta.append(("GCash Ref", html.escape(str(data.gcash_ref))))
+
+    items = "".join(
+        ITEM_ROW.substitute(
+            name=html.escape(str(line.name)),
+            qty=line.qty,
+            price=format_currency(line.price),
+            total=format_currency(line.total),
+        )
+        for line in data.lines
+    ) or EMPTY_ROW
+
+    summary = vat_summary(data)
+    return RECEIPT_TEMPLATE.substitute(
+        id=data.id,
+        date=html.escape(data.created_at.strftime('%Y-%m-%d %H:%M:%S')),
+        meta="".join(META_ROW.substitute(label=label, value=value) for label, value in meta),
+        items=items,
+        vatable=format_currency(summary.vatable),
+        non_vat_rows="".join(
+            META_ROW.substitute(label=label, value=format_currency(amount))
+            for label, amount in non_vat_rows(summary)
+        ),
+        vat_rate=int(PH_VAT_RATE * 100),
+        vat=format_currency(summary.vat),
+        total=format_currency(data.total),
+    )
+
+
+def render_receipt_escpos(data: ReceiptData, columns: int = None, kick_drawer: bool = False) -> bytes:
+    """ESC/POS bytes for a thermal printer: text, bold totals, cut, optional drawer kick."""
+    p = EscPosBuilder(columns)
+    width = p.columns
+    if kick_drawer:
+        p.kick_drawer()
+
+    p.align("center").bold().size(2, 2).line("POS Receipt").size().bold(False)
+    p.line(f"Receipt #{data.id}")
+    p.line(data.created_at.strftime('%Y-%m-%d %H:%M:%S'))
+    p.align("left").rule()
+
+    if data.employee:
+        p.columns_line("Employee", data.employee)
+    if data.customer_name:
+        p.columns_line("Customer", data.customer_name)
+    if data.customer_phone:
+        p.columns_line("Phone", data.customer_phone)
+    p.columns_line("Payment", data.payment_method)
+    if data.cash_received is not None:
+        p.columns_line("Cash Received", format_currency(data.cash_received))
+    if data.change_amount is not None:
+        p.columns_line("Change", format_currency(data.change_amount))
+    if data.gcash_ref:
+        p.columns_line("GCash Ref", data.gcash_ref)
+    p.rule()
+
+    # Item name on its own line when it doesn't fit beside the numbers.
+    num = 11
+    widths = [width - 4 - 2 * num - 3, 4, num, num]
+    aligns = ["left", "right", "right", "right"]
+    p.bold().row(["Item", "Qty", "Price", "Total"], widths, aligns).bold(False)
+    for line in data.lines:
+        name = str(line.name)
+        amounts = [line.qty, format_currency(line.price), format_currency(line.total)]
+        if len(name) > widths[0]:
+            p.line(name[:width])
+            name = ""
+        p.row([name] + amounts, widths, aligns)
+    if not data.lines:
+        p.align("center").line("No items").align("left")
+    p.rule()
+
+    summary = vat_summary(data)
+    p.columns_line("VATable Sales", format_currency(summary.vatable))
+    for label, amount in non_vat_rows(summary):
+        p.columns_line(label, format_currency(amount))
+    p.columns_line(f"VAT ({int(PH_VAT_RATE * 100)}%)", format_currency(summary.vat))
+    p.bold().columns_line("TOTAL", format_currency(data.total)).bold(False)
+
+    p.feed(1).align("center").line("Thank you for your purchase!")
+    return p.feed(3).cut().build()
+
+
+class ReceiptRenderer:
+    """Renders receipts to HTML and keeps the most recent ones by transaction id.
+
+    Committed transactions don't change, so a cached receipt stays valid;
+    call ``invalidate`` if one is ever edited or voided.
+    """
+
+    def __init__(self, max_entries: int = RECEIPT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._html = OrderedDict()
+
+    def _remember(self, cache, transaction_id, value):
+        cache[transaction_id] = value
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+        return value
+
+    def data(self, transaction_id: int, session=None) -> Optional[ReceiptData]:
+        cached = self._data.get(transaction_id)
+        if cached is not None:
+            self._data.move_to_end(transaction_id)
+            return cached
+
+        data = load_receipt(transaction_id, session)
+        if data is None:
+            return None
+        return self._remember(self._data, transaction_id, data)
+
+    def html(self, transaction_id: int, session=None) -> Optional[str]:
+        cached = self._html.get(transaction_id)
+        if cached is not None:
+            self._html.move_to_end(transaction_id)
+            return cached
+
+        data = self.data(transaction_id, session)
+        if data is None:
+            return None
+        return self._remember(self._html, transaction_id, render_receipt_html(data))
+
+    def escpos(self, transaction_id: int, kick_drawer: bool = False, session=None) -> Optional[bytes]:
+        data = self.data(transaction_id, session)
+        if data is None:
+            return None
+        return render_receipt_escpos(data, kick_drawer=kick_drawer)
+
+    def invalidate(self, transaction_id: int = None):
+        if transaction_id is None:
+            self._data.clear()
+            self._html.clear()
+        else:
+            self._data.pop(transaction_id, None)
+            self._html.pop(transaction_id, None)
+
+
+receipt_renderer = ReceiptRenderer()
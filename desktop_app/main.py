@@ -5,24 +5,32 @@ from PyQt6.QtCore import QSettings, Qt
 from PyQt6.QtGui import QIcon
 
 # Import application modules
-from .controllers import init_db, db_session
+from .controllers import init_db, db_session, user_roster
+from .controllers.database import report_open_sessions
 from .views.login import LoginWindow
 from .views.main_window import MainWindow
+from .views.theme import apply_theme
 from .utils.helpers import get_icon_path, load_icon
+from .utils.startup import startup_timer
+from .utils.icons import icon_registry
+from .views.watchdog import start_watchdog
 
 class POSApp(QApplication):
     def __init__(self, argv):
-        super().__init__(argv)
+        with startup_timer.span("qapplication"):
+            super().__init__(argv)
         self.setApplicationName("POS Desktop")
         self.setApplicationDisplayName("Point of Sale System")
         self.setApplicationVersion("1.0.0")
         
         # Initialize settings
-        self.settings = QSettings("POS", "POS Desktop")
+        with startup_timer.span("settings"):
+            self.settings = QSettings("POS", "POS Desktop")
         
         # Initialize database
         try:
-            init_db()
+            with startup_timer.span("init_db"):
+                init_db()
         except Exception as e:
             QMessageBox.critical(
                 None,
@@ -33,11 +41,27 @@ class POSApp(QApplication):
             )
             raise SystemExit(1)
         
-        # Create main window
-        self.main_window = MainWindow()
+        # One stylesheet for every window, parsed once before any widget exists.
+        with startup_timer.span("theme"):
+            apply_theme(self)
+        
+        # Index and decode icons once; later lookups never hit the disk.
+        with startup_timer.span("icons"):
+            icon_registry.warm_up()
+        
+        # Create main window (screens are built on first navigation)
+        with startup_timer.span("main_window"):
+            self.main_window = MainWindow()
         
         # Show login window first
-        self.show_login()
+        with startup_timer.span("login_window"):
+            self.show_login()
+        
+        # The trace is finished (and reported) on the login window's first paint.
+        startup_timer.watch_first_paint(self.login_window)
+
+        # Log UI stalls and the slot behind them (POS_WATCHDOG=0 disables)
+        start_watchdog(self)
     
     def show_login(self):
         self.login_window = LoginWindow()
@@ -46,6 +70,7 @@ class POSApp(QApplication):
     
     def on_login_success(self, user):
         self.current_user = user
+        user_roster.reset_failures(user.id)
         # Prevent the login window close from quitting the whole app.
         if hasattr(self.login_window, 'quit_on_close'):
             self.login_window.quit_on_close = False
@@ -54,6 +79,9 @@ class POSApp(QApplication):
         self.main_window.show()
 
 def main():
+    # No-op when already configured by ``python -m desktop_app``.
+    startup_timer.configure(sys.argv)
+    
     # Set up high DPI scaling
     # Qt6 enables high-DPI scaling by default; some attributes were removed.
     if hasattr(Qt.ApplicationAttribute, 'AA_EnableHighDpiScaling'):
@@ -77,6 +105,7 @@ def main():
     
     # Clean up database session when app exits
     db_session.remove()
+    report_open_sessions()
     
     sys.exit(ret)
 
@@ -1,8 +1,9 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Enum, ForeignKey, Numeric
 from sqlalchemy.orm import relationship
 from ..controllers.database import Base, db_session
+from ..utils.passwords import hash_password, verify_password, hash_pin, verify_pin
+from ..utils.vat import VAT_STATUSES, VATABLE
 
 class User(Base):
     __tablename__ = 'users'
@@ -10,6 +11,7 @@ class User(Base):
     id = Column(Integer, primary_key=True)
     username = Column(String(80), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
+    pin_hash = Column(String(255), nullable=True)
     role = Column(Enum('admin', 'employee', name='user_roles'), default='employee')
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -18,10 +20,16 @@ class User(Base):
     stock_changes = relationship('StockChange', back_populates='user')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def set_pin(self, pin):
+        self.pin_hash = hash_pin(pin) if pin else None
+    
+    def check_pin(self, pin):
+        return verify_pin(self.pin_hash, pin)
     
     def __repr__(self):
         return f'<User {self.username}>'
@@ -31,10 +39,14 @@ class Category(Base):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), unique=True)
+    # Optimistic locking: ORM updates are "... WHERE version = <loaded>"
+    version = Column(Integer, nullable=False, default=1)
     
     # Relationships
     products = relationship('Product', back_populates='category')
     
+    __mapper_args__ = {'version_id_col': version}
+    
     def __repr__(self):
         return f'<Category {self.name}>'
 
@@ -43,30 +55,39 @@ class Product(Base):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(200), nullable=False)
-    sku = Column(String(100))
+    # Unique, so imports can upsert by SKU (services.importer)
+    sku = Column(String(100), unique=True)
     category_id = Column(Integer, ForeignKey('categories.id'))
     price = Column(Numeric(10, 2), nullable=False, default=0.00)
     cost_price = Column(Numeric(10, 2), nullable=False, default=0.00)
     stock = Column(Integer, nullable=False, default=0)
     is_service = Column(Boolean, default=False)
+    vat_status = Column(Enum(*VAT_STATUSES, name='vat_statuses'), nullable=False, default=VATABLE)
     image_filename = Column(String(255))
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Optimistic locking for edits; stock moves by atomic deltas that leave
+    # it alone (services.inventory)
+    version = Column(Integer, nullable=False, default=1)
     
     # Relationships
     category = relationship('Category', back_populates='products')
     transaction_items = relationship('TransactionItem', back_populates='product')
     stock_changes = relationship('StockChange', back_populates='product')
     
+    __mapper_args__ = {'version_id_col': version}
+    
     def __repr__(self):
         return f'<Product {self.name}>'
 
+PAYMENT_METHODS = ('cash', 'card', 'check', 'gcash')
+
 class Transaction(Base):
     __tablename__ = 'transactions'
     
     id = Column(Integer, primary_key=True)
     employee_id = Column(Integer, ForeignKey('users.id'))
     total = Column(Numeric(12, 2), nullable=False)
-    payment_method = Column(Enum('cash', 'card', 'check', name='payment_methods'), default='cash')
+    payment_method = Column(Enum(*PAYMENT_METHODS, name='payment_methods'), default='cash')
     cash_received = Column(Numeric(12, 2), nullable=True)
     change_amount = Column(Numeric(12, 2), nullable=True)
     gcash_ref = Column(String(255), nullable=True)
@@ -90,6 +111,8 @@ class TransactionItem(Base):
     qty = Column(Integer, nullable=False)
     price = Column(Numeric(10, 2), nullable=False)
     cost_price = Column(Numeric(10, 2), nullable=False, default=0.00)
+    # Copied from the product at sale time
+    vat_status = Column(Enum(*VAT_STATUSES, name='vat_statuses'), nullable=False, default=VATABLE)
     
     # Relationships
     transaction = relationship('Transaction', back_populates='items')
@@ -115,3 +138,17 @@ class StockChange(Base):
     
     def __repr__(self):
         return f'<StockChange {self.id}>'
+
+class ChangeLog(Base):
+    # Product and category writes, read by other terminals (controllers.changefeed)
+    __tablename__ = 'change_log'
+    
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)
+    origin = Column(String(64))
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<ChangeLog {self.id} {self.op} {self.entity} {self.entity_id}>'
@@ -0,0 +1,6 @@
+"""Services package for desktop_app: business logic with no Qt, one explicit session per call."""
+
+from .uow import ServiceError, NotFound, OutOfStock, Conflict, unit_of_work
+from . import cart, catalog, checkout, importer, inventory, reporting
+
+__all__ = ["ServiceError", "NotFound", "OutOfStock", "Conflict", "unit_of_work", "cart", "catalog", "checkout", "importer", "inventory", "reporting"]
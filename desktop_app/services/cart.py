@@ -0,0 +1,75 @@
+"""Cart pricing: quantities checked against stock, totals and VAT in cents."""
+
+from typing import Dict, List, NamedTuple
+
+from ..models import Product
+from ..utils.helpers import PH_VAT_RATE_BP
+from ..utils.money import Money
+from ..utils.vat import VATABLE, VatSummary, summarize_lines
+from .uow import NotFound, OutOfStock
+
+
+class CartLine(NamedTuple):
+    product_id: int
+    name: str
+    price: Money
+    qty: int
+    vat_status: str = VATABLE
+
+    @property
+    def total(self) -> Money:
+        return self.price * self.qty
+
+
+class PricedCart(NamedTuple):
+    lines: List[CartLine]
+    summary: VatSummary
+
+    @property
+    def total(self) -> Money:
+        return self.summary.total
+
+
+def check_quantity(product: Product, qty: int):
+    """Raise ``OutOfStock`` if ``qty`` units of ``product`` can't be sold."""
+    if product.is_service:
+        return
+    if product.stock <= 0:
+        raise OutOfStock(f"{product.name} is out of stock")
+    if qty > product.stock:
+        raise OutOfStock(f"Only {product.stock} units available")
+
+
+def add_item(session, cart: Dict[int, int], product_id: int, qty: int = 1) -> Dict[int, int]:
+    """``cart`` with ``qty`` more of the product, after the stock check."""
+    product = session.get(Product, product_id)
+    if product is None:
+        raise NotFound(f"Product #{product_id} no longer exists.")
+    new_qty = cart.get(product_id, 0) + qty
+    check_quantity(product, new_qty)
+    return {**cart, product_id: new_qty}
+
+
+def set_quantity(session, cart: Dict[int, int], product_id: int, qty: int) -> Dict[int, int]:
+    product = session.get(Product, product_id)
+    if product is None:
+        raise NotFound(f"Product #{product_id} no longer exists.")
+    if not product.is_service and qty > product.stock:
+        raise OutOfStock(f"Only {product.stock} units available")
+    return {**cart, product_id: qty}
+
+
+def cart_products(session, cart: Dict[int, int]) -> List[Product]:
+    """The cart's products in cart order; products deleted meanwhile are skipped."""
+    products = [session.get(Product, pid) for pid in cart]
+    return [p for p in products if p is not None]
+
+
+def price_cart(session, cart: Dict[int, int], rate_bp: int = PH_VAT_RATE_BP) -> PricedCart:
+    """Lines and the VAT breakdown for a ``{product_id: qty}`` cart."""
+    lines = [
+        CartLine(p.id, p.name, Money.of(p.price), int(cart[p.id]), p.vat_status or VATABLE)
+        for p in cart_products(session, cart)
+    ]
+    summary = summarize_lines(((line.total.cents, line.vat_status) for line in lines), rate_bp)
+    return PricedCart(lines, summary)
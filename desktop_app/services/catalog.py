@@ -0,0 +1,252 @@
+"""Product and category lookups and edits."""
+
+import os
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import func, update
+
+from ..controllers import changefeed
+from ..models import Category, Product
+from ..utils.helpers import uploads_path
+from ..utils.money import Money
+from ..utils.vat import VATABLE
+from . import inventory
+from .uow import Conflict, NotFound, OutOfStock, ServiceError, unit_of_work
+
+
+class ProductData(NamedTuple):
+    """Editable product fields, as entered in the product form."""
+    name: str
+    price: float
+    sku: Optional[str] = None
+    category_id: Optional[int] = None
+    stock: int = 0
+    is_service: bool = False
+    vat_status: str = VATABLE
+
+
+class ProductRow(NamedTuple):
+    """A product as listed in tables: plain values, safe to keep across sessions."""
+    id: int
+    name: str
+    sku: Optional[str]
+    category_id: Optional[int]
+    category_name: Optional[str]
+    price: Money
+    stock: int
+    is_service: bool
+    vat_status: str
+    image_filename: Optional[str]
+
+
+class CategoryRow(NamedTuple):
+    id: int
+    name: str
+    version: int = 1
+
+
+def list_categories(session):
+    return [CategoryRow(cid, name or "", version or 1) for cid, name, version in
+            session.query(Category.id, Category.name, Category.version).order_by(Category.name)]
+
+
+def _product_rows(session):
+    return (
+        session.query(
+            Product.id, Product.name, Product.sku, Product.category_id, Category.name,
+            Product.price, Product.stock, Product.is_service, Product.vat_status, Product.image_filename,
+        )
+        .outerjoin(Category, Category.id == Product.category_id)
+    )
+
+
+def _to_rows(query):
+    return [
+        ProductRow(pid, name, sku, cid, cname, Money.of(price), int(stock or 0), bool(service), vat or VATABLE, image)
+        for pid, name, sku, cid, cname, price, stock, service, vat, image in query
+    ]
+
+
+def search_products(session, search: str = "", category_id: Optional[int] = None, match_sku: bool = True,
+                    limit: Optional[int] = None):
+    """Rows of the products whose name (and SKU with ``match_sku``) contains ``search``, by name."""
+    query = _product_rows(session)
+    if category_id:
+        query = query.filter(Product.category_id == category_id)
+    search = (search or "").strip()
+    if search:
+        like = func.lower(f"%{search}%")
+        match = func.lower(Product.name).like(like)
+        if match_sku:
+            match = match | func.lower(Product.sku).like(like)
+        query = query.filter(match)
+    query = query.order_by(Product.name)
+    if limit:
+        query = query.limit(limit)
+    return _to_rows(query)
+
+
+def products_by_sku(session, skus) -> Dict[str, ProductRow]:
+    """``{sku: row}`` for the given SKUs in one query; unknown SKUs are left out."""
+    skus = list({s for s in skus if s})
+    if not skus:
+        return {}
+    return {row.sku: row for row in _to_rows(_product_rows(session).filter(Product.sku.in_(skus)))}
+
+
+def products_by_id(session, product_ids) -> Dict[int, ProductRow]:
+    """``{id: row}`` for the given products in one query; deleted ones are left out."""
+    product_ids = list({pid for pid in product_ids if pid is not None})
+    if not product_ids:
+        return {}
+    return {row.id: row for row in _to_rows(_product_rows(session).filter(Product.id.in_(product_ids)))}
+
+
+def matches(row: ProductRow, search: str = "", category_id: Optional[int] = None, match_sku: bool = True) -> bool:
+    """Whether ``search_products`` with these filters would list ``row``."""
+    if category_id and row.category_id != category_id:
+        return False
+    search = (search or "").strip().lower()
+    if not search:
+        return True
+    return search in (row.name or "").lower() or (match_sku and search in (row.sku or "").lower())
+
+
+def get_product(session, product_id: int) -> Product:
+    product = session.get(Product, product_id)
+    if product is None:
+        raise NotFound(f"Product #{product_id} no longer exists.")
+    return product
+
+
+def remove_upload(filename: Optional[str]):
+    """Delete an uploaded product image, if it is still on disk."""
+    path = uploads_path(filename) if filename else None
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def save_product(session, product_id: Optional[int], data: ProductData,
+                 image_filename: Optional[str] = None, image_removed: bool = False,
+                 version: Optional[int] = None, base_stock: Optional[int] = None) -> Product:
+    """Create (``product_id`` None) or update a product.
+
+    ``image_filename`` is a newly uploaded image; ``image_removed`` drops the
+    current one. A replaced or removed image file is deleted after the commit.
+
+    For an update, ``version`` is the version the form was loaded at; if the
+    product has changed since, ``Conflict`` is raised. Sales don't change the
+    version, so the stock field is applied as a delta from ``base_stock``
+    (the stock the form showed) rather than written back.
+    """
+    name = (data.name or "").strip()
+    if not name:
+        raise ServiceError("Product name is required.")
+    if data.price <= 0:
+        raise ServiceError("Price must be greater than 0.")
+
+    sku = (data.sku or "").strip() or None
+
+    with unit_of_work(session):
+        if sku:
+            taken = session.query(Product.name).filter(Product.sku == sku)
+            if product_id is not None:
+                taken = taken.filter(Product.id != product_id)
+            other = taken.first()
+            if other is not None:
+                raise ServiceError(f"SKU {sku} is already used by {other.name}.")
+        if product_id is None:
+            product = Product()
+            session.add(product)
+            product.stock = 0 if data.is_service else data.stock
+        else:
+            product = get_product(session, product_id)
+            if version is not None and product.version != version:
+                raise Conflict(f"{product.name} was changed on another terminal. Reload it and try again.")
+        old_image = product.image_filename
+
+        product.name = name
+        product.sku = sku
+        product.category_id = data.category_id
+        product.price = data.price
+        product.is_service = data.is_service
+        product.vat_status = data.vat_status or VATABLE
+        if image_filename:
+            product.image_filename = image_filename
+        elif image_removed:
+            product.image_filename = None
+
+        if product_id is not None:
+            # The version check runs with this UPDATE
+            session.flush()
+            if data.is_service:
+                product.stock = 0
+            else:
+                delta = data.stock - (product.stock if base_stock is None else base_stock)
+                if delta and not inventory.change_stock(session, product.id, delta):
+                    session.refresh(product, ["stock"])
+                    raise OutOfStock(f"Only {product.stock} units of {product.name} are left now.")
+
+    if old_image and old_image != product.image_filename:
+        remove_upload(old_image)
+    return product
+
+
+def delete_product(session, product_id: int):
+    with unit_of_work(session):
+        product = get_product(session, product_id)
+        image = product.image_filename
+        session.delete(product)
+    remove_upload(image)
+
+
+def _check_category_name(session, name: str, category_id: Optional[int] = None) -> str:
+    name = (name or "").strip()
+    if not name:
+        raise ServiceError("Category name is required.")
+    query = session.query(Category.id).filter(Category.name == name)
+    if category_id is not None:
+        query = query.filter(Category.id != category_id)
+    if query.first():
+        raise ServiceError("Exists.")
+    return name
+
+
+def add_category(session, name: str) -> Category:
+    with unit_of_work(session):
+        category = Category(name=_check_category_name(session, name))
+        session.add(category)
+    return category
+
+
+def _check_version(category: Category, version: Optional[int]):
+    if version is not None and category.version != version:
+        raise Conflict(f"{category.name} was changed on another terminal. Reload it and try again.")
+
+
+def rename_category(session, category_id: int, name: str, version: Optional[int] = None) -> Category:
+    with unit_of_work(session):
+        category = session.get(Category, category_id)
+        if category is None:
+            raise NotFound("Category no longer exists.")
+        _check_version(category, version)
+        category.name = _check_category_name(session, name, category_id)
+    return category
+
+
+def delete_category(session, category_id: int, version: Optional[int] = None):
+    """Delete a category; its products become uncategorized."""
+    with unit_of_work(session):
+        category = session.get(Category, category_id)
+        if category is None:
+            return
+        _check_version(category, version)
+        product_ids = [pid for (pid,) in session.query(Product.id).filter(Product.category_id == category_id)]
+        # Bump the versions too, so open product forms don't put the old category back
+        session.execute(
+            update(Product).where(Product.category_id == category_id)
+            .values(category_id=None, version=Product.version + 1),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        changefeed.record(session, changefeed.PRODUCT, product_ids)
+        session.delete(category)
@@ -0,0 +1,102 @@
+"""Checkout: one transaction with its items and stock movements, committed once."""
+
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+
+from ..controllers import changefeed
+from ..models import Transaction, TransactionItem, StockChange
+from ..utils.money import Money
+from ..utils.vat import VATABLE
+from .cart import cart_products
+from .inventory import change_stock
+from .uow import OutOfStock, ServiceError, unit_of_work
+
+
+class Payment(NamedTuple):
+    method: str = "cash"
+    cash_received: Optional[Money] = None
+    gcash_ref: Optional[str] = None
+
+
+class CheckoutResult(NamedTuple):
+    transaction_id: int
+    total: Money
+    change: Optional[Money]
+    customer_name: Optional[str]
+    created_at: datetime
+
+
+def checkout(session, user_id: int, cart: Dict[int, int], payment: Payment,
+             customer_name: Optional[str] = None, customer_phone: Optional[str] = None) -> CheckoutResult:
+    """Record a sale of ``cart`` ({product_id: qty}) and deduct stock.
+
+    Prices are VAT-inclusive, so the total is the sum of the lines. Stock is
+    deducted with guarded deltas (``inventory.change_stock``), so a sale on
+    another terminal between the check here and the commit raises
+    ``OutOfStock`` instead of overselling. Callers refresh their own
+    in-process caches (e.g. ``dashboard_metrics``).
+    """
+    if not cart:
+        raise ServiceError("Add items before checkout.")
+
+    with unit_of_work(session):
+        items = []
+        total = Money(0)
+        for p in cart_products(session, cart):
+            qty = int(cart[p.id])
+            if not p.is_service and qty > p.stock:
+                raise OutOfStock(f"Insufficient stock for {p.name}")
+            price = Money.of(p.price)
+            total += price * qty
+            items.append((p, qty, price))
+        if not items:
+            raise ServiceError("Add items before checkout.")
+
+        change = None
+        if payment.method == "cash" and payment.cash_received is not None:
+            change = payment.cash_received - total
+
+        created_at = datetime.utcnow()
+        customer_name = (customer_name or "").strip() or None
+        tx = Transaction(
+            employee_id=user_id,
+            total=total.to_decimal(),
+            payment_method=payment.method,
+            cash_received=payment.cash_received.to_decimal() if change is not None else None,
+            change_amount=change.to_decimal() if change is not None else None,
+            gcash_ref=payment.gcash_ref if payment.method == "gcash" else None,
+            customer_name=customer_name,
+            customer_phone=(customer_phone or "").strip() or None,
+            created_at=created_at,
+        )
+        session.add(tx)
+        session.flush()
+        tx_id = tx.id
+
+        for p, qty, price in items:
+            session.add(
+                TransactionItem(
+                    transaction_id=tx_id,
+                    product_id=p.id,
+                    qty=qty,
+                    price=price.to_decimal(),
+                    cost_price=Money.of(getattr(p, "cost_price", None)).to_decimal(),
+                    vat_status=p.vat_status or VATABLE,
+                )
+            )
+            if not p.is_service:
+                if not change_stock(session, p.id, -qty, log_change=False):
+                    raise OutOfStock(f"Insufficient stock for {p.name}")
+                session.add(
+                    StockChange(
+                        product_id=p.id,
+                        user_id=user_id,
+                        qty_change=-qty,
+                        note=f"Sold in transaction #{tx_id}",
+                    )
+                )
+        changefeed.record(session, changefeed.PRODUCT, [p.id for p, _, _ in items if not p.is_service])
+
+    # Built from local values: reloading the committed row could fail after
+    # the sale is saved, and the caller would report (and retry) a sale that happened
+    return CheckoutResult(tx_id, total, change, customer_name, created_at)
@@ -0,0 +1,409 @@
+"""Bulk product import from CSV, upserted by SKU.
+
+The file is read CHUNK_SIZE rows at a time, so memory stays flat however
+large it is, and each chunk is committed on its own:
+
+- one query reads the products that already use the chunk's SKUs, which
+  gives the diff (all a dry run does);
+- categories named for the first time are inserted in one statement;
+- new and changed products go in one multi-row upsert (``INSERT ... ON
+  DUPLICATE KEY UPDATE`` on MySQL, ``ON CONFLICT (sku) DO UPDATE`` on
+  SQLite), which bumps ``version`` so open product forms see the edit;
+- stock moves by deltas, like every other stock change (see ``inventory``),
+  each logged as a ``StockChange``.
+
+Unchanged products aren't written at all. Invalid rows are skipped and
+listed in the report with their line numbers.
+
+Columns: name, sku, category, price, cost, stock, is_service. Name, SKU and
+price are required. A missing or blank category, cost, stock or is_service
+keeps an existing product's value; new products get no category, a zero
+cost and stock, and are not services.
+"""
+
+import csv
+import os
+from datetime import datetime
+from decimal import InvalidOperation
+from itertools import islice
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import bindparam, case, inspect, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from ..controllers import changefeed
+from ..models import Category, Product, StockChange
+from ..utils.money import Money
+from ..utils.vat import VATABLE
+from .catalog import list_categories
+from .uow import ServiceError, unit_of_work
+
+CHUNK_SIZE = int(os.getenv('POS_IMPORT_CHUNK', '500'))
+
+COLUMNS = ("name", "sku", "category", "price", "cost", "stock", "is_service")
+REQUIRED = ("name", "sku", "price")
+# Numeric(10, 2)
+MAX_CENTS = 10 ** 10 - 1
+
+CREATE = "create"
+UPDATE = "update"
+ERROR = "error"
+
+_TRUE = {"1", "true", "yes", "y"}
+_FALSE = {"", "0", "false", "no", "n"}
+# Columns an upsert only overwrites when the row has a value for them
+OPTIONAL_COLUMNS = ("category_id", "cost_price", "is_service")
+
+
+class ImportCancelled(Exception):
+    """The import was cancelled; ``report`` covers the chunks already committed."""
+
+    def __init__(self, report):
+        super().__init__("Import cancelled.")
+        self.report = report
+
+
+class ImportRow(NamedTuple):
+    """A validated CSV row; None keeps an existing product's value."""
+    line: int
+    name: str
+    sku: str
+    category: Optional[str]
+    price: Money
+    cost: Optional[Money]
+    stock: Optional[int]
+    is_service: Optional[bool]
+
+
+class RowResult(NamedTuple):
+    """One line of the diff report."""
+    line: int
+    sku: str
+    action: str
+    detail: str
+
+
+class ImportReport:
+    """What an import did, or would do with ``dry_run``."""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.new_categories: List[str] = []
+        # Created, updated and invalid rows
+        self.results: List[RowResult] = []
+
+    @property
+    def errors(self) -> List[RowResult]:
+        return [r for r in self.results if r.action == ERROR]
+
+    def add(self, line: int, sku: str, action: str, detail: str):
+        self.results.append(RowResult(line, sku, action, detail))
+
+    def summary(self) -> str:
+        text = (
+            f"{self.rows} rows: {self.created} new, {self.updated} changed, "
+            f"{self.unchanged} unchanged, {len(self.errors)} invalid"
+        )
+        if self.new_categories:
+            text += f"; new categories: {', '.join(self.new_categories)}"
+        return f"Dry run, nothing saved. {text}" if self.dry_run else text
+
+    def write_csv(self, path: str):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Line", "SKU", "Action", "Details"])
+            writer.writerows(self.results)
+
+
+def _open(path):
+    # utf-8-sig: spreadsheet programs often start the file with a BOM
+    return open(path, newline="", encoding="utf-8-sig")
+
+
+def count_rows(path) -> int:
+    """Data rows in the file (a quick pass, for progress)."""
+    with _open(path) as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def read_rows(f):
+    """Yield ``(line, record)`` for each CSV record, with normalised column names."""
+    reader = csv.DictReader(f)
+    if not reader.fieldnames:
+        raise ServiceError("The file is empty.")
+    reader.fieldnames = [(name or "").strip().lower().replace(" ", "_") for name in reader.fieldnames]
+    missing = [c for c in REQUIRED if c not in reader.fieldnames]
+    if missing:
+        raise ServiceError(f"Missing column(s): {', '.join(missing)}. Expected: {', '.join(COLUMNS)}.")
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _amount(text: str, label: str) -> Money:
+    try:
+        amount = Money.of(text.replace(",", ""))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"{label} {text!r} is not an amount")
+    if amount.cents < 0:
+        raise ValueError(f"{label} can't be negative")
+    if amount.cents > MAX_CENTS:
+        raise ValueError(f"{label} is too large")
+    return amount
+
+
+def parse_row(line: int, record) -> ImportRow:
+    """Validate one CSV record; raises ValueError with the reason."""
+    def field(key):
+        return (record.get(key) or "").strip()
+
+    name, sku, category = field("name"), field("sku"), field("category")
+    if not name:
+        raise ValueError("name is required")
+    if not sku:
+        raise ValueError("SKU is required")
+    if len(name) > 200 or len(sku) > 100 or len(category) > 100:
+        raise ValueError("name, SKU or category is too long")
+
+    price = _amount(field("price"), "price")
+    if not price:
+        raise ValueError("price must be greater than 0")
+    cost = _amount(field("cost"), "cost") if field("cost") else None
+
+    flag = field("is_service").lower()
+    if flag not in _TRUE and flag not in _FALSE:
+        raise ValueError(f"is_service {flag!r} is not yes/no")
+    is_service = (flag in _TRUE) if flag else None
+
+    stock = None
+    if is_service:
+        stock = 0
+    elif field("stock"):
+        try:
+            stock = int(field("stock"))
+        except ValueError:
+            raise ValueError(f"stock {field('stock')!r} is not a whole number")
+        if stock < 0:
+            raise ValueError("stock can't be negative")
+    return ImportRow(line, name, sku, category or None, price, cost, stock, is_service)
+
+
+def check_unique_skus(session):
+    """Upserts need the unique SKU key, which ``ensure_schema`` adds unless SKUs repeat."""
+    insp = inspect(session.connection())
+    keys = insp.get_indexes("products") + insp.get_unique_constraints("products")
+    if not any(k["column_names"] == ["sku"] and k.get("unique", True) for k in keys):
+        raise ServiceError("Some products share a SKU. Give them unique SKUs before importing.")
+
+
+def _upsert_statement(session, keep=()):
+    """Multi-row upsert by SKU that leaves stock and the ``keep`` columns alone."""
+    products = Product.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(products)
+        new = stmt.inserted
+    elif dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialect == "sqlite" else postgresql).insert(products)
+        new = stmt.excluded
+    else:
+        raise ServiceError(f"CSV import isn't supported on {dialect}.")
+    # Stock moves by deltas afterwards
+    changes = {"name": new.name, "price": new.price}
+    for column in OPTIONAL_COLUMNS:
+        if column not in keep:
+            changes[column] = new[column]
+    changes["version"] = products.c.version + 1
+    if dialect == "mysql":
+        return stmt.on_duplicate_key_update(changes)
+    return stmt.on_conflict_do_update(index_elements=[products.c.sku], set_=changes)
+
+
+def _stock_delta_statement():
+    products = Product.__table__
+    new_stock = products.c.stock + bindparam("delta")
+    return (
+        update(products)
+        .where(products.c.id == bindparam("pid"))
+        .values(stock=case((new_stock < 0, 0), else_=new_stock))
+    )
+
+
+def _diff(old, row: ImportRow, category_id, category_names) -> List[str]:
+    changes = []
+    if old.name != row.name:
+        changes.append(f"name: {old.name} -> {row.name}")
+    if row.category is not None and old.category_id != category_id:
+        changes.append(f"category: {category_names.get(old.category_id) or '-'} -> {row.category}")
+    for label, before, after in (("price", old.price, row.price), ("cost", old.cost_price, row.cost)):
+        before = Money.of(before)
+        if after is not None and before != after:
+            changes.append(f"{label}: {before.to_decimal()} -> {after.to_decimal()}")
+    if row.is_service is not None and bool(old.is_service) != row.is_service:
+        changes.append("service" if row.is_service else "product")
+    return changes
+
+
+class _Catalog:
+    """Category ids by lower-cased name; a dry run gives new names negative ids."""
+
+    def __init__(self, session):
+        self.ids = {}
+        self.names = {}
+        for c in list_categories(session):
+            self.ids.setdefault(c.name.lower(), c.id)
+            self.names[c.id] = c.name
+
+    def resolve(self, session, rows, report, dry_run):
+        missing = {}
+        for row in rows:
+            if row.category and row.category.lower() not in self.ids:
+                missing.setdefault(row.category.lower(), row.category)
+        if not missing:
+            return
+        report.new_categories.extend(missing.values())
+        if dry_run:
+            for key, name in missing.items():
+                fake_id = -len(self.names) - 1
+                self.ids[key] = fake_id
+                self.names[fake_id] = name
+            return
+        session.execute(Category.__table__.insert(), [{"name": name} for name in missing.values()])
+        created = session.execute(
+            select(Category.id, Category.name).where(Category.name.in_(list(missing.values())))
+        ).all()
+        for cid, name in created:
+            self.ids[name.lower()] = cid
+            self.names[cid] = name
+        changefeed.record(session, changefeed.CATEGORY, [cid for cid, _ in created])
+
+    def id_for(self, row: ImportRow):
+        return self.ids.get(row.category.lower()) if row.category else None
+
+
+def _import_chunk(session, rows: List[ImportRow], user_id: int, catalog: _Catalog, report: ImportReport,
+                  dry_run: bool):
+    existing = {
+        r.sku: r for r in session.execute(
+            select(Product.id, Product.sku, Product.name, Product.category_id, Product.price,
+                   Product.cost_price, Product.stock, Product.is_service)
+            .where(Product.sku.in_([row.sku for row in rows]))
+        )
+    }
+    catalog.resolve(session, rows, report, dry_run)
+
+    now = datetime.utcnow()
+    upserts = {}
+    deltas = []
+    opening = {}
+    for row in rows:
+        category_id = catalog.id_for(row)
+        old = existing.get(row.sku)
+        if old is None:
+            stock = 0 if row.is_service else row.stock or 0
+            report.created += 1
+            report.add(row.line, row.sku, CREATE, f"{row.name}, price {row.price.to_decimal()}, stock {stock}")
+            if stock:
+                opening[row.sku] = stock
+        else:
+            changes = _diff(old, row, category_id, catalog.names)
+            is_service = bool(old.is_service) if row.is_service is None else row.is_service
+            stock = 0 if is_service else row.stock
+            delta = 0 if stock is None else stock - int(old.stock or 0)
+            if not changes and not delta:
+                report.unchanged += 1
+                continue
+            report.updated += 1
+            if delta:
+                deltas.append({"pid": old.id, "delta": delta})
+                report.add(row.line, row.sku, UPDATE, "; ".join(changes + [f"stock: {old.stock} -> {stock}"]))
+            else:
+                report.add(row.line, row.sku, UPDATE, "; ".join(changes))
+            if not changes:
+                # Stock only: no upsert, so the version (and open forms) stay put
+                continue
+        # Rows are grouped by the columns they leave alone, one upsert per group
+        keep = tuple(column for column, value in zip(OPTIONAL_COLUMNS, (row.category, row.cost, row.is_service))
+                     if value is None)
+        upserts.setdefault(keep, []).append({
+            "name": row.name,
+            "sku": row.sku,
+            "category_id": category_id,
+            "price": row.price.to_decimal(),
+            "cost_price": (row.cost or Money(0)).to_decimal(),
+            "stock": stock or 0,
+            "is_service": bool(row.is_service),
+            "vat_status": VATABLE,
+            "created_at": now,
+            "version": 1,
+        })
+    if dry_run:
+        return
+
+    for keep, values in upserts.items():
+        session.execute(_upsert_statement(session, keep), values)
+    if deltas:
+        session.execute(_stock_delta_statement(), deltas)
+    ids = dict(session.execute(
+        select(Product.sku, Product.id).where(Product.sku.in_([v["sku"] for values in upserts.values() for v in values]))
+    ).all()) if upserts else {}
+    stock_changes = [
+        {"product_id": d["pid"], "user_id": user_id, "qty_change": d["delta"], "note": "CSV import"}
+        for d in deltas
+    ] + [
+        {"product_id": ids[sku], "user_id": user_id, "qty_change": qty, "note": "Opening stock (CSV import)"}
+        for sku, qty in opening.items() if sku in ids
+    ]
+    if stock_changes:
+        session.execute(StockChange.__table__.insert(), stock_changes)
+    changefeed.record(session, changefeed.PRODUCT, list(ids.values()) + [d["pid"] for d in deltas])
+
+
+def import_products(session, path, user_id: int, dry_run: bool = False, chunk_size: Optional[int] = None,
+                    progress=None, cancelled=None) -> ImportReport:
+    """Import products from the CSV at ``path``; see the module docstring.
+
+    With ``dry_run`` nothing is written and the report is the diff the
+    import would apply. ``progress(done, total)`` is called after each
+    chunk, and a truthy ``cancelled()`` stops before the next one, raising
+    ImportCancelled with the report so far (earlier chunks stay committed).
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    total = count_rows(path)
+    report = ImportReport(dry_run)
+    if not dry_run:
+        check_unique_skus(session)
+    catalog = _Catalog(session)
+    seen = set()
+
+    with _open(path) as f:
+        records = read_rows(f)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            if cancelled is not None and cancelled():
+                raise ImportCancelled(report)
+            rows = []
+            for line, record in chunk:
+                try:
+                    row = parse_row(line, record)
+                except ValueError as e:
+                    report.add(line, (record.get("sku") or "").strip(), ERROR, str(e))
+                    continue
+                if row.sku in seen:
+                    report.add(line, row.sku, ERROR, "SKU already appears earlier in the file")
+                    continue
+                seen.add(row.sku)
+                rows.append(row)
+            if rows:
+                with unit_of_work(session):
+                    _import_chunk(session, rows, user_id, catalog, report, dry_run)
+            report.rows += len(chunk)
+            if progress is not None:
+                progress(min(report.rows, total), total)
+    report.results.sort(key=lambda r: r.line)
+    return report
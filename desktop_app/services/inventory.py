@@ -0,0 +1,124 @@
+"""Stock levels: atomic deltas, and manual adjustments logged as ``StockChange``.
+
+Stock is never written back from a value read earlier. Each change is a
+single ``UPDATE products SET stock = stock + :delta`` guarded so it can't go
+below zero, so sales and adjustments on several terminals never overwrite
+each other. These updates don't bump ``Product.version``: a sale shouldn't
+make an open product form stale (see ``catalog.save_product``).
+"""
+
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from ..controllers import changefeed
+from ..models import Product, StockChange
+from .uow import Conflict, NotFound, ServiceError, unit_of_work
+
+ADD = "add"
+REMOVE = "remove"
+SET = "set"
+ADJUST_ACTIONS = (ADD, REMOVE, SET)
+
+CAS_RETRIES = 5
+
+
+def _stock_updated(session, product_id: int):
+    """Expire the stale ``stock`` of an already-loaded product."""
+    product = session.identity_map.get(session.identity_key(Product, product_id))
+    if product is not None:
+        session.expire(product, ["stock"])
+
+
+def change_stock(session, product_id: int, delta: int, log_change: bool = True) -> bool:
+    """``stock += delta`` in one UPDATE, only if the result stays >= 0.
+
+    Returns False, changing nothing, when there isn't enough stock or the
+    product is gone or a service. Pass ``log_change=False`` to record the
+    change feed entry yourself (e.g. once for a whole cart).
+    """
+    stmt = update(Product).where(Product.id == product_id, Product.is_service == False)  # noqa: E712
+    if delta < 0:
+        stmt = stmt.where(Product.stock >= -delta)
+    result = session.execute(stmt.values(stock=Product.stock + delta),
+                             execution_options={"synchronize_session": False})
+    if result.rowcount != 1:
+        return False
+    _stock_updated(session, product_id)
+    if log_change:
+        changefeed.record(session, changefeed.PRODUCT, [product_id])
+    return True
+
+
+def _current_stock(session, product_id: int) -> int:
+    row = session.execute(
+        select(Product.stock, Product.is_service).where(Product.id == product_id).with_for_update()
+    ).one_or_none()
+    if row is None:
+        raise NotFound(f"Product #{product_id} no longer exists.")
+    if row.is_service:
+        raise ServiceError("Services don't have stock.")
+    return int(row.stock or 0)
+
+
+def _swap_stock(session, product_id: int, target) -> int:
+    """Compare-and-swap stock to ``target(current)``; returns the delta.
+
+    The read locks the row where the database supports it (MySQL); the
+    ``stock = current`` guard covers the rest, retrying a few times.
+    """
+    for _ in range(CAS_RETRIES):
+        current = _current_stock(session, product_id)
+        new = target(current)
+        if new == current:
+            return 0
+        result = session.execute(
+            update(Product).where(Product.id == product_id, Product.stock == current).values(stock=new),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount == 1:
+            _stock_updated(session, product_id)
+            changefeed.record(session, changefeed.PRODUCT, [product_id])
+            return new - current
+    raise Conflict("Stock kept changing while it was being adjusted; please try again.")
+
+
+def adjust_stock(session, product_id: int, user_id: int, action: str, qty: int,
+                 unit_cost: Optional[float] = None, note: str = "") -> int:
+    """Add, remove or set stock; returns the new stock level.
+
+    Adding stock needs a unit cost. Removing never goes below zero. The
+    logged ``qty_change`` is the change actually applied, which for "set"
+    is measured against the stock at that moment, not when the form opened.
+    """
+    if action not in ADJUST_ACTIONS:
+        raise ServiceError(f"Unknown stock action: {action}")
+    if action == ADD and not (unit_cost and unit_cost > 0):
+        raise ServiceError("Unit cost required.")
+
+    with unit_of_work(session):
+        if action == ADD:
+            if not change_stock(session, product_id, qty):
+                _current_stock(session, product_id)  # raises NotFound, or for a service
+                raise Conflict("Stock could not be updated; please try again.")
+            delta = qty
+        elif action == REMOVE:
+            if change_stock(session, product_id, -qty):
+                delta = -qty
+            else:
+                # Fewer than qty left: take it down to zero
+                delta = _swap_stock(session, product_id, lambda current: 0)
+        else:
+            delta = _swap_stock(session, product_id, lambda current: qty)
+        session.add(
+            StockChange(
+                product_id=product_id,
+                user_id=user_id,
+                qty_change=delta,
+                unit_cost=Decimal(str(unit_cost)) if action == ADD else None,
+                note=(note or "").strip() or f"Stock: {action}",
+            )
+        )
+        new_stock = session.execute(select(Product.stock).where(Product.id == product_id)).scalar_one()
+    return int(new_stock)
@@ -0,0 +1,186 @@
+"""Sales report aggregation and the CSV export, all grouped in SQL."""
+
+import csv
+from datetime import date, datetime, time, timedelta
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import desc, func
+
+from ..controllers.vat_summary import total_summary, vat_summary_by_period
+from ..models import Product, Transaction, TransactionItem
+from ..utils.currency import currency_formatter
+from ..utils.kpi import LOW_STOCK_THRESHOLD
+from ..utils.money import Money, ZERO
+
+
+class SalesTotals(NamedTuple):
+    sales: Money
+    cost: Money
+    orders: int
+
+    @property
+    def profit(self) -> Money:
+        return self.sales - self.cost
+
+    @property
+    def avg_order(self) -> Money:
+        return self.sales.divide(self.orders)
+
+
+class DaySales(NamedTuple):
+    day: str
+    sales: Money
+    cost: Money
+
+    @property
+    def profit(self) -> Money:
+        return self.sales - self.cost
+
+
+class ProductSales(NamedTuple):
+    sku: Optional[str]
+    name: str
+    qty: int
+    sales: Money
+    cost: Money
+
+    @property
+    def profit(self) -> Money:
+        return self.sales - self.cost
+
+    @property
+    def margin(self):
+        return self.profit.percent_of(self.sales)
+
+
+class StockLevel(NamedTuple):
+    product_id: int
+    name: str
+    stock: int
+
+
+def day_range(start: date, end: date):
+    """[start, end] as half-open datetimes."""
+    return datetime.combine(start, time.min), datetime.combine(end, time.min) + timedelta(days=1)
+
+
+def sales_totals(session, start: date, end: date) -> SalesTotals:
+    start_dt, end_dt = day_range(start, end)
+    row = (
+        session.query(
+            func.sum(TransactionItem.qty * TransactionItem.price).label('sales'),
+            func.sum(TransactionItem.qty * TransactionItem.cost_price).label('cost'),
+        )
+        .join(Transaction, Transaction.id == TransactionItem.transaction_id)
+        .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
+        .one()
+    )
+    orders = (
+        session.query(func.count(Transaction.id))
+        .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
+        .scalar()
+        or 0
+    )
+    return SalesTotals(Money.of(row.sales), Money.of(row.cost), orders)
+
+
+def sales_by_day(session, start: date, end: date) -> List[DaySales]:
+    start_dt, end_dt = day_range(start, end)
+    day = func.date(Transaction.created_at)
+    rows = (
+        session.query(
+            day.label('d'),
+            func.sum(TransactionItem.qty * TransactionItem.price).label('sales'),
+            func.sum(TransactionItem.qty * TransactionItem.cost_price).label('cost'),
+        )
+        .join(TransactionItem, TransactionItem.transaction_id == Transaction.id)
+        .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
+        .group_by(day)
+        .order_by(day)
+    )
+    return [DaySales(str(r.d), Money.of(r.sales), Money.of(r.cost)) for r in rows]
+
+
+def product_sales(session, start: date, end: date, limit: Optional[int] = None) -> List[ProductSales]:
+    """Sales per product; the ``limit`` best sellers by quantity, or all by name."""
+    start_dt, end_dt = day_range(start, end)
+    query = (
+        session.query(
+            Product.sku,
+            Product.name,
+            func.sum(TransactionItem.qty).label('qty'),
+            func.sum(TransactionItem.qty * TransactionItem.price).label('sales'),
+            func.sum(TransactionItem.qty * TransactionItem.cost_price).label('cost'),
+        )
+        .join(TransactionItem, TransactionItem.product_id == Product.id)
+        .join(Transaction, Transaction.id == TransactionItem.transaction_id)
+        .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
+        .group_by(Product.id, Product.sku, Product.name)
+    )
+    if limit:
+        query = query.order_by(desc(func.sum(TransactionItem.qty))).limit(limit)
+    else:
+        query = query.order_by(Product.name)
+    return [
+        ProductSales(r.sku, r.name or "", int(r.qty or 0), Money.of(r.sales), Money.of(r.cost))
+        for r in query
+    ]
+
+
+def low_stock(session, threshold: int = LOW_STOCK_THRESHOLD, limit: int = 25) -> List[StockLevel]:
+    rows = (
+        session.query(Product.id, Product.name, Product.stock)
+        .filter(Product.is_service == False, Product.stock <= threshold)
+        .order_by(Product.stock.asc())
+        .limit(limit)
+    )
+    return [StockLevel(pid, name, int(stock or 0)) for pid, name, stock in rows]
+
+
+def export_sales_csv(session, start: date, end: date, path: str) -> int:
+    """Write the per-product sales report with totals and a daily VAT summary.
+
+    Returns the number of product rows; nothing is written when there are none.
+    """
+    rows = product_sales(session, start, end)
+    if not rows:
+        return 0
+
+    total_sales = ZERO
+    total_cost = ZERO
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["SKU", "Product", "Quantity", "Sales", "Cost", "Profit", "Margin %"])
+
+        for r in rows:
+            total_sales += r.sales
+            total_cost += r.cost
+            writer.writerow([
+                r.sku or "",
+                r.name,
+                r.qty,
+                *currency_formatter.format_many((r.sales, r.cost, r.profit)),
+                f"{r.margin:.2f}",
+            ])
+
+        writer.writerow([])
+        writer.writerow([
+            "TOTAL",
+            "",
+            "",
+            *currency_formatter.format_many((total_sales, total_cost, total_sales - total_cost)),
+            "",
+        ])
+
+        # VAT summary per day, VAT rounded per receipt as printed
+        periods = vat_summary_by_period(start, end, "day", session=session)
+        writer.writerow([])
+        writer.writerow(["VAT SUMMARY"])
+        writer.writerow(["Date", "Receipts", "VATable Sales", "VAT-Exempt Sales", "Zero-Rated Sales", "VAT", "Total"])
+        for day, s in periods + [("TOTAL", total_summary(periods))]:
+            writer.writerow([
+                day,
+                s.receipts,
+                *currency_formatter.format_many((s.vatable, s.exempt, s.zero_rated, s.vat, s.total)),
+            ])
+    return len(rows)
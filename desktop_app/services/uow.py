@@ -0,0 +1,54 @@
+"""Unit of work and the errors services raise.
+
+Services never reach for the global ``db_session``. Callers pass the session
+to use: the GUI passes ``db_session``, while a worker thread, batch job or
+benchmark passes one of its own. Writes go through ``unit_of_work``, which
+commits once at the end or rolls back on error.
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy.orm.exc import StaleDataError
+
+from ..controllers.database import new_session
+
+
+class ServiceError(Exception):
+    """A business rule refused the operation; the message is shown to the user."""
+
+
+class NotFound(ServiceError):
+    pass
+
+
+class OutOfStock(ServiceError):
+    pass
+
+
+class Conflict(ServiceError):
+    """Someone else changed the record since it was loaded."""
+
+
+@contextmanager
+def unit_of_work(session=None):
+    """Yield ``session`` and commit it on success, rolling back on any error.
+
+    With no session, a tracked task session (``new_session``) is opened and
+    closed afterwards, so the block is safe to run in any thread. A failed
+    version check (``StaleDataError``) is raised as ``Conflict``.
+    """
+    own = session is None
+    if own:
+        session = new_session()
+    try:
+        yield session
+        session.commit()
+    except StaleDataError as e:
+        session.rollback()
+        raise Conflict("This record was changed or deleted on another terminal. Reload it and try again.") from e
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        if own:
+            session.close()
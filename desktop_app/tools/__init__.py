@@ -0,0 +1 @@
+"""Operational command-line tools for desktop_app (run with ``python -m desktop_app.tools.<name>``)."""
@@ -0,0 +1,40 @@
+"""Pack the icon directories into a compiled Qt resource.
+
+Usage:
+    python -m desktop_app.tools.build_icons [--qrc icons.qrc] [--rcc icons.rcc]
+
+Writes a .qrc for every icon the registry finds and, when Qt's ``rcc`` (or
+``pyside6-rcc``) is on PATH, compiles it to a binary .rcc. Set POS_ICON_RCC
+to the .rcc path to have the app load icons from it.
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+
+from ..utils.icons import IconRegistry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--qrc", default="icons.qrc")
+    parser.add_argument("--rcc", default="icons.rcc")
+    args = parser.parse_args(argv)
+
+    count = IconRegistry().write_qrc(args.qrc)
+    print(f"Wrote {args.qrc} ({count} icons)")
+
+    for tool in ("rcc", "pyside6-rcc"):
+        exe = shutil.which(tool)
+        if exe:
+            subprocess.run([exe, "--binary", args.qrc, "-o", args.rcc], check=True)
+            print(f"Compiled {args.rcc}; set POS_ICON_RCC={args.rcc}")
+            return 0
+
+    print("rcc not found; compile with: rcc --binary icons.qrc -o icons.rcc", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Export every receipt in a date range to one PDF or a zip of PDFs.
+
+Usage:
+    python -m desktop_app.tools.export_receipts --from 2026-01-01 --to 2026-01-31 \\
+        [--out receipts.pdf | --out receipts.zip] [--workers N] [--chunk N]
+
+Runs headless (offscreen Qt platform) against the configured database.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from", dest="start", required=True, type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", required=True, type=date.fromisoformat, help="last day, inclusive")
+    parser.add_argument("--out", default="receipts.pdf", help=".pdf for one file, .zip for one PDF per receipt")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default POS_EXPORT_WORKERS or up to 4)")
+    parser.add_argument("--chunk", type=int, default=0, help="receipts per worker task")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from ..controllers.receipt_export import export_receipts
+
+    def progress(done, total):
+        print(f"\r{done}/{total} receipts", end="", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    count = export_receipts(
+        args.start, args.end, args.out,
+        workers=args.workers or None, chunk_size=args.chunk or None, progress=progress,
+    )
+    if count:
+        print(file=sys.stderr)
+        print(f"Wrote {count} receipts to {args.out} in {time.perf_counter() - started:.1f}s")
+    else:
+        print("No receipts in that range.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
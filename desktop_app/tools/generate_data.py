@@ -0,0 +1,384 @@
+"""Load a deterministic synthetic POS dataset for benchmarks.
+
+Usage:
+    python -m desktop_app.tools.generate_data [--database URL] [--scale F] [--seed N]
+        [--days N] [--end YYYY-MM-DD] [--products N] [--categories N]
+        [--transactions N] [--utc-offset H] [--batch N] [--reset]
+
+Scale 1 is 10,000 products in 40 categories and 100,000 transactions
+(about 300,000 items) over 90 days. Transactions grow linearly with
+--scale; products, categories and customers grow with its square root.
+The explicit counts override the scale.
+
+The same seed, scale, --end and --utc-offset always produce the same rows,
+whatever the machine's time zone. The one exception is users.password_hash:
+passwords are hashed with a random salt, so it differs between runs even
+though the passwords are the same.
+
+The data is shaped like a real store:
+- Popular products sell far more often (Zipf).
+- Baskets are mostly small.
+- Sales follow store hours, with lunch and after-work peaks, and weekends
+  are busier. The hours are local time at a fixed --utc-offset (default 0);
+  created_at is stored in UTC like the app's own rows.
+- Stock history matches what the app itself writes: opening stock,
+  restocks and one "Sold in transaction #N" change per sold line.
+
+Rows are bulk-inserted with SQLAlchemy Core executemany (PyMySQL sends
+multi-row INSERTs), with no ORM session involved. On SQLite the load runs
+with synchronous=OFF; on MySQL, unique and foreign key checks are off.
+The target database must be empty, unless --reset drops and recreates
+the tables first.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+BASE_SCALE = {"categories": 40, "products": 10000, "transactions": 100000, "customers": 5000}
+CASHIERS = 8
+CASHIER_PASSWORD = "cashier"
+BATCH_SIZE = 5000
+
+# Relative traffic per local hour (store open 08:00-21:00) and weekday (Mon..Sun).
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 0, 0, 0, 3, 5, 7, 9, 14, 12, 8, 7, 8, 11, 15, 13, 8, 4, 0, 0]
+WEEKDAY_WEIGHTS = [0.9, 0.85, 0.9, 0.95, 1.1, 1.35, 1.2]
+PAYMENTS = ["cash", "card", "check"]
+PAYMENT_WEIGHTS = [60, 36, 4]
+BILLS = [20, 50, 100, 200, 500, 1000]
+
+CATEGORY_WORDS = [
+    "Beverages", "Snacks", "Dairy", "Bakery", "Produce", "Frozen", "Pantry", "Household",
+    "Personal Care", "Baby", "Pet", "Hardware", "Electrical", "Stationery", "Toys", "Kitchen",
+]
+PRODUCT_WORDS = [
+    "Classic", "Premium", "Value", "Family", "Mini", "Jumbo", "Organic", "Fresh", "Crispy",
+    "Sweet", "Spicy", "Lite", "Deluxe", "Original", "Extra", "Super",
+]
+FIRST_NAMES = ["Ana", "Ben", "Carla", "Dan", "Ella", "Felix", "Gina", "Hugo", "Ivy", "Jose",
+               "Kim", "Liza", "Marco", "Nina", "Oscar", "Paula", "Rico", "Sara", "Tony", "Vina"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores",
+              "Ramos", "Aquino", "Castro", "Rivera", "Lopez", "Navarro", "Villanueva", "Dela Cruz"]
+
+
+class DataSpec(NamedTuple):
+    categories: int
+    products: int
+    transactions: int
+    customers: int
+    days: int = 90
+    end: date = None
+    seed: int = 1
+    # Hours from UTC of the store's local time, which the hour curve follows
+    utc_offset: float = 0.0
+
+
+def spec_for_scale(scale: float = 1.0, **overrides) -> DataSpec:
+    """Counts for ``scale``; keyword arguments that are not None win."""
+    root = math.sqrt(scale)
+    counts = {
+        "categories": max(3, round(BASE_SCALE["categories"] * root)),
+        "products": max(10, round(BASE_SCALE["products"] * root)),
+        "transactions": max(1, round(BASE_SCALE["transactions"] * scale)),
+        "customers": max(10, round(BASE_SCALE["customers"] * root)),
+    }
+    counts.update({k: v for k, v in overrides.items() if v is not None})
+    return DataSpec(**counts)
+
+
+def _cents(amount_cents) -> str:
+    """Exact decimal string for a Numeric column."""
+    sign = "-" if amount_cents < 0 else ""
+    whole, frac = divmod(abs(int(amount_cents)), 100)
+    return f"{sign}{whole}.{frac:02d}"
+
+
+def _daily_counts(total, days, first_day, rng):
+    """Spread ``total`` transactions over the days by weekday weight."""
+    weights = [WEEKDAY_WEIGHTS[(first_day + timedelta(days=d)).weekday()] * rng.uniform(0.9, 1.1)
+               for d in range(days)]
+    scale = total / sum(weights)
+    counts, carry = [], 0.0
+    for w in weights:
+        exact = w * scale + carry
+        n = int(exact)
+        carry = exact - n
+        counts.append(n)
+    counts[-1] += total - sum(counts)
+    return counts
+
+
+class _Loader:
+    """Buffers rows per table and flushes them in foreign-key order."""
+
+    def __init__(self, conn, tables, batch_size):
+        self.conn = conn
+        self.tables = tables  # ordered: parents first
+        self.rows = {t.name: [] for t in tables}
+        self.batch_size = batch_size
+        self.counts = {t.name: 0 for t in tables}
+
+    def add(self, table_name, row):
+        buf = self.rows[table_name]
+        buf.append(row)
+        if len(buf) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for table in self.tables:
+            buf = self.rows[table.name]
+            if buf:
+                self.conn.execute(table.insert(), buf)
+                self.counts[table.name] += len(buf)
+                buf.clear()
+        self.conn.commit()
+
+
+def _tune(conn):
+    from sqlalchemy import text
+
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.exec_driver_sql("PRAGMA journal_mode=MEMORY")
+    elif conn.dialect.name == "mysql":
+        conn.execute(text("SET unique_checks=0, foreign_key_checks=0"))
+
+
+def generate(spec: DataSpec, engine=None, batch_size: int = BATCH_SIZE, progress=None):
+    """Insert the dataset described by ``spec``; returns row counts per table.
+
+    ``progress(done, total)`` is called after every flushed batch of
+    transactions. The database must not contain any products yet.
+    """
+    from sqlalchemy import bindparam, func, select
+
+    from ..controllers.database import engine as default_engine
+    from ..models import Category, Product, StockChange, Transaction, TransactionItem, User
+    from ..utils.passwords import hash_password
+
+    engine = engine or default_engine
+    rng = random.Random(spec.seed)
+    end = spec.end or date.today()
+    first_day = end - timedelta(days=spec.days - 1)
+    # created_at is naive UTC (datetime.utcnow); the hour curve is local time.
+    offset = timedelta(hours=spec.utc_offset)
+
+    users_t, categories_t, products_t = User.__table__, Category.__table__, Product.__table__
+    tx_t, items_t, stock_t = Transaction.__table__, TransactionItem.__table__, StockChange.__table__
+
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(products_t)).scalar():
+            raise RuntimeError("Database already has products; use an empty database or --reset")
+        _tune(conn)
+
+        def next_id(table):
+            return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+        loader = _Loader(conn, [users_t, categories_t, products_t, tx_t, items_t, stock_t], batch_size)
+
+        # Users: the admin from init_db plus a team of cashiers.
+        admin_id = conn.execute(select(users_t.c.id).where(users_t.c.username == "admin")).scalar()
+        user_id = next_id(users_t)
+        cashier_hash = hash_password(CASHIER_PASSWORD)
+        cashier_ids = []
+        for i in range(CASHIERS):
+            cashier_ids.append(user_id)
+            loader.add("users", {"id": user_id, "username": f"cashier{i + 1:02d}",
+                                 "password_hash": cashier_hash, "role": "employee",
+                                 "created_at": datetime.combine(first_day, datetime.min.time())})
+            user_id += 1
+        stock_user = admin_id or cashier_ids[0]
+
+        category_id = next_id(categories_t)
+        category_ids = []
+        for i in range(spec.categories):
+            word = CATEGORY_WORDS[i % len(CATEGORY_WORDS)]
+            category_ids.append(category_id)
+            loader.add("categories", {"id": category_id, "name": f"{word} {i // len(CATEGORY_WORDS) + 1:02d}"})
+            category_id += 1
+
+        # Products: log-normal shelf prices, 55-85% cost, a few services
+        # and VAT-exempt / zero-rated lines.
+        opening = datetime.combine(first_day, datetime.min.time()) - timedelta(days=1)
+        product_id = next_id(products_t)
+        products = []  # (id, price_cents, cost_cents, is_service, vat_status)
+        stock = {}
+        stock_id = next_id(stock_t)
+        for i in range(spec.products):
+            price = min(5000000, max(500, round(rng.lognormvariate(5.0, 1.0) * 4) * 25))
+            cost = round(price * rng.uniform(0.55, 0.85))
+            is_service = rng.random() < 0.03
+            roll = rng.random()
+            vat_status = "exempt" if roll < 0.02 else "zero_rated" if roll < 0.03 else "vatable"
+            products.append((product_id, price, cost, is_service, vat_status))
+            loader.add("products", {
+                "id": product_id,
+                "name": f"{rng.choice(PRODUCT_WORDS)} {rng.choice(PRODUCT_WORDS)} Item {i + 1:06d}",
+                "sku": f"SKU{i + 1:07d}",
+                "category_id": category_ids[i % len(category_ids)],
+                "price": _cents(price),
+                "cost_price": _cents(cost),
+                "stock": 0,
+                "is_service": is_service,
+                "vat_status": vat_status,
+                "created_at": opening,
+            })
+            if not is_service:
+                qty = rng.randint(20, 200)
+                stock[product_id] = qty
+                loader.add("stock_changes", {"id": stock_id, "product_id": product_id, "user_id": stock_user,
+                                             "qty_change": qty, "unit_cost": _cents(cost),
+                                             "note": "Stock: add", "created_at": opening})
+                stock_id += 1
+            product_id += 1
+
+        # Popularity: Zipf over a shuffled catalog.
+        order = list(range(len(products)))
+        rng.shuffle(order)
+        cum, acc = [], 0.0
+        for rank in range(len(order)):
+            acc += 1.0 / (rank + 1) ** 1.07
+            cum.append(acc)
+
+        customers = [
+            (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"09{rng.randrange(10 ** 9):09d}")
+            for _ in range(spec.customers)
+        ]
+
+        tx_id = next_id(tx_t)
+        item_id = next_id(items_t)
+        done = 0
+        hours = list(range(24))
+        for day_index, count in enumerate(_daily_counts(spec.transactions, spec.days, first_day, rng)):
+            day = datetime.combine(first_day + timedelta(days=day_index), datetime.min.time())
+            seconds = sorted(
+                h * 3600 + rng.randrange(3600) for h in rng.choices(hours, weights=HOUR_WEIGHTS, k=count)
+            )
+            for sec in seconds:
+                created_at = day + timedelta(seconds=sec) - offset
+                basket = min(30, 1 + int(rng.expovariate(1 / 2.2)))
+                lines = {}
+                for pick in rng.choices(order, cum_weights=cum, k=basket):
+                    lines[pick] = lines.get(pick, 0) + (1 if rng.random() < 0.75 else rng.randint(2, 6))
+
+                total = 0
+                tx_lines = []
+                for pick, qty in lines.items():
+                    pid, price, cost, is_service, vat_status = products[pick]
+                    total += price * qty
+                    tx_lines.append((pid, qty, price, cost, is_service, vat_status))
+
+                payment = rng.choices(PAYMENTS, weights=PAYMENT_WEIGHTS)[0]
+                cash_received = change = None
+                if payment == "cash":
+                    bill = next((b for b in BILLS if b * 100 >= total), BILLS[-1]) * 100
+                    cash_received = -(-total // bill) * bill
+                    change = cash_received - total
+                name, phone = rng.choice(customers) if rng.random() < 0.45 else (None, None)
+                loader.add("transactions", {
+                    "id": tx_id,
+                    "employee_id": rng.choice(cashier_ids),
+                    "total": _cents(total),
+                    "payment_method": payment,
+                    "cash_received": None if cash_received is None else _cents(cash_received),
+                    "change_amount": None if change is None else _cents(change),
+                    "gcash_ref": None,
+                    "customer_name": name,
+                    "customer_phone": phone,
+                    "created_at": created_at,
+                })
+                for pid, qty, price, cost, is_service, vat_status in tx_lines:
+                    loader.add("transaction_items", {
+                        "id": item_id, "transaction_id": tx_id, "product_id": pid, "qty": qty,
+                        "price": _cents(price), "cost_price": _cents(cost), "vat_status": vat_status,
+                    })
+                    item_id += 1
+                    if is_service:
+                        continue
+                    if stock[pid] < qty:
+                        restock = max(qty, rng.randint(50, 300))
+                        stock[pid] += restock
+                        loader.add("stock_changes", {
+                            "id": stock_id, "product_id": pid, "user_id": stock_user, "qty_change": restock,
+                            "unit_cost": _cents(cost), "note": "Stock: add",
+                            "created_at": created_at - timedelta(minutes=30),
+                        })
+                        stock_id += 1
+                    stock[pid] -= qty
+                    loader.add("stock_changes", {
+                        "id": stock_id, "product_id": pid, "user_id": stock_user, "qty_change": -qty,
+                        "unit_cost": None, "note": f"Sold in transaction #{tx_id}", "created_at": created_at,
+                    })
+                    stock_id += 1
+                tx_id += 1
+                done += 1
+                if progress is not None and done % batch_size == 0:
+                    progress(done, spec.transactions)
+        loader.flush()
+
+        # Final stock levels match the stock history.
+        update = products_t.update().where(products_t.c.id == bindparam("pid")).values(stock=bindparam("qty"))
+        rows = [{"pid": pid, "qty": qty} for pid, qty in stock.items()]
+        for i in range(0, len(rows), batch_size):
+            conn.execute(update, rows[i:i + batch_size])
+        conn.commit()
+        if progress is not None:
+            progress(done, spec.transactions)
+    return loader.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", help="SQLAlchemy URL (default: DATABASE_URL / DB_* settings)")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--end", type=date.fromisoformat, help="last day of sales (default today)")
+    parser.add_argument("--products", type=int)
+    parser.add_argument("--categories", type=int)
+    parser.add_argument("--transactions", type=int)
+    parser.add_argument("--customers", type=int)
+    parser.add_argument("--utc-offset", type=float, default=0.0,
+                        help="hours from UTC of the store's local time (default 0)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="rows per INSERT batch")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args(argv)
+
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    from ..controllers.database import Base, engine, init_db
+
+    if args.reset:
+        from .. import models  # noqa: F401  (register the tables)
+        Base.metadata.drop_all(bind=engine)
+    init_db()
+
+    spec = spec_for_scale(
+        args.scale, products=args.products, categories=args.categories,
+        transactions=args.transactions, customers=args.customers,
+    )._replace(days=args.days, end=args.end, seed=args.seed, utc_offset=args.utc_offset)
+
+    def progress(done, total):
+        print(f"\r{done}/{total} transactions", end="", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    try:
+        counts = generate(spec, engine, batch_size=args.batch, progress=progress)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    rows = sum(counts.values())
+    print(", ".join(f"{n} {table}" for table, n in counts.items()))
+    print(f"{rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Create and update products from a CSV file, upserted by SKU.
+
+Usage:
+    python -m desktop_app.tools.import_products products.csv [--dry-run]
+        [--report diff.csv] [--user admin] [--chunk N]
+
+Columns: name, sku, category, price, cost, stock, is_service (see
+services.importer). --dry-run only reports what would change; --report
+writes the per-row diff, including invalid rows, as CSV.
+"""
+
+import argparse
+import sys
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV file to import")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without saving them")
+    parser.add_argument("--report", help="write the per-row diff to this CSV file")
+    parser.add_argument("--user", default="admin", help="user the stock changes are logged under")
+    parser.add_argument("--chunk", type=int, default=0, help="rows per transaction (default POS_IMPORT_CHUNK or 500)")
+    args = parser.parse_args(argv)
+
+    from ..controllers.database import init_db, session_scope
+    from ..models import User
+    from ..services import ServiceError, importer
+
+    init_db()
+    with session_scope() as session:
+        user = session.query(User.id).filter_by(username=args.user).first()
+        if user is None:
+            print(f"No user named {args.user!r}", file=sys.stderr)
+            return 2
+
+        def progress(done, total):
+            print(f"\r{done}/{total} rows", end="", file=sys.stderr, flush=True)
+
+        started = time.perf_counter()
+        try:
+            report = importer.import_products(
+                session, args.path, user.id, dry_run=args.dry_run,
+                chunk_size=args.chunk or None, progress=progress,
+            )
+        except (ServiceError, OSError) as e:
+            print(f"\nImport failed: {e}", file=sys.stderr)
+            return 1
+    print(file=sys.stderr)
+    print(f"{report.summary()} ({time.perf_counter() - started:.1f}s)")
+    if args.report:
+        report.write_csv(args.report)
+        print(f"Wrote the diff to {args.report}")
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Currency formatting for labels, table columns, receipts and exports.
+
+The currency and number style come from the environment:
+
+    POS_CURRENCY   ISO code, default PHP. Known codes get their symbol
+                   (see CURRENCY_SYMBOLS); POS_CURRENCY_SYMBOL overrides it.
+    POS_LOCALE     number style, default en_PH (see LOCALES).
+
+Amounts are formatted from integer cents (see ``utils.money``). Recent
+results are memoized, because tables and exports repeat the same prices
+over and over.
+"""
+
+import os
+from typing import Iterable, List, NamedTuple
+
+from .money import Money
+
+CURRENCY_SYMBOLS = {
+    "PHP": "₱",
+    "USD": "$",
+    "EUR": "€",
+    "GBP": "£",
+    "SGD": "S$",
+    "AUD": "A$",
+    "HKD": "HK$",
+}
+
+
+class NumberStyle(NamedTuple):
+    group: str
+    decimal: str
+    # "{sym}" and "{num}" placeholders; "{num}" carries the minus sign.
+    pattern: str
+
+
+LOCALES = {
+    "en_PH": NumberStyle(",", ".", "{sym}{num}"),
+    "en_US": NumberStyle(",", ".", "{sym}{num}"),
+    "en_GB": NumberStyle(",", ".", "{sym}{num}"),
+    "de_DE": NumberStyle(".", ",", "{num} {sym}"),
+    "fr_FR": NumberStyle(" ", ",", "{num} {sym}"),
+    "es_ES": NumberStyle(".", ",", "{num} {sym}"),
+}
+DEFAULT_LOCALE = "en_PH"
+CACHE_SIZE = 4096
+
+
+class CurrencyFormatter:
+    """Formats money amounts with a currency symbol and locale number style."""
+
+    def __init__(self, currency: str = None, locale: str = None, symbol: str = None,
+                 cache_size: int = CACHE_SIZE):
+        self.currency = (currency or os.getenv('POS_CURRENCY') or "PHP").upper()
+        self.locale = locale or os.getenv('POS_LOCALE') or DEFAULT_LOCALE
+        self.symbol = symbol or os.getenv('POS_CURRENCY_SYMBOL') or CURRENCY_SYMBOLS.get(self.currency, self.currency)
+        self.style = LOCALES.get(self.locale) or LOCALES.get(self.locale.split(".")[0]) or LOCALES[DEFAULT_LOCALE]
+        self.cache_size = cache_size
+        self._cache = {}
+        prefix, _, suffix = self.style.pattern.partition("{num}")
+        self._prefix = prefix.replace("{sym}", self.symbol)
+        self._suffix = suffix.replace("{sym}", self.symbol)
+
+    def _render(self, cents: int) -> str:
+        if cents < 0:
+            sign = "-"
+            whole, frac = divmod(-cents, 100)
+        else:
+            sign = ""
+            whole, frac = divmod(cents, 100)
+        style = self.style
+        if style.group == "," and style.decimal == ".":
+            num = f"{sign}{whole:,}.{frac:02d}"
+        else:
+            num = f"{sign}{whole:,}".replace(",", style.group) + f"{style.decimal}{frac:02d}"
+        return self._prefix + num + self._suffix
+
+    def format_cents(self, cents: int) -> str:
+        text = self._cache.get(cents)
+        if text is None:
+            text = self._render(cents)
+            if len(self._cache) >= self.cache_size:
+                # Table refreshes repeat a small working set; starting over is
+                # cheaper than tracking recency on every hit.
+                self._cache.clear()
+            self._cache[cents] = text
+        return text
+
+    def format(self, amount) -> str:
+        """Format Money, Decimal, float, int pesos or None (as zero)."""
+        return self.format_cents(Money.of(amount).cents)
+
+    def format_many(self, amounts: Iterable) -> List[str]:
+        """Format a column of amounts in one call."""
+        cache, render = self._cache, self.format_cents
+        of = Money.of
+        out = []
+        for amount in amounts:
+            cents = of(amount).cents
+            text = cache.get(cents)
+            out.append(text if text is not None else render(cents))
+        return out
+
+    def clear_cache(self):
+        self._cache.clear()
+
+
+currency_formatter = CurrencyFormatter()
@@ -0,0 +1,120 @@
+"""Minimal ESC/POS command builder and printer transport.
+
+Thermal receipt printers print native ESC/POS text far faster than a
+rasterized page. Configure the receipt printer with POS_ESCPOS_PRINTER:
+
+    /dev/usb/lp0              device file (USB / parallel)
+    tcp://192.168.1.50:9100   raw socket (port defaults to 9100)
+    /tmp/receipts.bin         any other path: bytes are appended (stand-in)
+
+POS_ESCPOS_COLUMNS sets the characters per line (default 42 for 80 mm
+paper with font A; use 32 for 58 mm).
+"""
+
+import os
+import socket
+from urllib.parse import urlparse
+
+ESC = b"\x1b"
+GS = b"\x1d"
+
+DEFAULT_COLUMNS = int(os.getenv('POS_ESCPOS_COLUMNS', '42'))
+DEFAULT_PORT = 9100
+ENCODING = "cp437"
+# Characters the default code page lacks.
+REPLACEMENTS = {"₱": "P", "€": "EUR", "•": "*", "—": "-", "–": "-"}
+
+_ALIGN = {"left": 0, "center": 1, "right": 2}
+
+
+def printer_target() -> str:
+    return os.getenv('POS_ESCPOS_PRINTER', '').strip()
+
+
+class EscPosBuilder:
+    """Accumulates an ESC/POS byte stream; every method returns ``self``."""
+
+    def __init__(self, columns: int = None):
+        self.columns = columns or DEFAULT_COLUMNS
+        self._buf = bytearray()
+        self.init()
+
+    def raw(self, data: bytes):
+        self._buf += data
+        return self
+
+    def init(self):
+        return self.raw(ESC + b"@")
+
+    def encode(self, text) -> bytes:
+        text = str(text)
+        for src, dst in REPLACEMENTS.items():
+            text = text.replace(src, dst)
+        return text.encode(ENCODING, errors="replace")
+
+    def text(self, text):
+        return self.raw(self.encode(text))
+
+    def line(self, text=""):
+        return self.text(text).raw(b"\n")
+
+    def bold(self, on: bool = True):
+        return self.raw(ESC + b"E" + bytes([1 if on else 0]))
+
+    def align(self, how: str = "left"):
+        return self.raw(ESC + b"a" + bytes([_ALIGN[how]]))
+
+    def size(self, width: int = 1, height: int = 1):
+        """Character magnification, 1-8 in each direction."""
+        return self.raw(GS + b"!" + bytes([((width - 1) << 4) | (height - 1)]))
+
+    def rule(self, char: str = "-"):
+        return self.line(char * self.columns)
+
+    def columns_line(self, left, right, width: int = None):
+        """Left text and right-aligned text on one line (left is truncated)."""
+        width = width or self.columns
+        left, right = str(left), str(right)
+        room = max(0, width - len(right) - 1)
+        if len(left) > room:
+            left = left[:room]
+        return self.line(left + " " * (width - len(left) - len(right)) + right)
+
+    def row(self, cells, widths, aligns=None):
+        """Fixed-width table row; ``aligns`` holds 'left'/'right' per cell."""
+        aligns = aligns or ["left"] * len(cells)
+        parts = []
+        for cell, width, how in zip(cells, widths, aligns):
+            cell = str(cell)[:width]
+            parts.append(cell.rjust(width) if how == "right" else cell.ljust(width))
+        return self.line(" ".join(parts).rstrip())
+
+    def feed(self, lines: int = 1):
+        return self.raw(ESC + b"d" + bytes([max(0, min(255, lines))]))
+
+    def cut(self, partial: bool = True):
+        # GS V 66 n: feed n dots, then (partial) cut.
+        return self.raw(GS + b"V" + (b"B" if partial else b"A") + b"\x03")
+
+    def kick_drawer(self, pin: int = 0, on_ms: int = 100, off_ms: int = 200):
+        """Pulse the cash drawer connector (pin 0 = pin 2, 1 = pin 5)."""
+        return self.raw(ESC + b"p" + bytes([pin, min(255, on_ms // 2), min(255, off_ms // 2)]))
+
+    def build(self) -> bytes:
+        return bytes(self._buf)
+
+
+def send(payload: bytes, target: str = None, timeout: float = 3.0):
+    """Write ``payload`` to the configured printer (see module docstring)."""
+    target = target or printer_target()
+    if not target:
+        raise RuntimeError("No ESC/POS printer configured (set POS_ESCPOS_PRINTER)")
+
+    if target.startswith("tcp://"):
+        url = urlparse(target)
+        with socket.create_connection((url.hostname, url.port or DEFAULT_PORT), timeout=timeout) as sock:
+            sock.sendall(payload)
+        return
+
+    with open(target, "ab", buffering=0) as f:
+        f.write(payload)
@@ -4,81 +4,21 @@ import uuid
 from decimal import Decimal, ROUND_HALF_UP
 from pathlib import Path
 
+from .currency import currency_formatter
+
 
 def project_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
 def get_icon_path(icon_name: str) -> str:
-    if not icon_name:
-        return ""
-
-    root = project_root()
-    candidates = [
-        root / "static" / "icons" / icon_name,
-        root / "static" / icon_name,
-        root / "desktop_app" / "static" / "icons" / icon_name,
-        root / "desktop_app" / "static" / icon_name,
-    ]
-
-    for p in candidates:
-        if p.exists():
-            return str(p)
-
-    return ""
+    from .icons import icon_registry
+    return icon_registry.path(icon_name)
 
 
 def load_icon(icon_name: str):
-    try:
-        from PyQt6.QtGui import QIcon
-        from PyQt6.QtWidgets import QApplication, QStyle
-    except Exception:
-        return None
-
-    if not icon_name:
-        return QIcon()
-
-    path = get_icon_path(icon_name)
-    if path:
-        icon = QIcon(path)
-        if not icon.isNull():
-            return icon
-
-    app = QApplication.instance()
-    style = app.style() if app is not None else None
-    if style is None:
-        return QIcon()
-
-    fallback_names = {
-        "app_icon.png": "SP_ComputerIcon",
-        "logo.png": "SP_ComputerIcon",
-        "menu.png": "SP_TitleBarMenuButton",
-        "dashboard.png": "SP_ComputerIcon",
-        "products.png": "SP_DirIcon",
-        "service.png": "SP_FileIcon",
-        "sales.png": "SP_DialogOkButton",
-        "customers.png": "SP_DirHomeIcon",
-        "reports.png": "SP_FileDialogInfoView",
-        "settings.png": "SP_FileDialogDetailedView",
-        "logout.png": "SP_DialogCloseButton",
-        "new_sale.png": "SP_DialogOkButton",
-        "add_product.png": "SP_FileDialogNewFolder",
-        "add.png": "SP_FileDialogNewFolder",
-        "categories.png": "SP_DirIcon",
-        "edit.png": "SP_FileDialogContentsView",
-        "delete.png": "SP_TrashIcon",
-        "inventory.png": "SP_DirOpenIcon",
-        "orders.png": "SP_FileDialogListView",
-        "refresh.png": "SP_BrowserReload",
-        "receipt.png": "SP_FileIcon",
-        "payment.png": "SP_DialogApplyButton",
-        "report.png": "SP_FileDialogInfoView",
-        "export.png": "SP_DialogSaveButton",
-    }
-
-    sp_name = fallback_names.get(icon_name, "SP_FileIcon")
-    sp = getattr(QStyle.StandardPixmap, sp_name, QStyle.StandardPixmap.SP_FileIcon)
-    return style.standardIcon(sp)
+    from .icons import icon_registry
+    return icon_registry.icon(icon_name)
 
 
 def uploads_dir() -> Path:
@@ -114,17 +54,14 @@ def copy_image_to_uploads(source_path: str) -> str:
 
 def format_currency(amount) -> str:
     try:
-        if amount is None:
-            return "₱0.00"
-        # Use Decimal rounding to avoid floating point surprises
-        dec = round_money(amount)
-        value = float(dec)
-        return f"₱{value:,.2f}"
+        return currency_formatter.format(amount)
     except Exception:
-        return "₱0.00"
+        return currency_formatter.format_cents(0)
 
 
 PH_VAT_RATE = Decimal("0.12")
+# Same rate in basis points, for Money.vat_breakdown
+PH_VAT_RATE_BP = int(PH_VAT_RATE * 10000)
 
 
 def _to_decimal(value) -> Decimal:
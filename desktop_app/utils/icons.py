@@ -0,0 +1,188 @@
+"""Icon registry: scan the icon directories once and memoize QIcon instances.
+
+``helpers.get_icon_path`` and ``helpers.load_icon`` delegate here. After
+``warm_up()`` every lookup is a dict hit; icons are decoded into memory once,
+so nothing touches the disk again.
+
+Icons can also be shipped as a compiled Qt resource (see
+``python -m desktop_app.tools.build_icons``). Point POS_ICON_RCC at the .rcc
+file and the registry serves icons from it instead of the directories.
+"""
+
+import os
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from .helpers import project_root
+
+ICON_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".bmp"}
+RESOURCE_PREFIX = "/icons"
+
+# QStyle standard pixmaps used when an icon file is missing.
+FALLBACK_NAMES = {
+    "app_icon.png": "SP_ComputerIcon",
+    "logo.png": "SP_ComputerIcon",
+    "menu.png": "SP_TitleBarMenuButton",
+    "dashboard.png": "SP_ComputerIcon",
+    "products.png": "SP_DirIcon",
+    "service.png": "SP_FileIcon",
+    "sales.png": "SP_DialogOkButton",
+    "customers.png": "SP_DirHomeIcon",
+    "reports.png": "SP_FileDialogInfoView",
+    "settings.png": "SP_FileDialogDetailedView",
+    "logout.png": "SP_DialogCloseButton",
+    "new_sale.png": "SP_DialogOkButton",
+    "add_product.png": "SP_FileDialogNewFolder",
+    "add.png": "SP_FileDialogNewFolder",
+    "categories.png": "SP_DirIcon",
+    "edit.png": "SP_FileDialogContentsView",
+    "delete.png": "SP_TrashIcon",
+    "inventory.png": "SP_DirOpenIcon",
+    "orders.png": "SP_FileDialogListView",
+    "refresh.png": "SP_BrowserReload",
+    "receipt.png": "SP_FileIcon",
+    "payment.png": "SP_DialogApplyButton",
+    "report.png": "SP_FileDialogInfoView",
+    "export.png": "SP_DialogSaveButton",
+    "import.png": "SP_DialogOpenButton",
+}
+
+
+def icon_dirs(root: Path = None):
+    """Directories searched for icons, highest priority first."""
+    root = root or project_root()
+    return [
+        root / "static" / "icons",
+        root / "static",
+        root / "desktop_app" / "static" / "icons",
+        root / "desktop_app" / "static",
+    ]
+
+
+class IconRegistry:
+    def __init__(self, root: Path = None):
+        self.root = root
+        self._paths = None
+        self._icons = {}
+        self._fallbacks = {}
+
+    def scan(self):
+        """Index every icon file once; earlier directories win on name clashes."""
+        paths = {}
+        for directory in icon_dirs(self.root):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_file() and Path(entry.name).suffix.lower() in ICON_EXTENSIONS:
+                    paths.setdefault(entry.name, entry.path)
+        self._paths = paths
+        return paths
+
+    def load_resource(self, rcc_path: str) -> bool:
+        """Register a compiled .rcc and serve icons from it."""
+        from PyQt6.QtCore import QDir, QResource
+
+        if not rcc_path or not QResource.registerResource(rcc_path):
+            return False
+        prefix = f":{RESOURCE_PREFIX}"
+        paths = dict(self._paths or {})
+        for name in QDir(prefix).entryList(QDir.Filter.Files):
+            paths[name] = f"{prefix}/{name}"
+        self._paths = paths
+        self._icons.clear()
+        return True
+
+    def names(self):
+        if self._paths is None:
+            self.scan()
+        return sorted(self._paths)
+
+    def path(self, icon_name: str) -> str:
+        if not icon_name:
+            return ""
+        if self._paths is None:
+            self.scan()
+        return self._paths.get(icon_name, "")
+
+    def icon(self, icon_name: str):
+        """Return a shared QIcon for ``icon_name`` (None if Qt is unavailable)."""
+        cached = self._icons.get(icon_name)
+        if cached is not None:
+            return cached
+
+        try:
+            from PyQt6.QtGui import QIcon, QPixmap
+        except Exception:
+            return None
+
+        if not icon_name:
+            return QIcon()
+
+        path = self.path(icon_name)
+        if path:
+            # Decode now so later renders never go back to the file.
+            pixmap = QPixmap(path)
+            if not pixmap.isNull():
+                icon = QIcon(pixmap)
+                self._icons[icon_name] = icon
+                return icon
+
+        icon = self.fallback(FALLBACK_NAMES.get(icon_name, "SP_FileIcon"))
+        if icon is not None and not icon.isNull():
+            self._icons[icon_name] = icon
+        return icon
+
+    def fallback(self, sp_name: str):
+        cached = self._fallbacks.get(sp_name)
+        if cached is not None:
+            return cached
+
+        from PyQt6.QtGui import QIcon
+        from PyQt6.QtWidgets import QApplication, QStyle
+
+        app = QApplication.instance()
+        style = app.style() if app is not None else None
+        if style is None:
+            # Not cached: a style may exist by the next call.
+            return QIcon()
+
+        sp = getattr(QStyle.StandardPixmap, sp_name, QStyle.StandardPixmap.SP_FileIcon)
+        icon = style.standardIcon(sp)
+        self._fallbacks[sp_name] = icon
+        return icon
+
+    def warm_up(self):
+        """Scan, register POS_ICON_RCC if set, and build every known icon."""
+        self.scan()
+        rcc = os.getenv('POS_ICON_RCC', '')
+        if rcc:
+            self.load_resource(rcc)
+        for name in set(self._paths) | set(FALLBACK_NAMES):
+            self.icon(name)
+
+    def clear(self):
+        self._paths = None
+        self._icons.clear()
+        self._fallbacks.clear()
+
+    def write_qrc(self, qrc_path: str) -> int:
+        """Write a .qrc listing every scanned icon; returns the number of files."""
+        if self._paths is None:
+            self.scan()
+        base = Path(qrc_path).resolve().parent
+        lines = ["<!DOCTYPE RCC>", '<RCC version="1.0">', f'<qresource prefix="{RESOURCE_PREFIX}">']
+        count = 0
+        for name, path in sorted(self._paths.items()):
+            if path.startswith(":"):
+                continue
+            rel = os.path.relpath(path, base).replace(os.sep, "/")
+            lines.append(f'    <file alias="{escape(name)}">{escape(rel)}</file>')
+            count += 1
+        lines.extend(["</qresource>", "</RCC>", ""])
+        Path(qrc_path).write_text("\n".join(lines), encoding="utf-8")
+        return count
+
+
+icon_registry = IconRegistry()
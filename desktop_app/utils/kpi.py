@@ -0,0 +1,130 @@
+"""Time-bucketed KPI engine for sliding-window dashboard numbers."""
+
+from array import array
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from .money import Money
+
+_EPOCH = datetime(1970, 1, 1)
+# Products at or below this stock count as low (dashboard and reports)
+LOW_STOCK_THRESHOLD = 10
+
+
+def hour_index(when: datetime) -> int:
+    """Whole hours since the epoch (naive UTC datetimes)."""
+    return int((when - _EPOCH).total_seconds() // 3600)
+
+
+class WindowTotals(NamedTuple):
+    sales_cents: int
+    orders: int
+    customers: int
+
+
+class KpiComparison(NamedTuple):
+    current: WindowTotals
+    previous: WindowTotals
+
+    def delta(self, field: str) -> Optional[float]:
+        """Percent change of ``field`` versus the previous period (None if no baseline)."""
+        prev = getattr(self.previous, field)
+        if not prev:
+            return None
+        return (getattr(self.current, field) - prev) * 100.0 / prev
+
+
+def format_delta(pct: Optional[float], suffix: str = "") -> str:
+    if pct is None:
+        return f"new{suffix}"
+    arrow = "↑" if pct >= 0 else "↓"
+    return f"{arrow} {abs(pct):.1f}%{suffix}"
+
+
+class HourlyBuckets:
+    """Ring of per-hour sales, order and distinct-customer buckets.
+
+    Sales (in cents) and order counts live in flat integer arrays; each slot
+    also remembers which hour it holds so stale slots from a previous lap of
+    the ring read as empty. Window queries cost O(hours in the window)
+    regardless of how many transactions fell into them.
+    """
+
+    def __init__(self, hours: int = 61 * 24):
+        self.hours = hours
+        self._stamp = array('q', [-1]) * hours
+        self._sales = array('q', [0]) * hours
+        self._orders = array('q', [0]) * hours
+        self._customers = [None] * hours
+
+    def _slot(self, hour: int, create: bool):
+        i = hour % self.hours
+        if self._stamp[i] != hour:
+            if not create:
+                return None
+            self._stamp[i] = hour
+            self._sales[i] = 0
+            self._orders[i] = 0
+            self._customers[i] = None
+        return i
+
+    def add(self, when: datetime, sales_cents: int, orders: int = 1, customers=()):
+        i = self._slot(hour_index(when), create=True)
+        self._sales[i] += int(sales_cents)
+        self._orders[i] += int(orders)
+        names = [c for c in customers if c is not None]
+        if names:
+            if self._customers[i] is None:
+                self._customers[i] = set()
+            self._customers[i].update(names)
+
+    def totals(self, start_hour: int, end_hour: int) -> WindowTotals:
+        """Sum the half-open hour range [start_hour, end_hour)."""
+        start_hour = max(start_hour, end_hour - self.hours)
+        sales = orders = 0
+        names = set()
+        for hour in range(start_hour, end_hour):
+            i = self._slot(hour, create=False)
+            if i is None:
+                continue
+            sales += self._sales[i]
+            orders += self._orders[i]
+            if self._customers[i]:
+                names |= self._customers[i]
+        return WindowTotals(sales, orders, len(names))
+
+    def compare(self, start_hour: int, end_hour: int, prev_start_hour: int) -> KpiComparison:
+        """Compare [start, end) against a window of equal length from ``prev_start_hour``."""
+        length = end_hour - start_hour
+        return KpiComparison(
+            self.totals(start_hour, end_hour),
+            self.totals(prev_start_hour, prev_start_hour + length),
+        )
+
+    def last_days(self, days: int, now: datetime = None) -> KpiComparison:
+        end = hour_index(now or datetime.utcnow()) + 1
+        start = end - days * 24
+        return self.compare(start, end, start - days * 24)
+
+    def today(self, now: datetime = None) -> KpiComparison:
+        """Since local midnight, against the same hours yesterday."""
+        now_utc = now or datetime.utcnow()
+        local_now = datetime.now() if now is None else now
+        midnight_utc = now_utc - (local_now - local_now.replace(hour=0, minute=0, second=0, microsecond=0))
+        start = hour_index(midnight_utc)
+        end = hour_index(now_utc) + 1
+        return self.compare(start, end, start - 24)
+
+    def clear(self):
+        for i in range(self.hours):
+            self._stamp[i] = -1
+            self._customers[i] = None
+
+
+def to_cents(amount) -> int:
+    return Money.of(amount).cents
+
+
+def history_start(days: int, now: datetime = None) -> datetime:
+    """Oldest timestamp needed to compare the last ``days`` with the period before."""
+    return (now or datetime.utcnow()) - timedelta(days=2 * days, hours=1)
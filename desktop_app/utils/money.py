@@ -0,0 +1,153 @@
+"""Integer-cents money value type.
+
+Prices come out of the database as Decimal (or float on some drivers). Cart
+totals, checkout, receipts and reports used to bounce them through
+``Decimal(str(...))``, ``float()`` and ``round_money`` on every update.
+``Money`` converts once at the edge, rounding half-up to the cent like
+``round_money``. After that, sums, quantities and VAT are plain integer
+arithmetic and therefore exact.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from functools import total_ordering
+
+_CENT = Decimal("0.01")
+_new = object.__new__
+
+
+def div_half_up(numerator: int, denominator: int) -> int:
+    """Integer division rounding halves away from zero (Decimal ROUND_HALF_UP)."""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    if numerator < 0:
+        return -((-numerator * 2 + denominator) // (denominator * 2))
+    return (numerator * 2 + denominator) // (denominator * 2)
+
+
+def _money(cents: int) -> "Money":
+    # Skips __init__'s int() check; the hot paths already hold an int.
+    m = _new(Money)
+    m.cents = cents
+    return m
+
+
+@total_ordering
+class Money:
+    """An amount in whole cents; treat it as immutable. ``Money.of`` converts."""
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int = 0):
+        self.cents = int(cents)
+
+    @staticmethod
+    def of(amount) -> "Money":
+        """Convert a Decimal, float, int, str or None (as zero) amount in pesos."""
+        cls = type(amount)
+        if cls is Decimal:
+            return _money(int(amount.quantize(_CENT, ROUND_HALF_UP).scaleb(2)))
+        if cls is Money:
+            return amount
+        if amount is None:
+            return ZERO
+        if cls is int:
+            return _money(amount * 100)
+        if isinstance(amount, Money):
+            return amount
+        # str() first, so 0.1 means 0.10 and not the nearest binary float.
+        return _money(int(Decimal(str(amount)).quantize(_CENT, ROUND_HALF_UP).scaleb(2)))
+
+    @staticmethod
+    def sum(amounts) -> "Money":
+        return _money(sum(Money.of(a).cents for a in amounts))
+
+    @staticmethod
+    def sum_lines(lines) -> "Money":
+        """Total of ``(price, qty)`` pairs, summed as plain ints."""
+        of = Money.of
+        return _money(sum(of(price).cents * int(qty) for price, qty in lines))
+
+    def to_decimal(self) -> Decimal:
+        """Two-place Decimal, e.g. for Numeric columns."""
+        return Decimal(self.cents).scaleb(-2)
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __int__(self):
+        return self.cents // 100 if self.cents >= 0 else -(-self.cents // 100)
+
+    def __add__(self, other):
+        if type(other) is Money:
+            return _money(self.cents + other.cents)
+        if other == 0:
+            return self
+        return NotImplemented
+
+    __radd__ = __add__  # lets sum() start from 0
+
+    def __sub__(self, other):
+        if type(other) is Money:
+            return _money(self.cents - other.cents)
+        return NotImplemented
+
+    def __mul__(self, qty):
+        if type(qty) is int:
+            return _money(self.cents * qty)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return _money(-self.cents)
+
+    def __abs__(self):
+        return _money(abs(self.cents))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.cents)
+
+    def divide(self, n: int) -> "Money":
+        """Share of ``n`` equal parts, rounded half-up (e.g. an average order)."""
+        return _money(div_half_up(self.cents, n)) if n else ZERO
+
+    def percent_of(self, whole: "Money") -> float:
+        return self.cents * 100.0 / whole.cents if whole.cents else 0.0
+
+    def vat_breakdown(self, rate_bp: int, inclusive: bool = True):
+        """(vatable, vat, total) for a VAT rate in basis points (1200 = 12%).
+
+        Same results as ``helpers.compute_ph_vat_breakdown``, without Decimal.
+        """
+        cents = self.cents
+        if inclusive:
+            vatable = div_half_up(cents * 10000, 10000 + rate_bp)
+            return _money(vatable), _money(cents - vatable), self
+        vat = div_half_up(cents * rate_bp, 10000)
+        return self, _money(vat), _money(cents + vat)
+
+    def format(self) -> str:
+        """Display text in the configured currency (see ``utils.currency``)."""
+        from .currency import currency_formatter
+        return currency_formatter.format_cents(self.cents)
+
+    __str__ = format
+
+    def __repr__(self):
+        return f"Money({self.cents})"
+
+
+ZERO = Money(0)
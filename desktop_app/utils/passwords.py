@@ -0,0 +1,55 @@
+"""Password hashing with per-deployment cost parameters."""
+
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from werkzeug.security import generate_password_hash, check_password_hash
+
+load_dotenv()
+
+# Werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000".
+# Leave unset to use Werkzeug's own default.
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', '') or None
+PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', '16'))
+
+# Quick-switch PINs use a deliberately cheap hash so a cashier swap stays
+# instant; they are only accepted on a terminal that already has a session.
+PIN_HASH_METHOD = os.getenv('PIN_HASH_METHOD', 'pbkdf2:sha256:20000')
+
+
+def hash_password(password: str, method: str = None) -> str:
+    method = method or PASSWORD_HASH_METHOD
+    if method:
+        return generate_password_hash(password, method=method, salt_length=PASSWORD_SALT_LENGTH)
+    return generate_password_hash(password, salt_length=PASSWORD_SALT_LENGTH)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    if not password_hash:
+        return False
+    return check_password_hash(password_hash, password)
+
+
+@lru_cache(maxsize=None)
+def _method_prefix(method) -> str:
+    # Werkzeug expands short names ("scrypt") to their full parameter list,
+    # so hash once to learn the exact prefix new hashes will carry.
+    return hash_password("", method=method).split("$", 1)[0]
+
+
+def needs_rehash(password_hash: str, method: str = None) -> bool:
+    """True when a stored hash was made with other parameters than the current ones."""
+    if not password_hash or "$" not in password_hash:
+        return True
+    return password_hash.split("$", 1)[0] != _method_prefix(method or PASSWORD_HASH_METHOD)
+
+
+def hash_pin(pin: str) -> str:
+    return generate_password_hash(pin, method=PIN_HASH_METHOD, salt_length=PASSWORD_SALT_LENGTH)
+
+
+def verify_pin(pin_hash: str, pin: str) -> bool:
+    if not pin_hash:
+        return False
+    return check_password_hash(pin_hash, pin)
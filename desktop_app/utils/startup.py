@@ -0,0 +1,206 @@
+"""Startup tracing for the desktop app.
+
+Enable with any of:
+    POS_STARTUP_REPORT=1          print a span table to stderr
+    POS_STARTUP_TRACE=path.json   write a machine-readable report
+    --trace-startup[=path.json]   same as POS_STARTUP_TRACE (default startup_trace.json)
+
+The tracer records timed spans for the start-up phases, the time spent
+importing each module and the moment the first window is painted. With
+POS_STARTUP_EXIT=1 the app quits right after the report is written, which
+is what ``python -m desktop_app.bench.startup_budget`` relies on.
+
+This module must stay free of Qt imports so it can be configured before
+PyQt6 is loaded.
+"""
+
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_TRACE_PATH = "startup_trace.json"
+
+
+class _TimedLoader:
+    """Loader proxy that measures ``exec_module`` for a single module."""
+
+    def __init__(self, loader, timer, name):
+        self._loader = loader
+        self._timer = timer
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = self._timer._import_stack
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self._timer.imports.append((self._name, elapsed, elapsed - children))
+            # Hand the real loader back so nothing outlives the trace.
+            module.__loader__ = self._loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self._loader
+
+
+class _ImportTimer:
+    """Meta path hook that wraps loaders found by the other finders."""
+
+    def __init__(self, timer):
+        self._timer = timer
+        self._thread = threading.get_ident()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if threading.get_ident() != self._thread:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._timer, fullname)
+        return spec
+
+
+class StartupTimer:
+    """Collects named, timed spans relative to process start-up."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.enabled = os.getenv('POS_STARTUP_REPORT', '') not in ('', '0')
+        self.trace_path = os.getenv('POS_STARTUP_TRACE', '') or None
+        self.exit_when_done = os.getenv('POS_STARTUP_EXIT', '') not in ('', '0')
+        self.spans = []
+        self.imports = []
+        self.first_paint = None
+        self.finished = False
+        self._import_stack = []
+        self._import_hook = None
+        self._paint_filter = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.enabled or self.trace_path)
+
+    def configure(self, argv=None):
+        """Read ``--trace-startup[=path]`` from argv (removing it) and start import timing."""
+        argv = sys.argv if argv is None else argv
+        for arg in list(argv[1:]):
+            if arg == "--trace-startup" or arg.startswith("--trace-startup="):
+                _, _, path = arg.partition("=")
+                self.trace_path = path or self.trace_path or DEFAULT_TRACE_PATH
+                argv.remove(arg)
+        if self.active and self._import_hook is None:
+            self._import_hook = _ImportTimer(self)
+            sys.meta_path.insert(0, self._import_hook)
+        return self
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((name, start - self.origin, end - start))
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.spans.append((name, now - self.origin, 0.0))
+
+    def watch_first_paint(self, widget, timeout_ms=10000):
+        """Record when ``widget`` first paints, then finish the trace."""
+        if not self.active or self._paint_filter is not None:
+            return
+
+        from PyQt6.QtCore import QEvent, QObject, QTimer
+
+        tracer = self
+
+        class _FirstPaintFilter(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Type.Paint and tracer.first_paint is None:
+                    tracer.first_paint = time.perf_counter() - tracer.origin
+                    tracer.mark("first_paint")
+                    obj.removeEventFilter(self)
+                    QTimer.singleShot(0, tracer.finish)
+                return False
+
+        self._paint_filter = _FirstPaintFilter(widget)
+        widget.installEventFilter(self._paint_filter)
+        # Headless platforms may never paint; don't hang a budget run.
+        QTimer.singleShot(timeout_ms, self.finish)
+
+    def to_dict(self) -> dict:
+        imports = sorted(self.imports, key=lambda i: i[1], reverse=True)
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "total_ms": (time.perf_counter() - self.origin) * 1000.0,
+            "first_paint_ms": None if self.first_paint is None else self.first_paint * 1000.0,
+            "import_ms": sum(i[2] for i in self.imports) * 1000.0,
+            "spans": [
+                {"name": name, "start_ms": start * 1000.0, "duration_ms": duration * 1000.0}
+                for name, start, duration in self.spans
+            ],
+            "imports": [
+                {"module": name, "cumulative_ms": cum * 1000.0, "self_ms": own * 1000.0}
+                for name, cum, own in imports
+            ],
+        }
+
+    def report(self) -> str:
+        lines = [f"{'span':<32}{'start ms':>10}{'duration ms':>13}"]
+        for name, start, duration in self.spans:
+            lines.append(f"{name:<32}{start * 1000:>10.1f}{duration * 1000:>13.1f}")
+        if self.imports:
+            lines.append("")
+            lines.append(f"{'slowest imports (self)':<40}{'self ms':>10}{'cum ms':>10}")
+            for name, cum, own in sorted(self.imports, key=lambda i: i[2], reverse=True)[:15]:
+                lines.append(f"{name:<40}{own * 1000:>10.1f}{cum * 1000:>10.1f}")
+        return "\n".join(lines)
+
+    def print_report(self, stream=None):
+        if self.enabled:
+            print(self.report(), file=stream or sys.stderr)
+
+    def finish(self):
+        """Stop import timing, emit the report(s) and optionally quit."""
+        if self.finished or not self.active:
+            return
+        self.finished = True
+
+        if self._import_hook is not None and self._import_hook in sys.meta_path:
+            sys.meta_path.remove(self._import_hook)
+
+        self.print_report()
+        if self.trace_path:
+            with open(self.trace_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2)
+
+        if self.exit_when_done:
+            from PyQt6.QtWidgets import QApplication
+            app = QApplication.instance()
+            if app is not None:
+                app.quit()
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,198 @@
+from PyQt6.QtWidgets import (
+    QFileDialog, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QMessageBox,
+    QProgressBar, QPushButton, QTableWidgetItem, QWidget,
+)
+from PyQt6.QtCore import pyqtSignal
+
+from ...services import importer
+from ..widgets import ActionButton, ModernDialog, ModernTable
+from ..workers import DbWorker
+
+# Rows listed in the dialog; the saved report has all of them.
+MAX_SHOWN = 1000
+
+
+class ImportWorker(DbWorker):
+    """Runs a CSV import (or its dry run) so the GUI stays responsive."""
+
+    progress = pyqtSignal(int, int)
+    cancelled = pyqtSignal(object)
+
+    def __init__(self, path, user_id, dry_run, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.user_id = user_id
+        self.dry_run = dry_run
+
+    def work(self, session):
+        return importer.import_products(
+            session, self.path, self.user_id, dry_run=self.dry_run,
+            progress=self.progress.emit,
+            cancelled=self.is_cancelled,
+        )
+
+    def handle_error(self, error):
+        if isinstance(error, importer.ImportCancelled):
+            self.cancelled.emit(error.report)
+        else:
+            super().handle_error(error)
+
+
+class ImportDialog(ModernDialog):
+    """Preview (dry run) and import products from a CSV file."""
+
+    def __init__(self, user, parent=None):
+        super().__init__("Import Products", parent)
+        self.setMinimumSize(760, 520)
+        self.user = user
+        self.report = None
+        # True once anything may have been written, so the caller reloads
+        self.imported = False
+        self._worker = None
+        self._build_ui()
+
+    def _build_ui(self):
+        file_row = QWidget()
+        file_layout = QHBoxLayout(file_row)
+        file_layout.setContentsMargins(0, 0, 0, 0)
+        self.path_input = QLineEdit()
+        self.path_input.setPlaceholderText("CSV with columns: " + ", ".join(importer.COLUMNS))
+        self.path_input.textChanged.connect(self._update_buttons)
+        browse_btn = QPushButton("Browse...")
+        browse_btn.clicked.connect(self.browse)
+        file_layout.addWidget(self.path_input)
+        file_layout.addWidget(browse_btn)
+
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
+
+        self.summary_label = QLabel("Preview shows what would change without saving anything.")
+        self.summary_label.setWordWrap(True)
+
+        self.table = ModernTable()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(["Line", "SKU", "Action", "Details"])
+        header = self.table.horizontalHeader()
+        for col in range(3):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+
+        self.add_form_fields([
+            ("CSV File", file_row),
+            ("", self.progress),
+            ("", self.summary_label),
+            ("Changes", self.table),
+        ])
+
+        buttons = QHBoxLayout()
+        self.save_btn = QPushButton("Save Report...")
+        self.save_btn.clicked.connect(self.save_report)
+        buttons.addWidget(self.save_btn)
+        buttons.addStretch()
+        self.preview_btn = ActionButton("Preview", "refresh.png", "#2196f3")
+        self.preview_btn.clicked.connect(lambda: self.run(dry_run=True))
+        buttons.addWidget(self.preview_btn)
+        self.import_btn = ActionButton("Import", "import.png", "#00b050")
+        self.import_btn.clicked.connect(lambda: self.run(dry_run=False))
+        buttons.addWidget(self.import_btn)
+        self.close_btn = ActionButton("Close", color="#f44336")
+        self.close_btn.clicked.connect(self.reject)
+        buttons.addWidget(self.close_btn)
+        self.layout.addLayout(buttons)
+        self._update_buttons()
+
+    def _update_buttons(self, *_):
+        running = self._worker is not None
+        has_path = bool(self.path_input.text().strip())
+        self.preview_btn.setEnabled(has_path and not running)
+        self.import_btn.setEnabled(has_path and not running)
+        self.save_btn.setEnabled(self.report is not None and not running)
+        self.path_input.setEnabled(not running)
+        self.close_btn.setText("Cancel" if running else "Close")
+
+    def browse(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Products", "", "CSV Files (*.csv);;All Files (*)")
+        if path:
+            self.path_input.setText(path)
+
+    def run(self, dry_run):
+        if self._worker is not None:
+            return
+        path = self.path_input.text().strip()
+        if not dry_run:
+            reply = QMessageBox.question(
+                self, "Import Products",
+                "Create and update products from this file now?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No,
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+            self.imported = True
+
+        self.progress.setRange(0, 0)
+        self.progress.setVisible(True)
+        self.summary_label.setText("Previewing..." if dry_run else "Importing...")
+        worker = ImportWorker(path, self.user.id, dry_run, self)
+        worker.progress.connect(self._on_progress)
+        worker.succeeded.connect(self._on_finished)
+        worker.cancelled.connect(self._on_cancelled)
+        worker.failed.connect(self._on_failed)
+        self._worker = worker
+        self._update_buttons()
+        worker.start()
+
+    def _on_progress(self, done, total):
+        self.progress.setRange(0, max(total, 1))
+        self.progress.setValue(done)
+
+    def _end_run(self):
+        self.progress.setVisible(False)
+        if self._worker is not None:
+            self._worker.wait()
+            self._worker.deleteLater()
+            self._worker = None
+        self._update_buttons()
+
+    def _show_report(self, report, prefix=""):
+        self.report = report
+        self._end_run()
+        results = report.results[:MAX_SHOWN]
+        self.table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            for col, value in enumerate(result):
+                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        text = prefix + report.summary()
+        if len(report.results) > MAX_SHOWN:
+            text += f" Showing the first {MAX_SHOWN} of {len(report.results)} rows; save the report for all of them."
+        self.summary_label.setText(text)
+
+    def _on_finished(self, report):
+        self._show_report(report)
+
+    def _on_cancelled(self, report):
+        prefix = "Cancelled. " if report.dry_run else "Cancelled; the rows below were already imported. "
+        self._show_report(report, prefix)
+
+    def _on_failed(self, message):
+        self._end_run()
+        self.summary_label.setText("")
+        QMessageBox.critical(self, "Import Products", message)
+
+    def save_report(self):
+        if self.report is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Report", "import_report.csv", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            self.report.write_csv(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Save Report", f"Failed to save: {e}")
+
+    def reject(self):
+        if self._worker is not None:
+            # Stops before the next chunk; the dialog stays open to show how far it got
+            self._worker.cancel()
+            return
+        super().reject()
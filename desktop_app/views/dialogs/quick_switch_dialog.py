@@ -0,0 +1,64 @@
+from PyQt6.QtWidgets import QLineEdit, QListWidget, QListWidgetItem, QMessageBox
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QIntValidator
+
+from ...controllers import user_roster
+from ..widgets import ModernDialog
+
+
+class QuickSwitchDialog(ModernDialog):
+    """Pick a cashier from the cached roster and confirm with their PIN."""
+
+    def __init__(self, current_user_id=None, parent=None):
+        super().__init__("Switch Cashier", parent)
+        self.setMinimumWidth(360)
+        self.user_id = None
+        self._build_ui(current_user_id)
+
+    def _build_ui(self, current_user_id):
+        self.user_list = QListWidget()
+        for entry in user_roster.entries():
+            if entry.id == current_user_id:
+                continue
+            item = QListWidgetItem(f"{entry.username} ({entry.role})")
+            item.setData(Qt.ItemDataRole.UserRole, entry.id)
+            if user_roster.is_locked(entry.id):
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEnabled)
+                item.setToolTip("Too many wrong PINs - sign in with password")
+            self.user_list.addItem(item)
+        self.user_list.itemDoubleClicked.connect(lambda _: self.pin_input.setFocus())
+
+        self.pin_input = QLineEdit()
+        self.pin_input.setPlaceholderText("PIN")
+        self.pin_input.setEchoMode(QLineEdit.EchoMode.Password)
+        self.pin_input.setValidator(QIntValidator(0, 99999999, self))
+        self.pin_input.returnPressed.connect(self.accept)
+
+        self.add_form_fields([
+            ("Cashier", self.user_list),
+            ("PIN", self.pin_input),
+        ])
+        self.add_buttons("Switch", "Cancel")
+
+        if self.user_list.count():
+            self.user_list.setCurrentRow(0)
+        self.pin_input.setFocus()
+
+    def accept(self):
+        item = self.user_list.currentItem()
+        if item is None:
+            QMessageBox.warning(self, "Switch Cashier", "No cashiers with a PIN are set up.")
+            return
+
+        user_id = item.data(Qt.ItemDataRole.UserRole)
+        if user_roster.verify_pin(user_id, self.pin_input.text()) is None:
+            self.pin_input.clear()
+            if user_roster.is_locked(user_id):
+                QMessageBox.warning(self, "Switch Cashier", "Too many wrong PINs. Please sign in with your password.")
+                super().reject()
+            else:
+                QMessageBox.warning(self, "Switch Cashier", "Wrong PIN.")
+            return
+
+        self.user_id = user_id
+        super().accept()
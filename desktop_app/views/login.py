@@ -3,107 +3,46 @@
     QLineEdit, QPushButton, QMessageBox,
     QFrame
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QPropertyAnimation, QEasingCurve, QPoint
+from PyQt6.QtCore import Qt, pyqtSignal, QPropertyAnimation, QEasingCurve, QPoint, QThread
 from PyQt6.QtGui import QPixmap
 from ..models import User
-from ..controllers import db_session
+from ..controllers import db_session, authenticate
 from ..utils.helpers import get_icon_path, load_icon
 
 
+class AuthWorker(QThread):
+    """Verifies credentials off the GUI thread so hashing never blocks the UI."""
+
+    # Emits the authenticated user id, or None for bad credentials.
+    finished_auth = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, username, password, parent=None):
+        super().__init__(parent)
+        self.username = username
+        self.password = password
+
+    def run(self):
+        try:
+            self.finished_auth.emit(authenticate(self.username, self.password))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
 class LoginWindow(QWidget):
     login_successful = pyqtSignal(object)
 
     def __init__(self):
         super().__init__()
         self.quit_on_close = True
+        self.setObjectName("LoginWindow")
+        self._auth_worker = None
         self.setWindowTitle("POS System ΓÇô Login")
         self.setFixedSize(720, 420)
 
         self.setup_ui()
 
     def setup_ui(self):
-        # =======================
-        # GLOBAL STYLES
-        # =======================
-        self.setStyleSheet("""
-            QWidget {
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-
-            QFrame#LeftPanel {
-                background-color: #000000
-
-            }
-
-            QLabel#SystemTitle {
-                color: white;
-                font-size: 26px;
-                font-weight: 700;
-            }
-
-            QLabel#SystemSubtitle {
-                color: rgba(255,255,255,0.85);
-                font-size: 13px;
-            }
-
-            QLabel#FooterText {
-                color: rgba(255,255,255,0.6);
-                font-size: 11px;
-            }
-
-            QFrame#RightPanel {
-                background-color: white;
-            }
-
-            QLabel#LoginTitle {
-                font-size: 22px;
-                font-weight: 700;
-                color: #111827;
-            }
-
-            QLabel#LoginSubtitle {
-                font-size: 13px;
-                color: #6b7280;
-            }
-
-            QLineEdit {
-                height: 42px;
-                border-radius: 6px;
-                border: 1px solid #d1d5db;
-                padding-left: 14px;
-                font-size: 14px;
-            }
-
-            QLineEdit:focus {
-                border: 1px solid #1677ff;
-            }
-
-            QPushButton#LoginButton {
-                height: 44px;
-                border-radius: 6px;
-                background-color: #1677ff;
-                color: white;
-                font-size: 14px;
-                font-weight: 600;
-                border: none;
-            }
-
-            QPushButton#LoginButton:hover {
-                background-color: #0f63d1;
-            }
-
-            QPushButton#LinkButton {
-                background: transparent;
-                border: none;
-                color: #1677ff;
-                font-size: 12px;
-            }
-
-            QPushButton#LinkButton:hover {
-                text-decoration: underline;
-            }
-        """)
-
         main_layout = QHBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
@@ -193,12 +132,12 @@ class LoginWindow(QWidget):
 
         right_layout.addSpacing(22)
 
-        login_btn = QPushButton("Sign In")
-        login_btn.setObjectName("LoginButton")
-        login_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        login_btn.clicked.connect(self.handle_login)
-        self.password_input.returnPressed.connect(login_btn.click)
-        right_layout.addWidget(login_btn)
+        self.login_btn = QPushButton("Sign In")
+        self.login_btn.setObjectName("LoginButton")
+        self.login_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.login_btn.clicked.connect(self.handle_login)
+        self.password_input.returnPressed.connect(self.login_btn.click)
+        right_layout.addWidget(self.login_btn)
 
         right_layout.addSpacing(14)
 
@@ -220,6 +159,9 @@ class LoginWindow(QWidget):
     # LOGIN LOGIC
     # =======================
     def handle_login(self):
+        if self._auth_worker is not None:
+            return
+
         username = self.username_input.text().strip()
         password = self.password_input.text()
 
@@ -227,15 +169,36 @@ class LoginWindow(QWidget):
             self.show_error("Please enter both username and password.")
             return
 
-        user = db_session.query(User).filter(User.username == username).first()
+        self.set_busy(True)
+        self._auth_worker = AuthWorker(username, password, self)
+        self._auth_worker.finished_auth.connect(self.on_auth_finished)
+        self._auth_worker.failed.connect(self.on_auth_failed)
+        self._auth_worker.finished.connect(self._auth_worker.deleteLater)
+        self._auth_worker.start()
 
-        if user and user.check_password(password):
+    def on_auth_finished(self, user_id):
+        self._auth_worker = None
+        self.set_busy(False)
+
+        user = db_session.get(User, user_id) if user_id is not None else None
+        if user:
             self.login_successful.emit(user)
         else:
             self.show_error("Invalid username or password.")
             self.password_input.clear()
             self.shake_animation()
 
+    def on_auth_failed(self, message):
+        self._auth_worker = None
+        self.set_busy(False)
+        self.show_error(f"Could not sign in: {message}")
+
+    def set_busy(self, busy):
+        self.login_btn.setEnabled(not busy)
+        self.login_btn.setText("Signing in..." if busy else "Sign In")
+        self.username_input.setEnabled(not busy)
+        self.password_input.setEnabled(not busy)
+
     def handle_forgot_password(self):
         QMessageBox.information(
             self,
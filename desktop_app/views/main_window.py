@@ -1,10 +1,17 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QStackedWidget, QToolBar, QStatusBar, 
                             QPushButton, QSizePolicy, QMessageBox, QSplitter, 
-                            QListWidget, QListWidgetItem, QFrame, QToolButton)
-from PyQt6.QtCore import Qt, QSize
+                            QListWidget, QListWidgetItem, QFrame, QToolButton,
+                            QDialog)
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QAction, QIcon, QPixmap
-from ..models import User
+import os
+from ..models import Category, Product, User
+from ..controllers import db_session, dashboard_metrics, session_scope
+from ..controllers.changefeed import ChangeFeed
+from ..controllers.instrumentation import tracked
+from ..services import catalog
+from .dialogs.quick_switch_dialog import QuickSwitchDialog
 from .screens.dashboard import DashboardScreen
 from .screens.products import ProductsScreen
 from .screens.sales import SalesScreen
@@ -12,10 +19,14 @@ from .screens.customers import CustomersScreen
 from .screens.reports import ReportsScreen
 from .screens.settings import SettingsScreen
 from ..utils.helpers import get_icon_path, load_icon
+from ..utils.startup import startup_timer
 
 class MainWindow(QMainWindow):
     """Main application window that contains the main interface."""
     
+    # Product, stock and category changes from every terminal (change_log)
+    CHANGE_POLL_MS = int(os.getenv('POS_CHANGE_POLL_MS', '2000'))
+    
     def __init__(self):
         super().__init__()
         self.current_user = None
@@ -23,6 +34,20 @@ class MainWindow(QMainWindow):
         self._sidebar_collapsed = False
         self._sidebar_expanded_width = 260
         self._sidebar_collapsed_width = 72
+        # Screens are built on first navigation; see screen().
+        self._screen_factories = {
+            'dashboard': (DashboardScreen, 'Dashboard'),
+            'products': (ProductsScreen, 'Products'),
+            'sales': (SalesScreen, 'Sales'),
+            'customers': (CustomersScreen, 'Customers'),
+            'reports': (ReportsScreen, 'Reports'),
+            'settings': (SettingsScreen, 'Settings'),
+        }
+        self._screens = {}
+        self.change_feed = ChangeFeed()
+        self.change_timer = QTimer(self)
+        self.change_timer.setInterval(self.CHANGE_POLL_MS)
+        self.change_timer.timeout.connect(self.poll_changes)
         self.setWindowTitle("POS System")
         self.setMinimumSize(1024, 720)
         
@@ -34,6 +59,8 @@ class MainWindow(QMainWindow):
         self.current_user = user
         self._logging_out = False
         self.update_ui_for_user()
+        if user is not None and self.CHANGE_POLL_MS > 0:
+            self.change_timer.start()
     
     def init_ui(self):
         """Initialize the main UI components."""
@@ -56,50 +83,14 @@ class MainWindow(QMainWindow):
         content_layout = QVBoxLayout(content_widget)
         content_layout.setContentsMargins(0, 0, 0, 0)
         content_layout.setSpacing(0)
-        content_widget.setStyleSheet("""
-            QWidget#content {
-                background-color: #ffffff;
-            }
-            QTableWidget {
-                background-color: #ffffff;
-                color: #000000;
-                alternate-background-color: rgba(0, 176, 80, 0.06);
-                gridline-color: #00b050;
-                selection-background-color: #00b050;
-                selection-color: #ffffff;
-            }
-            QHeaderView::section {
-                background-color: #000000;
-                color: #ffffff;
-                border: 1px solid #00b050;
-            }
-            QPushButton {
-                font-size: 13px;
-            }
-        """)
         
         # Create toolbar
         self.toolbar = self.create_toolbar()
         content_layout.addWidget(self.toolbar)
         
-        # Create stacked widget for different screens
+        # Create stacked widget for different screens (filled lazily)
         self.stacked_widget = QStackedWidget()
         
-        # Add screens to stacked widget
-        self.dashboard_screen = DashboardScreen()
-        self.products_screen = ProductsScreen()
-        self.sales_screen = SalesScreen()
-        self.customers_screen = CustomersScreen()
-        self.reports_screen = ReportsScreen()
-        self.settings_screen = SettingsScreen()
-        
-        self.stacked_widget.addWidget(self.dashboard_screen)
-        self.stacked_widget.addWidget(self.products_screen)
-        self.stacked_widget.addWidget(self.sales_screen)
-        self.stacked_widget.addWidget(self.customers_screen)
-        self.stacked_widget.addWidget(self.reports_screen)
-        self.stacked_widget.addWidget(self.settings_screen)
-        
         content_layout.addWidget(self.stacked_widget)
 
         self.splitter.addWidget(content_widget)
@@ -114,38 +105,6 @@ class MainWindow(QMainWindow):
         self.status_user_label = QLabel("")
         self.status_bar.addPermanentWidget(self.status_user_label)
         self.setStatusBar(self.status_bar)
-
-        self.setStyleSheet(
-            """
-            QToolBar {
-                background: #ffffff;
-                border: none;
-                border-bottom: 1px solid #00b050;
-                padding: 6px;
-                spacing: 6px;
-            }
-            QToolBar QToolButton {
-                color: #000000;
-                padding: 6px 10px;
-                border-radius: 6px;
-            }
-            QToolBar QToolButton:hover {
-                background: #00b050;
-                color: #ffffff;
-            }
-            QStatusBar {
-                background: #ffffff;
-                border-top: 1px solid #00b050;
-                padding: 6px;
-            }
-            QStatusBar QLabel {
-                color: #000000;
-            }
-            QSplitter::handle {
-                background: #00b050;
-            }
-            """
-        )
         
         # Set window icon if available
         icon = load_icon("app_icon.png")
@@ -156,61 +115,6 @@ class MainWindow(QMainWindow):
         """Create a modern sidebar navigation."""
         sidebar = QFrame()
         sidebar.setObjectName("sidebar")
-        sidebar.setStyleSheet(
-            """
-            QFrame#sidebar {
-                background-color: #000000;
-                color: #ffffff;
-            }
-            QLabel#app_name {
-                font-size: 18px;
-                font-weight: bold;
-                padding: 8px 0px;
-                color: #00b050;
-            }
-            QLabel#user_info {
-                padding: 12px;
-                border-radius: 6px;
-                background: rgba(0, 176, 80, 0.15);
-                font-size: 11px;
-                color: #e0e0e0;
-                border: 1px solid rgba(0, 176, 80, 0.25);
-            }
-            QListWidget#nav_list {
-                background: transparent;
-                border: none;
-                outline: none;
-            }
-            QListWidget#nav_list::item {
-                padding: 12px 10px;
-                margin: 4px 0px;
-                border-radius: 6px;
-                color: #cccccc;
-                icon-size: 18px;
-            }
-            QListWidget#nav_list::item:hover {
-                background: rgba(0, 176, 80, 0.2);
-                color: #ffffff;
-            }
-            QListWidget#nav_list::item:selected {
-                background: #00b050;
-                color: #000000;
-                font-weight: bold;
-            }
-            QToolButton#logout_btn {
-                padding: 10px 10px;
-                border-radius: 6px;
-                text-align: left;
-                color: #ffffff;
-                background: transparent;
-                border: 1px solid rgba(0, 176, 80, 0.2);
-            }
-            QToolButton#logout_btn:hover {
-                background: rgba(0, 176, 80, 0.25);
-                border: 1px solid rgba(0, 176, 80, 0.4);
-            }
-            """
-        )
 
         layout = QVBoxLayout(sidebar)
         layout.setContentsMargins(16, 16, 16, 16)
@@ -255,6 +159,16 @@ class MainWindow(QMainWindow):
             item.setToolTip(text.split(" ", 1)[1])  # Extract without emoji
             self.nav_list.addItem(item)
 
+        # Quick cashier switch (keeps this window and its screens alive)
+        self.switch_user_btn = QToolButton()
+        self.switch_user_btn.setObjectName("switch_user_btn")
+        self.switch_user_btn.setText("🔁 Switch User")
+        self.switch_user_btn.setIcon(load_icon("customers.png"))
+        self.switch_user_btn.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        self.switch_user_btn.setIconSize(QSize(16, 16))
+        self.switch_user_btn.clicked.connect(self.switch_user)
+        layout.addWidget(self.switch_user_btn)
+
         # Logout button
         self.logout_btn = QToolButton()
         self.logout_btn.setObjectName("logout_btn")
@@ -286,7 +200,7 @@ class MainWindow(QMainWindow):
         title_font.setPointSize(13)
         title_font.setBold(True)
         self.page_title_label.setFont(title_font)
-        self.page_title_label.setStyleSheet("color: #00b050; padding-left: 6px;")
+        self.page_title_label.setObjectName("page_title")
 
         spacer = QWidget()
         spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
@@ -307,14 +221,7 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'status_user_label'):
             self.status_user_label.setText(f"{self.current_user.username} ({self.current_user.role.upper()})")
 
-        for screen in (
-            self.dashboard_screen,
-            self.products_screen,
-            self.sales_screen,
-            self.customers_screen,
-            self.reports_screen,
-            self.settings_screen,
-        ):
+        for screen in self._screens.values():
             if hasattr(screen, 'set_user'):
                 screen.set_user(self.current_user)
 
@@ -328,19 +235,25 @@ class MainWindow(QMainWindow):
         if key:
             self.navigate_to(str(key))
 
+    def screen(self, key):
+        """Return the screen for ``key``, building it on first use."""
+        widget = self._screens.get(key)
+        if widget is None and key in self._screen_factories:
+            factory, _ = self._screen_factories[key]
+            with startup_timer.span(f"screen:{key}"):
+                widget = factory()
+                if self.current_user and hasattr(widget, 'set_user'):
+                    widget.set_user(self.current_user)
+                self.stacked_widget.addWidget(widget)
+            self._screens[key] = widget
+        return widget
+
     def navigate_to(self, key):
-        mapping = {
-            'dashboard': (self.dashboard_screen, 'Dashboard'),
-            'products': (self.products_screen, 'Products'),
-            'sales': (self.sales_screen, 'Sales'),
-            'customers': (self.customers_screen, 'Customers'),
-            'reports': (self.reports_screen, 'Reports'),
-            'settings': (self.settings_screen, 'Settings'),
-        }
-        if key not in mapping:
+        if key not in self._screen_factories:
             return
 
-        widget, title = mapping[key]
+        widget = self.screen(key)
+        title = self._screen_factories[key][1]
         self.stacked_widget.setCurrentWidget(widget)
         self.set_active_nav_button(key)
         if hasattr(self, 'page_title_label'):
@@ -348,6 +261,36 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'status_bar') and self.status_bar is not None:
             self.status_bar.showMessage(title)
 
+    @tracked()
+    def poll_changes(self):
+        """Apply product and category changes logged by any terminal."""
+        try:
+            # A fresh task session: the GUI session's transaction may still
+            # be reading an older snapshot (MySQL's REPEATABLE READ).
+            with session_scope(commit=False) as session:
+                changes = self.change_feed.poll(session)
+                if not changes:
+                    return
+                products = catalog.products_by_id(session, changes.products)
+        except Exception as e:
+            print(f"Error polling change feed: {e}")
+            return
+
+        # Objects the GUI session loaded earlier are out of date now. Ending
+        # its transaction expires them and moves it to a new snapshot.
+        if db_session.new or db_session.dirty or db_session.deleted:
+            for obj in list(db_session.identity_map.values()):
+                if isinstance(obj, (Product, Category)):
+                    db_session.expire(obj)
+        else:
+            db_session.commit()
+
+        if changes.products:
+            dashboard_metrics.products_changed()
+        for screen in self._screens.values():
+            if hasattr(screen, 'apply_changes'):
+                screen.apply_changes(changes, products)
+
     # Navigation methods
     def show_dashboard(self):
         self.navigate_to('dashboard')
@@ -398,6 +341,10 @@ class MainWindow(QMainWindow):
                 self.logout_btn.setText("")
                 self.logout_btn.setToolTip("Logout")
                 self.logout_btn.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonIconOnly)
+            if hasattr(self, 'switch_user_btn'):
+                self.switch_user_btn.setText("")
+                self.switch_user_btn.setToolTip("Switch User")
+                self.switch_user_btn.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonIconOnly)
             if hasattr(self, 'nav_list'):
                 for row in range(self.nav_list.count()):
                     item = self.nav_list.item(row)
@@ -411,6 +358,10 @@ class MainWindow(QMainWindow):
                 self.logout_btn.setText("Logout")
                 self.logout_btn.setToolTip("")
                 self.logout_btn.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+            if hasattr(self, 'switch_user_btn'):
+                self.switch_user_btn.setText("Switch User")
+                self.switch_user_btn.setToolTip("")
+                self.switch_user_btn.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
             if hasattr(self, 'nav_list'):
                 for row in range(self.nav_list.count()):
                     item = self.nav_list.item(row)
@@ -426,6 +377,24 @@ class MainWindow(QMainWindow):
         """Handle add product action."""
         self.show_products()
 
+    def switch_user(self):
+        """Swap the active cashier via PIN without tearing down the window."""
+        current_id = self.current_user.id if self.current_user else None
+        dlg = QuickSwitchDialog(current_id, self)
+        if dlg.exec() != QDialog.DialogCode.Accepted or dlg.user_id is None:
+            return
+
+        user = db_session.get(User, dlg.user_id)
+        if user is None:
+            QMessageBox.warning(self, "Switch User", "That user no longer exists.")
+            return
+
+        from PyQt6.QtWidgets import QApplication
+        app = QApplication.instance()
+        if app is not None and hasattr(app, 'current_user'):
+            app.current_user = user
+        self.set_user(user)
+
     def logout(self):
         """Handle logout action."""
         reply = QMessageBox.question(
@@ -437,6 +406,7 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.StandardButton.Yes:
             self.current_user = None
             self._logging_out = True
+            self.change_timer.stop()
             self.hide()
             from PyQt6.QtWidgets import QApplication
             app = QApplication.instance()
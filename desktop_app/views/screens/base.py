@@ -0,0 +1,82 @@
+from PyQt6.QtWidgets import QWidget
+
+from ...controllers.instrumentation import track_action
+
+
+class Screen(QWidget):
+    """Base class for main-window screens.
+
+    Screens don't touch the database while being constructed. Data is loaded
+    by ``reload_data`` the first time the screen becomes visible, and again
+    whenever it has been marked stale (e.g. by ``set_user``).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.current_user = None
+        self._data_stale = True
+
+    def set_user(self, user):
+        self.current_user = user
+        self.apply_permissions()
+        self.invalidate()
+
+    def apply_permissions(self):
+        """Enable/disable controls for ``current_user``; no data loading here."""
+
+    def invalidate(self):
+        """Mark the data stale; reloads now if visible, otherwise on next show."""
+        self._data_stale = True
+        if self.isVisible():
+            self._reload_if_stale()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._reload_if_stale()
+
+    def _reload_if_stale(self):
+        if self._data_stale:
+            self._data_stale = False
+            with track_action(f"{type(self).__name__}.reload_data"):
+                self.reload_data()
+
+    def reload_data(self):
+        """Load the screen's data from the database."""
+
+    def apply_changes(self, changes, products):
+        """Bring loaded data up to date with the change feed.
+
+        ``changes`` is a ``controllers.changefeed.Changes``; ``products`` maps
+        the ids of changed products that still exist to their current
+        ``services.catalog.ProductRow``.
+        """
+
+
+def apply_product_changes(table, changed, products, listed, fill, reload):
+    """Update a products table (ids in column 0) in place.
+
+    Rows of deleted products, and of products that no longer pass
+    ``listed(row)``, are removed. Rows of the other changed products are
+    refilled with ``fill(table_row, product_row)``. A changed product that
+    should now be listed but isn't shown needs its place in the sort order,
+    so ``reload()`` rebuilds the table instead.
+    """
+    rows = {}
+    for r in range(table.rowCount()):
+        item = table.item(r, 0)
+        if item is not None and item.text().isdigit():
+            rows[int(item.text())] = r
+    removed = []
+    for pid in changed:
+        product = products.get(pid)
+        row = rows.get(pid)
+        if product is not None and listed(product):
+            if row is None:
+                reload()
+                return
+            fill(row, product)
+            table.resizeRowToContents(row)
+        elif row is not None:
+            removed.append(row)
+    for row in sorted(removed, reverse=True):
+        table.removeRow(row)
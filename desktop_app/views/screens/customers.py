@@ -7,23 +7,24 @@ from PyQt6.QtGui import QFont
 from sqlalchemy import func, desc
 
 from ...controllers import db_session
+from ...controllers.instrumentation import tracked
 from ...models import Transaction
-from ...utils.helpers import format_currency, load_icon
+from ...utils.currency import currency_formatter
+from ...utils.helpers import load_icon
 from ..dialogs.receipt_dialog import ReceiptDialog
 from ..widgets import ModernTable, SearchBar, ActionButton, SectionHeader, IconButton
+from .base import Screen
 
 
-class CustomersScreen(QWidget):
+class CustomersScreen(Screen):
     """Customers and transactions screen with modern design."""
     
     def __init__(self):
         super().__init__()
-        self.current_user = None
         self._build_ui()
-        self.refresh_all()
 
-    def set_user(self, user):
-        self.current_user = user
+    def reload_data(self):
+        self.refresh_all()
 
     def _build_ui(self):
         """Set up the UI with modern design."""
@@ -38,7 +39,7 @@ class CustomersScreen(QWidget):
         title_font.setPointSize(24)
         title_font.setBold(True)
         title.setFont(title_font)
-        title.setStyleSheet("color: #00b050;")
+        title.setProperty("accent", "primary")
         header.addWidget(title)
         header.addStretch()
 
@@ -50,19 +51,6 @@ class CustomersScreen(QWidget):
 
         # Tabs
         self.tabs = QTabWidget()
-        self.tabs.setStyleSheet("""
-            QTabBar::tab {
-                background-color: #f5f5f5;
-                color: #333333;
-                padding: 8px 16px;
-                border: none;
-                border-bottom: 2px solid transparent;
-            }
-            QTabBar::tab:selected {
-                background-color: white;
-                border-bottom: 2px solid #00b050;
-            }
-        """)
         layout.addWidget(self.tabs, 1)
 
         # === Customers Tab ===
@@ -125,6 +113,7 @@ class CustomersScreen(QWidget):
         self.refresh_customers()
         self.refresh_transactions()
 
+    @tracked()
     def refresh_customers(self, *_):
         search = (self.customer_search.text() or "").strip().lower()
         try:
@@ -151,16 +140,18 @@ class CustomersScreen(QWidget):
                 ]
 
             self.customers_table.setRowCount(len(rows))
+            spent = currency_formatter.format_many(r.spent for r in rows)
             for i, r in enumerate(rows):
                 self.customers_table.setItem(i, 0, QTableWidgetItem(r.customer_name or ""))
                 self.customers_table.setItem(i, 1, QTableWidgetItem(r.customer_phone or ""))
                 self.customers_table.setItem(i, 2, QTableWidgetItem(str(r.orders or 0)))
-                self.customers_table.setItem(i, 3, QTableWidgetItem(format_currency(r.spent or 0)))
+                self.customers_table.setItem(i, 3, QTableWidgetItem(spent[i]))
 
             self.customers_table.resizeRowsToContents()
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
 
+    @tracked()
     def refresh_transactions(self, *_):
         search = (self.tx_search.text() or "").strip().lower()
         try:
@@ -187,12 +178,13 @@ class CustomersScreen(QWidget):
                 txs = filtered
 
             self.tx_table.setRowCount(len(txs))
+            totals = currency_formatter.format_many(t.total for t in txs)
             for row, t in enumerate(txs):
                 self.tx_table.setItem(row, 0, QTableWidgetItem(str(t.id)))
                 self.tx_table.setItem(row, 1, QTableWidgetItem(t.created_at.strftime('%Y-%m-%d %H:%M')))
                 self.tx_table.setItem(row, 2, QTableWidgetItem(t.customer_name or ""))
                 self.tx_table.setItem(row, 3, QTableWidgetItem(t.customer_phone or ""))
-                self.tx_table.setItem(row, 4, QTableWidgetItem(format_currency(t.total)))
+                self.tx_table.setItem(row, 4, QTableWidgetItem(totals[row]))
                 self.tx_table.setItem(row, 5, QTableWidgetItem(t.payment_method or ""))
 
                 btn = IconButton("receipt.png", "View receipt", 32)
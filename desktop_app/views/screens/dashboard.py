@@ -1,29 +1,51 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QFrame, QGridLayout, QSizePolicy, 
-                            QScrollArea, QGraphicsDropShadowEffect)
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QIcon, QFont
-from ...models import Transaction, Product
-from ...controllers import db_session
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta
+                            QScrollArea)
+from PyQt6.QtCore import Qt, QSize, QTimer
+from PyQt6.QtGui import QIcon, QFont, QColor
+from ...controllers import dashboard_metrics
+import os
+from datetime import datetime
 from ...utils.helpers import format_currency, load_icon
+from ...utils.kpi import format_delta
+from ..widgets import apply_shadow
+from ..theme import set_accent, set_state
+from .base import Screen
 
-class DashboardScreen(QWidget):
+class DashboardScreen(Screen):
     """Dashboard screen showing key metrics and quick actions."""
     
+    # Metrics are incremental counters, so refreshing often is cheap.
+    REFRESH_INTERVAL_MS = int(os.getenv('POS_DASHBOARD_REFRESH_MS', '15000'))
+    
     def __init__(self):
         super().__init__()
         self.setup_ui()
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.load_data)
+    
+    def reload_data(self):
         self.load_data()
     
+    def showEvent(self, event):
+        # Counters are cheap to read, so always refresh when shown.
+        self._data_stale = True
+        super().showEvent(event)
+        self.refresh_timer.start()
+    
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+    
     def setup_ui(self):
         """Set up the dashboard UI components."""
         # Main scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setFrameShape(QFrame.Shape.NoFrame)
-        scroll.setStyleSheet("QScrollArea { background-color: #f5f5f5; border: none; }")
+        scroll.setObjectName("dashboard_scroll")
         
         # Container widget
         container = QWidget()
@@ -39,46 +61,37 @@ class DashboardScreen(QWidget):
         
         # Title
         title = QLabel("Dashboard")
-        title.setStyleSheet("""
-            font-size: 32px; 
-            font-weight: 700; 
-            color: #00b050;
-            letter-spacing: -0.5px;
-        """)
+        title.setObjectName("dashboard_title")
         header_layout.addWidget(title)
         header_layout.addStretch()
         
         # Date/Time
         current_time = datetime.now().strftime("%B %d, %Y • %I:%M %p")
-        date_label = QLabel(current_time)
-        date_label.setStyleSheet("""
-            font-size: 14px; 
-            color: #666666;
-            font-weight: 500;
-        """)
-        header_layout.addWidget(date_label)
+        self.date_label = QLabel(current_time)
+        self.date_label.setObjectName("dashboard_date")
+        header_layout.addWidget(self.date_label)
         
         layout.addLayout(header_layout)
         layout.addSpacing(10)
         
         # Metrics cards section
         metrics_container = QFrame()
-        metrics_container.setStyleSheet("QFrame { background: transparent; }")
+        metrics_container.setObjectName("metrics_container")
         self.metrics_layout = QHBoxLayout(metrics_container)
         self.metrics_layout.setSpacing(20)
         
         # Create metric cards
         self.sales_card = self.create_metric_card(
-            "Total Sales", "0.00", "sales.png", "#00b050", "↑ 12.5%"
+            "Total Sales", "0.00", "sales.png", "#00b050"
         )
         self.orders_card = self.create_metric_card(
-            "Orders", "0", "orders.png", "#00b050", "↑ 8.2%"
+            "Orders", "0", "orders.png", "#00b050"
         )
         self.products_card = self.create_metric_card(
-            "Products", "0", "products.png", "#00b050", "5 low stock"
+            "Products", "0", "products.png", "#00b050"
         )
         self.customers_card = self.create_metric_card(
-            "Customers", "0", "customers.png", "#00b050", "↑ 15.3%"
+            "Customers", "0", "customers.png", "#00b050"
         )
         
         # Add cards to layout
@@ -122,13 +135,7 @@ class DashboardScreen(QWidget):
     def create_metric_card(self, title, value, icon_name, color, subtitle=""):
         """Create a metric card widget with modern design."""
         card = QFrame()
-        card.setStyleSheet(f"""
-            QFrame {{
-                background: white;
-                border-radius: 12px;
-                padding: 0px;
-            }}
-        """)
+        card.setObjectName("metric_card")
         card.setMinimumHeight(140)
         self.add_shadow(card)
         
@@ -141,19 +148,17 @@ class DashboardScreen(QWidget):
         
         # Color indicator
         color_bar = QFrame()
+        color_bar.setObjectName("metric_bar")
         color_bar.setFixedSize(4, 40)
-        color_bar.setStyleSheet(f"background-color: {color}; border-radius: 2px;")
+        set_accent(color_bar, color, f"background-color: {color}; border-radius: 2px;")
         top_layout.addWidget(color_bar)
         top_layout.addSpacing(12)
         
         # Icon
         icon_label = QLabel()
+        icon_label.setObjectName("metric_icon")
         icon_label.setFixedSize(40, 40)
-        icon_label.setStyleSheet(f"""
-            background-color: {color};
-            border-radius: 8px;
-            padding: 8px;
-        """)
+        set_accent(icon_label, color, f"background-color: {color}; border-radius: 8px; padding: 8px;")
         icon = load_icon(icon_name)
         if icon is not None and not icon.isNull():
             icon_label.setPixmap(icon.pixmap(24, 24))
@@ -165,67 +170,54 @@ class DashboardScreen(QWidget):
         
         # Title
         title_label = QLabel(title)
-        title_label.setStyleSheet("""
-            color: #666666;
-            font-size: 13px;
-            font-weight: 600;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        """)
+        title_label.setObjectName("metric_title")
         layout.addWidget(title_label)
         
         # Value
         self.value_label = QLabel(value)
-        self.value_label.setStyleSheet("""
-            font-size: 28px;
-            font-weight: 700;
-            color: #1a1a1a;
-        """)
+        self.value_label.setObjectName("metric_value")
         layout.addWidget(self.value_label)
         
-        # Subtitle/Change indicator
-        if subtitle:
-            subtitle_label = QLabel(subtitle)
-            subtitle_label.setStyleSheet("""
-                color: #00b050;
-                font-size: 12px;
-                font-weight: 600;
-            """)
-            layout.addWidget(subtitle_label)
+        # Subtitle/Change indicator (filled in by load_data)
+        subtitle_label = QLabel(subtitle)
+        self.set_trend_style(subtitle_label, True)
+        layout.addWidget(subtitle_label)
         
         layout.addStretch()
         
         # Store reference to update later
-        setattr(self, f"{title.lower().replace(' ', '_')}_value", self.value_label)
+        key = title.lower().replace(' ', '_')
+        setattr(self, f"{key}_value", self.value_label)
+        setattr(self, f"{key}_subtitle", subtitle_label)
         
         return card
     
+    @staticmethod
+    def set_trend_style(label, up):
+        """Color a change indicator green (up/neutral) or red (down)."""
+        set_state(label, "trend", "up" if up else "down")
+    
+    def set_trend(self, label, comparison, field, fmt=str):
+        """Show the 30-day delta for ``field``; tooltip lists today and 7 days."""
+        pct = comparison.delta(field)
+        label.setText(format_delta(pct, " vs prev 30d"))
+        self.set_trend_style(label, pct is None or pct >= 0)
+        
+        lines = []
+        for name, cmp in (("Today", dashboard_metrics.today()), ("7 days", dashboard_metrics.last_days(7)), ("30 days", comparison)):
+            lines.append(f"{name}: {fmt(getattr(cmp.current, field))} ({format_delta(cmp.delta(field))})")
+        label.setToolTip("\n".join(lines))
+    
     def create_section_header(self, title):
         """Create a modern section header."""
         header = QLabel(title)
-        header.setStyleSheet("""
-            QLabel {
-                font-size: 20px;
-                font-weight: 700;
-                color: #00b050;
-                padding-bottom: 8px;
-            }
-        """)
+        header.setObjectName("dashboard_section")
         return header
     
     def create_quick_action_card(self, text, icon_name, color, description):
         """Create a modern quick action card."""
         card = QFrame()
-        card.setStyleSheet("""
-            QFrame {
-                background: white;
-                border-radius: 12px;
-                padding: 20px;
-            }
-            QFrame:hover {
-                background: #f8f9fa;
-            }
-        """)
+        card.setObjectName("action_card")
         card.setCursor(Qt.CursorShape.PointingHandCursor)
         card.setMinimumHeight(120)
         self.add_shadow(card)
@@ -235,12 +227,9 @@ class DashboardScreen(QWidget):
         
         # Icon
         icon_label = QLabel()
+        icon_label.setObjectName("action_icon")
         icon_label.setFixedSize(48, 48)
-        icon_label.setStyleSheet(f"""
-            background-color: {color};
-            border-radius: 10px;
-            padding: 10px;
-        """)
+        set_accent(icon_label, color, f"background-color: {color}; border-radius: 10px; padding: 10px;")
         icon = load_icon(icon_name)
         if icon is not None and not icon.isNull():
             icon_label.setPixmap(icon.pixmap(28, 28))
@@ -249,19 +238,12 @@ class DashboardScreen(QWidget):
         
         # Title
         title_label = QLabel(text)
-        title_label.setStyleSheet("""
-            font-size: 16px;
-            font-weight: 600;
-            color: #1a1a1a;
-        """)
+        title_label.setObjectName("action_title")
         layout.addWidget(title_label)
         
         # Description
         desc_label = QLabel(description)
-        desc_label.setStyleSheet("""
-            font-size: 13px;
-            color: #666666;
-        """)
+        desc_label.setObjectName("action_desc")
         desc_label.setWordWrap(True)
         layout.addWidget(desc_label)
         
@@ -273,13 +255,8 @@ class DashboardScreen(QWidget):
         return card
     
     def add_shadow(self, widget):
-        """Add drop shadow effect to a widget."""
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setXOffset(0)
-        shadow.setYOffset(2)
-        shadow.setColor(Qt.GlobalColor.gray)
-        widget.setGraphicsEffect(shadow)
+        """Add drop shadow to a widget (rendering depends on the terminal's shadow mode)."""
+        apply_shadow(widget, blur=20, y_offset=2, color=QColor(Qt.GlobalColor.gray), radius=12)
     
     def handle_quick_action(self, action_name):
         """Handle quick action clicks."""
@@ -293,41 +270,23 @@ class DashboardScreen(QWidget):
             self.on_generate_report()
     
     def load_data(self):
-        """Load data for the dashboard."""
+        """Refresh the metric cards from the incremental counters."""
         try:
-            # Calculate date ranges
-            today = datetime.utcnow().date()
-            last_month = today - timedelta(days=30)
-            
-            # Get total sales for the last 30 days
-            total_sales = db_session.query(
-                func.sum(Transaction.total)
-            ).filter(
-                Transaction.created_at >= last_month
-            ).scalar() or 0
-            
-            # Get total orders for the last 30 days
-            total_orders = db_session.query(
-                func.count(Transaction.id)
-            ).filter(
-                Transaction.created_at >= last_month
-            ).scalar() or 0
-            
-            # Get total number of products
-            total_products = db_session.query(
-                func.count(Product.id)
-            ).scalar() or 0
+            dashboard_metrics.poll()
             
-            # Get total unique customers (approximate)
-            total_customers = db_session.query(
-                func.count(func.distinct(Transaction.customer_name))
-            ).scalar() or 0
+            self.total_sales_value.setText(format_currency(dashboard_metrics.total_sales))
+            self.orders_value.setText(str(dashboard_metrics.orders))
+            self.products_value.setText(str(dashboard_metrics.product_count))
+            self.customers_value.setText(str(dashboard_metrics.customers))
             
-            # Update UI with the data
-            self.total_sales_value.setText(format_currency(total_sales))
-            self.orders_value.setText(str(total_orders))
-            self.products_value.setText(str(total_products))
-            self.customers_value.setText(str(total_customers))
+            month = dashboard_metrics.last_days(dashboard_metrics.WINDOW_DAYS)
+            self.set_trend(self.total_sales_subtitle, month, 'sales_cents', lambda c: format_currency(c / 100))
+            self.set_trend(self.orders_subtitle, month, 'orders')
+            self.set_trend(self.customers_subtitle, month, 'customers')
+            low = dashboard_metrics.low_stock_count
+            self.products_subtitle.setText(f"{low} low stock")
+            self.set_trend_style(self.products_subtitle, low == 0)
+            self.date_label.setText(datetime.now().strftime("%B %d, %Y • %I:%M %p"))
                 
         except Exception as e:
             print(f"Error loading dashboard data: {e}")
@@ -7,37 +7,38 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QIcon, QPixmap, QFont, QColor
-from ...models import Product, Category
-from ...controllers import db_session
-from ...utils.helpers import get_icon_path, format_currency, uploads_path, copy_image_to_uploads, load_icon
+from ...controllers import db_session, dashboard_metrics
+from ...controllers.instrumentation import tracked
+from ...services import Conflict, NotFound, ServiceError, catalog, inventory
+from ...utils.helpers import format_currency, get_icon_path, uploads_path, copy_image_to_uploads, load_icon
+from ...utils.currency import currency_formatter
+from ...utils.vat import VAT_STATUSES, VAT_STATUS_LABELS, VATABLE
 import os
 from datetime import datetime
-from decimal import Decimal
 from ..widgets import (
     ModernTable, SearchBar, FilterComboBox, ActionButton,
     IconButton, SectionHeader, ModernDialog, StatusBadge
 )
+from ..dialogs.import_dialog import ImportDialog
+from .base import Screen, apply_product_changes
 
 
-class ProductsScreen(QWidget):
+class ProductsScreen(Screen):
     """Products management screen with modern design."""
     
     def __init__(self):
         super().__init__()
-        self.current_user = None
         self.setup_ui()
-        self.load_products()
-        self.load_categories()
-
-    def set_user(self, user):
-        self.current_user = user
-        self.apply_permissions()
 
     def apply_permissions(self):
         is_admin = bool(self.current_user and getattr(self.current_user, 'role', None) == 'admin')
         self.add_btn.setEnabled(is_admin)
+        self.import_btn.setEnabled(is_admin)
         self.categories_btn.setEnabled(is_admin)
-        self.load_products()
+
+    def reload_data(self):
+        self.load_categories()
+        self.filter_products()
     
     def setup_ui(self):
         """Set up the products UI with modern design."""
@@ -53,10 +54,14 @@ class ProductsScreen(QWidget):
         title_font.setPointSize(24)
         title_font.setBold(True)
         title.setFont(title_font)
-        title.setStyleSheet("color: #00b050;")
+        title.setProperty("accent", "primary")
         header_layout.addWidget(title)
         header_layout.addStretch()
         
+        self.import_btn = ActionButton("Import CSV", "import.png", "#2196f3")
+        self.import_btn.clicked.connect(self.import_products)
+        header_layout.addWidget(self.import_btn)
+
         self.categories_btn = ActionButton("Manage Categories", "categories.png", "#000000")
         self.categories_btn.clicked.connect(self.manage_categories)
         header_layout.addWidget(self.categories_btn)
@@ -106,93 +111,107 @@ class ProductsScreen(QWidget):
         """Load products with filtering."""
         try:
             is_admin = bool(self.current_user and getattr(self.current_user, 'role', None) == 'admin')
-            query = db_session.query(Product)
-            
-            if category_id:
-                query = query.filter(Product.category_id == category_id)
-            
-            if search_text:
-                search = f"%{search_text}%"
-                query = query.filter(Product.name.ilike(search))
-            
-            products = query.order_by(Product.name).all()
+            products = catalog.search_products(db_session, search_text, category_id, match_sku=False)
             
             self.products_table.setRowCount(len(products))
             
+            prices = currency_formatter.format_many(p.price for p in products)
             for row, product in enumerate(products):
-                self.products_table.setItem(row, 0, QTableWidgetItem(str(product.id)))
-                
-                name_item = QTableWidgetItem(product.name)
-                if product.is_service:
-                    name_item.setText(f"{product.name} (Service)")
-                self.products_table.setItem(row, 1, name_item)
-                
-                category_text = product.category.name if product.category else "—"
-                self.products_table.setItem(row, 2, QTableWidgetItem(category_text))
-                
-                self.products_table.setItem(row, 3, QTableWidgetItem(format_currency(product.price)))
-                
-                stock_item = QTableWidgetItem()
-                if product.is_service:
-                    stock_item.setText("N/A")
-                else:
-                    stock_text = str(product.stock)
-                    stock_item.setText(stock_text)
-                    if product.stock <= 5:
-                        stock_item.setForeground(QColor("#f44336"))
-                        font = QFont()
-                        font.setBold(True)
-                        stock_item.setFont(font)
-                    elif product.stock <= 15:
-                        stock_item.setForeground(QColor("#ff9800"))
-                        font = QFont()
-                        font.setBold(True)
-                        stock_item.setFont(font)
-                
-                self.products_table.setItem(row, 4, stock_item)
-                
-                if is_admin:
-                    actions_widget = QWidget()
-                    actions_layout = QHBoxLayout(actions_widget)
-                    actions_layout.setContentsMargins(4, 2, 4, 2)
-                    actions_layout.setSpacing(4)
-                    
-                    edit_btn = IconButton("edit.png", "Edit", 30)
-                    edit_btn.clicked.connect(lambda _, p=product: self.edit_product(p))
-                    actions_layout.addWidget(edit_btn)
-                    
-                    if not product.is_service:
-                        stock_btn = IconButton("inventory.png", "Stock", 30)
-                        stock_btn.clicked.connect(lambda _, p=product: self.adjust_stock(p))
-                        actions_layout.addWidget(stock_btn)
-                    
-                    delete_btn = IconButton("delete.png", "Delete", 30)
-                    delete_btn.clicked.connect(lambda _, p=product: self.delete_product(p))
-                    actions_layout.addWidget(delete_btn)
-                    actions_layout.addStretch()
-                    
-                    self.products_table.setCellWidget(row, 5, actions_widget)
+                self._fill_row(row, product, prices[row], is_admin)
             
             self.products_table.resizeRowsToContents()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load products: {str(e)}")
     
+    def _fill_row(self, row, product, price_text, is_admin):
+        self.products_table.setItem(row, 0, QTableWidgetItem(str(product.id)))
+
+        name_item = QTableWidgetItem(product.name)
+        if product.is_service:
+            name_item.setText(f"{product.name} (Service)")
+        self.products_table.setItem(row, 1, name_item)
+
+        category_text = product.category_name or "—"
+        self.products_table.setItem(row, 2, QTableWidgetItem(category_text))
+
+        self.products_table.setItem(row, 3, QTableWidgetItem(price_text))
+
+        stock_item = QTableWidgetItem()
+        if product.is_service:
+            stock_item.setText("N/A")
+        else:
+            stock_text = str(product.stock)
+            stock_item.setText(stock_text)
+            if product.stock <= 5:
+                stock_item.setForeground(QColor("#f44336"))
+                font = QFont()
+                font.setBold(True)
+                stock_item.setFont(font)
+            elif product.stock <= 15:
+                stock_item.setForeground(QColor("#ff9800"))
+                font = QFont()
+                font.setBold(True)
+                stock_item.setFont(font)
+
+        self.products_table.setItem(row, 4, stock_item)
+
+        if is_admin:
+            actions_widget = QWidget()
+            actions_layout = QHBoxLayout(actions_widget)
+            actions_layout.setContentsMargins(4, 2, 4, 2)
+            actions_layout.setSpacing(4)
+
+            edit_btn = IconButton("edit.png", "Edit", 30)
+            edit_btn.clicked.connect(lambda _, pid=product.id: self.edit_product(pid))
+            actions_layout.addWidget(edit_btn)
+
+            if not product.is_service:
+                stock_btn = IconButton("inventory.png", "Stock", 30)
+                stock_btn.clicked.connect(lambda _, pid=product.id: self.adjust_stock(pid))
+                actions_layout.addWidget(stock_btn)
+
+            delete_btn = IconButton("delete.png", "Delete", 30)
+            delete_btn.clicked.connect(lambda _, pid=product.id, name=product.name: self.delete_product(pid, name))
+            actions_layout.addWidget(delete_btn)
+            actions_layout.addStretch()
+
+            self.products_table.setCellWidget(row, 5, actions_widget)
+
+    def apply_changes(self, changes, products):
+        if self._data_stale:
+            return
+        if changes.categories:
+            # Category names are shown per row; renames are rare, so reload
+            self.load_categories()
+            self.filter_products()
+            return
+        is_admin = bool(self.current_user and getattr(self.current_user, 'role', None) == 'admin')
+        apply_product_changes(
+            self.products_table, changes.products, products,
+            lambda p: catalog.matches(p, self.search_input.text().strip(), self.category_filter.currentData(),
+                                      match_sku=False),
+            lambda row, p: self._fill_row(row, p, format_currency(p.price), is_admin),
+            self.filter_products,
+        )
+    
     def load_categories(self):
         """Load categories into filter."""
         try:
+            current = self.category_filter.currentData()
             self.category_filter.blockSignals(True)
             self.category_filter.clear()
             self.category_filter.addItem("All Categories", None)
             
-            categories = db_session.query(Category).order_by(Category.name).all()
-            for category in categories:
+            for category in catalog.list_categories(db_session):
                 self.category_filter.addItem(category.name, category.id)
             
+            self.category_filter.setCurrentIndex(max(self.category_filter.findData(current), 0))
             self.category_filter.blockSignals(False)
         except Exception as e:
             print(f"Error loading categories: {e}")
     
+    @tracked()
     def filter_products(self, *_):
         """Filter products."""
         search_text = self.search_input.text().strip()
@@ -207,14 +226,26 @@ class ProductsScreen(QWidget):
         
         dialog = ProductDialog(self, product)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.load_products()
+            dashboard_metrics.products_changed()
+            self.filter_products()
             self.load_categories()
     
-    def edit_product(self, product):
+    def _fresh_product(self, product_id):
+        """The product as it is now, or None (with a message) if it was deleted."""
+        try:
+            return catalog.get_product(db_session, product_id)
+        except ServiceError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            self.filter_products()
+            return None
+    
+    def edit_product(self, product_id):
         """Edit product."""
-        self.show_add_product_dialog(product)
+        product = self._fresh_product(product_id)
+        if product:
+            self.show_add_product_dialog(product)
     
-    def delete_product(self, product):
+    def delete_product(self, product_id, name):
         """Delete product."""
         if not (self.current_user and getattr(self.current_user, 'role', None) == 'admin'):
             QMessageBox.warning(self, "Not Authorized", "Only admins can delete products.")
@@ -222,40 +253,37 @@ class ProductsScreen(QWidget):
         
         reply = QMessageBox.question(
             self, "Delete Product",
-            f'Delete "{product.name}"?',
+            f'Delete "{name}"?',
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                if product.image_filename:
-                    image_path = uploads_path(product.image_filename)
-                    if image_path and os.path.exists(image_path):
-                        os.remove(image_path)
-                
-                db_session.delete(product)
-                db_session.commit()
+                catalog.delete_product(db_session, product_id)
+                dashboard_metrics.products_changed()
                 
-                self.load_products()
+                self.filter_products()
                 QMessageBox.information(self, "Success", "Product deleted.")
             except Exception as e:
-                db_session.rollback()
                 QMessageBox.critical(self, "Error", f"Failed to delete: {str(e)}")
     
-    def adjust_stock(self, product):
+    def adjust_stock(self, product_id):
         """Adjust stock."""
         if not (self.current_user and getattr(self.current_user, 'role', None) == 'admin'):
             QMessageBox.warning(self, "Not Authorized", "Only admins can adjust stock.")
             return
         
+        product = self._fresh_product(product_id)
+        if not product:
+            return
         if product.is_service:
             QMessageBox.information(self, "Info", "Services don't have stock.")
             return
         
         dialog = StockAdjustDialog(product, self.current_user, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.load_products()
+            self.filter_products()
     
     def manage_categories(self):
         """Manage categories."""
@@ -266,7 +294,20 @@ class ProductsScreen(QWidget):
         dialog = CategoryManagerDialog(self)
         dialog.exec()
         self.load_categories()
-        self.load_products()
+        self.filter_products()
+
+    def import_products(self):
+        """Bulk create/update products from a CSV file."""
+        if not (self.current_user and getattr(self.current_user, 'role', None) == 'admin'):
+            QMessageBox.warning(self, "Not Authorized", "Only admins can import products.")
+            return
+
+        dialog = ImportDialog(self.current_user, self)
+        dialog.exec()
+        if dialog.imported:
+            dashboard_metrics.products_changed()
+            self.load_categories()
+            self.filter_products()
 
 
 class ProductDialog(ModernDialog):
@@ -278,6 +319,9 @@ class ProductDialog(ModernDialog):
         self.image_data = None
         self.image_removed = False
         self.original_image = None
+        # What the form was loaded from, for the conflict check on save
+        self.loaded_version = None
+        self.loaded_stock = None
         
         self.setup_form()
         if product:
@@ -295,7 +339,7 @@ class ProductDialog(ModernDialog):
         self.load_categories()
         
         self.price_input = QDoubleSpinBox()
-        self.price_input.setPrefix("₱ ")
+        self.price_input.setPrefix(f"{currency_formatter.symbol} ")
         self.price_input.setMinimum(0)
         self.price_input.setMaximum(999999.99)
         self.price_input.setDecimals(2)
@@ -304,19 +348,17 @@ class ProductDialog(ModernDialog):
         self.stock_input.setMinimum(0)
         self.stock_input.setMaximum(9999)
         
+        self.vat_combo = QComboBox()
+        for status in VAT_STATUSES:
+            self.vat_combo.addItem(VAT_STATUS_LABELS[status], status)
+        
         self.is_service_check = QCheckBox("Service (no inventory)")
         self.is_service_check.stateChanged.connect(self.toggle_service_fields)
         
         self.image_label = QLabel()
         self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.image_label.setFixedSize(200, 200)
-        self.image_label.setStyleSheet("""
-            QLabel {
-                background-color: #f5f5f5;
-                border: 2px dashed #00b050;
-                border-radius: 6px;
-            }
-        """)
+        self.image_label.setObjectName("image_drop")
         self.image_label.setText("Click to select")
         self.image_label.setCursor(Qt.CursorShape.PointingHandCursor)
         self.image_label.mousePressEvent = lambda e: self.select_image()
@@ -331,6 +373,7 @@ class ProductDialog(ModernDialog):
             ("Category", self.category_combo),
             ("Price*", self.price_input),
             ("Stock", self.stock_input),
+            ("VAT", self.vat_combo),
         ]
         
         self.add_form_fields(fields)
@@ -346,8 +389,7 @@ class ProductDialog(ModernDialog):
         self.category_combo.clear()
         self.category_combo.addItem("Select category", None)
         
-        categories = db_session.query(Category).order_by(Category.name).all()
-        for cat in categories:
+        for cat in catalog.list_categories(db_session):
             self.category_combo.addItem(cat.name, cat.id)
     
     def load_product_data(self):
@@ -363,9 +405,14 @@ class ProductDialog(ModernDialog):
             if idx >= 0:
                 self.category_combo.setCurrentIndex(idx)
         
+        self.loaded_version = self.product.version
+        self.loaded_stock = self.product.stock
         self.price_input.setValue(float(self.product.price))
         self.stock_input.setValue(self.product.stock)
         self.is_service_check.setChecked(self.product.is_service)
+        idx = self.vat_combo.findData(self.product.vat_status or VATABLE)
+        if idx >= 0:
+            self.vat_combo.setCurrentIndex(idx)
         
         if self.product.image_filename:
             self.original_image = self.product.image_filename
@@ -418,50 +465,43 @@ class ProductDialog(ModernDialog):
     
     def accept(self):
         """Save product."""
-        name = self.name_input.text().strip()
-        if not name:
-            QMessageBox.warning(self, "Error", "Product name is required.")
-            return
-        
-        price = self.price_input.value()
-        if price <= 0:
-            QMessageBox.warning(self, "Error", "Price must be greater than 0.")
-            return
-        
+        data = catalog.ProductData(
+            name=self.name_input.text(),
+            price=self.price_input.value(),
+            sku=self.sku_input.text(),
+            category_id=self.category_combo.currentData(),
+            stock=self.stock_input.value(),
+            is_service=self.is_service_check.isChecked(),
+            vat_status=self.vat_combo.currentData(),
+        )
         try:
-            if not self.product:
-                self.product = Product()
-                db_session.add(self.product)
-            
-            self.product.name = name
-            self.product.sku = self.sku_input.text().strip() or None
-            self.product.category_id = self.category_combo.currentData()
-            self.product.price = price
-            self.product.is_service = self.is_service_check.isChecked()
-            
-            if not self.product.is_service:
-                self.product.stock = self.stock_input.value()
-            else:
-                self.product.stock = 0
-            
-            if self.image_data:
-                if self.original_image and self.original_image != self.image_data:
-                    old_path = uploads_path(self.original_image)
-                    if old_path and os.path.exists(old_path):
-                        os.remove(old_path)
-                self.product.image_filename = self.image_data
-            elif self.image_removed and self.original_image:
-                old_path = uploads_path(self.original_image)
-                if old_path and os.path.exists(old_path):
-                    os.remove(old_path)
-                self.product.image_filename = None
-            
-            db_session.commit()
+            self.product = catalog.save_product(
+                db_session,
+                self.product.id if self.product else None,
+                data,
+                image_filename=self.image_data,
+                image_removed=self.image_removed,
+                version=self.loaded_version,
+                base_stock=self.loaded_stock,
+            )
             super().accept()
-            
+        except Conflict as e:
+            QMessageBox.warning(self, "Changed Elsewhere", f"{e}\n\nThe form now shows the current values.")
+            self.reload_product()
+        except ServiceError as e:
+            QMessageBox.warning(self, "Error", str(e))
         except Exception as e:
-            db_session.rollback()
             QMessageBox.critical(self, "Error", f"Failed to save: {str(e)}")
+    
+    def reload_product(self):
+        """Load the product's current values into the form after a conflict."""
+        try:
+            self.product = catalog.get_product(db_session, self.product.id)
+        except NotFound as e:
+            QMessageBox.warning(self, "Error", str(e))
+            self.reject()
+            return
+        self.load_product_data()
 
 
 class StockAdjustDialog(ModernDialog):
@@ -477,13 +517,13 @@ class StockAdjustDialog(ModernDialog):
     def setup_form(self):
         """Set up form."""
         current_label = QLabel(f"Current: {self.product.stock} units")
-        current_label.setStyleSheet("font-weight: bold; color: #00b050;")
+        current_label.setProperty("role", "emphasis")
         self.layout.addWidget(current_label)
         
         self.adjust_type = FilterComboBox()
-        self.adjust_type.addItem("Add", "add")
-        self.adjust_type.addItem("Remove", "remove")
-        self.adjust_type.addItem("Set to", "set")
+        self.adjust_type.addItem("Add", inventory.ADD)
+        self.adjust_type.addItem("Remove", inventory.REMOVE)
+        self.adjust_type.addItem("Set to", inventory.SET)
         self.adjust_type.currentIndexChanged.connect(self.update_form)
         
         self.quantity_input = QSpinBox()
@@ -491,7 +531,7 @@ class StockAdjustDialog(ModernDialog):
         self.quantity_input.setMaximum(9999)
         
         self.unit_cost_input = QDoubleSpinBox()
-        self.unit_cost_input.setPrefix("₱ ")
+        self.unit_cost_input.setPrefix(f"{currency_formatter.symbol} ")
         self.unit_cost_input.setMinimum(0)
         self.unit_cost_input.setMaximum(999999.99)
         self.unit_cost_input.setDecimals(2)
@@ -512,44 +552,25 @@ class StockAdjustDialog(ModernDialog):
     
     def update_form(self):
         """Update form."""
-        self.unit_cost_input.setEnabled(self.adjust_type.currentData() == "add")
+        self.unit_cost_input.setEnabled(self.adjust_type.currentData() == inventory.ADD)
     
     def accept(self):
         """Apply adjustment."""
         try:
-            qty = self.quantity_input.value()
-            note = self.note_input.text().strip()
-            action = self.adjust_type.currentData()
-            
-            if action == "add":
-                new_stock = self.product.stock + qty
-                if self.unit_cost_input.value() <= 0:
-                    QMessageBox.warning(self, "Error", "Unit cost required.")
-                    return
-            elif action == "remove":
-                new_stock = max(0, self.product.stock - qty)
-            else:
-                new_stock = qty
-            
-            old_stock = self.product.stock
-            self.product.stock = new_stock
-            
-            from ...models import StockChange
-            change = StockChange(
-                product_id=self.product.id,
-                user_id=self.user.id,
-                qty_change=new_stock - old_stock,
-                unit_cost=Decimal(str(self.unit_cost_input.value())) if action == "add" else None,
-                note=note or f"Stock: {action}"
+            new_stock = inventory.adjust_stock(
+                db_session,
+                self.product.id,
+                self.user.id,
+                self.adjust_type.currentData(),
+                self.quantity_input.value(),
+                unit_cost=self.unit_cost_input.value(),
+                note=self.note_input.text(),
             )
-            db_session.add(change)
-            db_session.commit()
-            
             QMessageBox.information(self, "Success", f"Stock: {new_stock}")
             super().accept()
-            
+        except ServiceError as e:
+            QMessageBox.warning(self, "Error", str(e))
         except Exception as e:
-            db_session.rollback()
             QMessageBox.critical(self, "Error", str(e))
 
 
@@ -594,24 +615,26 @@ class CategoryManagerDialog(ModernDialog):
     
     def load_categories(self):
         """Load categories."""
-        cats = db_session.query(Category).order_by(Category.name).all()
+        cats = catalog.list_categories(db_session)
         self.table.setRowCount(len(cats))
         
         for row, cat in enumerate(cats):
-            self.table.setItem(row, 0, QTableWidgetItem(str(cat.id)))
+            id_item = QTableWidgetItem(str(cat.id))
+            id_item.setData(Qt.ItemDataRole.UserRole, cat.version)
+            self.table.setItem(row, 0, id_item)
             self.table.setItem(row, 1, QTableWidgetItem(cat.name or ""))
         
         self.table.resizeRowsToContents()
     
     def selected_category(self):
-        """Get selected."""
+        """Get selected as (id, name, version)."""
         row = self.table.currentRow()
         if row < 0:
             return None
         
         try:
-            cat_id = int(self.table.item(row, 0).text())
-            return db_session.get(Category, cat_id)
+            id_item = self.table.item(row, 0)
+            return int(id_item.text()), self.table.item(row, 1).text(), id_item.data(Qt.ItemDataRole.UserRole)
         except:
             return None
     
@@ -619,65 +642,56 @@ class CategoryManagerDialog(ModernDialog):
         """Add category."""
         text, ok = QInputDialog.getText(self, "Add", "Name:")
         if ok and text.strip():
-            name = text.strip()
-            if db_session.query(Category).filter(Category.name == name).first():
-                QMessageBox.warning(self, "Error", "Exists.")
-                return
-            
             try:
-                cat = Category(name=name)
-                db_session.add(cat)
-                db_session.commit()
+                catalog.add_category(db_session, text)
                 self.load_categories()
+            except ServiceError as e:
+                QMessageBox.warning(self, "Error", str(e))
             except Exception as e:
-                db_session.rollback()
                 QMessageBox.critical(self, "Error", str(e))
     
     def edit_category(self):
         """Edit category."""
-        cat = self.selected_category()
-        if not cat:
+        selected = self.selected_category()
+        if not selected:
             QMessageBox.warning(self, "Error", "Select one.")
             return
+        cat_id, cat_name, version = selected
         
-        text, ok = QInputDialog.getText(self, "Edit", "Name:", text=cat.name)
+        text, ok = QInputDialog.getText(self, "Edit", "Name:", text=cat_name)
         if ok and text.strip():
-            name = text.strip()
-            if db_session.query(Category).filter(Category.name == name, Category.id != cat.id).first():
-                QMessageBox.warning(self, "Error", "Exists.")
-                return
-            
             try:
-                cat.name = name
-                db_session.commit()
+                catalog.rename_category(db_session, cat_id, text, version)
+                self.load_categories()
+            except Conflict as e:
+                QMessageBox.warning(self, "Changed Elsewhere", str(e))
                 self.load_categories()
+            except ServiceError as e:
+                QMessageBox.warning(self, "Error", str(e))
             except Exception as e:
-                db_session.rollback()
                 QMessageBox.critical(self, "Error", str(e))
     
     def delete_category(self):
         """Delete category."""
-        cat = self.selected_category()
-        if not cat:
+        selected = self.selected_category()
+        if not selected:
             QMessageBox.warning(self, "Error", "Select one.")
             return
+        cat_id, cat_name, version = selected
         
         reply = QMessageBox.question(
             self, "Delete",
-            f'Delete "{cat.name}"?',
+            f'Delete "{cat_name}"?',
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                products = db_session.query(Product).filter(Product.category_id == cat.id).all()
-                for p in products:
-                    p.category_id = None
-                
-                db_session.delete(cat)
-                db_session.commit()
+                catalog.delete_category(db_session, cat_id, version)
+                self.load_categories()
+            except Conflict as e:
+                QMessageBox.warning(self, "Changed Elsewhere", str(e))
                 self.load_categories()
             except Exception as e:
-                db_session.rollback()
                 QMessageBox.critical(self, "Error", str(e))
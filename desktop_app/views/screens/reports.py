@@ -1,6 +1,3 @@
-from datetime import datetime, timedelta, time
-import csv
-
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -15,26 +12,57 @@ from PyQt6.QtWidgets import (
     QComboBox,
     QDateEdit,
     QFileDialog,
+    QProgressDialog,
 )
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QIcon
-from sqlalchemy import func, desc
 
 from ...controllers import db_session
-from ...models import Product, Transaction, TransactionItem
+from ...controllers.instrumentation import tracked
+from ...controllers.receipt_export import ExportCancelled, export_receipts
+from ...services import reporting
 from ...utils.helpers import format_currency, get_icon_path, load_icon
+from ...utils.currency import currency_formatter
+from ..workers import DbWorker
+from .base import Screen
+
+
+class ReceiptExportWorker(DbWorker):
+    """Runs a batch receipt export so the GUI stays responsive."""
+
+    progress = pyqtSignal(int, int)
+    cancelled = pyqtSignal()
+
+    def __init__(self, start, end, path, parent=None):
+        super().__init__(parent)
+        self.start_date = start
+        self.end_date = end
+        self.path = path
+
+    def work(self, session):
+        return export_receipts(
+            self.start_date, self.end_date, self.path,
+            progress=self.progress.emit,
+            cancelled=self.is_cancelled,
+            session=session,
+        )
+
+    def handle_error(self, error):
+        if isinstance(error, ExportCancelled):
+            self.cancelled.emit()
+        else:
+            super().handle_error(error)
 
 
-class ReportsScreen(QWidget):
+class ReportsScreen(Screen):
     def __init__(self):
         super().__init__()
-        self.current_user = None
+        self._export_worker = None
+        self._export_progress = None
         self._build_ui()
         self._set_default_dates()
 
-    def set_user(self, user):
-        self.current_user = user
-        self._apply_permissions()
+    def reload_data(self):
         self.refresh()
 
     def _build_ui(self):
@@ -44,13 +72,13 @@ class ReportsScreen(QWidget):
 
         header = QHBoxLayout()
         title = QLabel("Reports")
-        title.setStyleSheet("font-size: 24px; font-weight: bold;")
+        title.setProperty("role", "heading")
         header.addWidget(title)
         header.addStretch()
         layout.addLayout(header)
 
         self.unauthorized_label = QLabel("Not authorized")
-        self.unauthorized_label.setStyleSheet("color: #00b050; font-weight: bold;")
+        self.unauthorized_label.setProperty("role", "emphasis")
         self.unauthorized_label.setVisible(False)
         layout.addWidget(self.unauthorized_label)
 
@@ -67,6 +95,11 @@ class ReportsScreen(QWidget):
         self.export_btn.setIcon(load_icon("export.png"))
         self.export_btn.clicked.connect(self.export_report)
 
+        self.receipts_btn = QPushButton("Export Receipts")
+        self.receipts_btn.setIcon(load_icon("receipt.png"))
+        self.receipts_btn.setToolTip("Save every receipt in the date range as one PDF or a zip of PDFs")
+        self.receipts_btn.clicked.connect(self.export_receipts)
+
         controls.addWidget(QLabel("From:"))
         controls.addWidget(self.from_date)
         controls.addWidget(QLabel("To:"))
@@ -83,6 +116,7 @@ class ReportsScreen(QWidget):
         controls.addStretch()
         controls.addWidget(self.refresh_btn)
         controls.addWidget(self.export_btn)
+        controls.addWidget(self.receipts_btn)
         layout.addLayout(controls)
 
         metrics = QHBoxLayout()
@@ -91,7 +125,7 @@ class ReportsScreen(QWidget):
         self.avg_order_label = QLabel(f"Avg Order: {format_currency(0)}")
         self.total_profit_label = QLabel(f"Profit: {format_currency(0)}")
         for w in (self.total_sales_label, self.total_orders_label, self.avg_order_label, self.total_profit_label):
-            w.setStyleSheet("font-size: 16px; font-weight: bold;")
+            w.setProperty("role", "subheading")
             metrics.addWidget(w)
         metrics.addStretch()
         layout.addLayout(metrics)
@@ -153,13 +187,14 @@ class ReportsScreen(QWidget):
 
         layout.addLayout(tables_row, 1)
 
-    def _apply_permissions(self):
+    def apply_permissions(self):
         is_admin = bool(self.current_user and getattr(self.current_user, 'role', None) == 'admin')
         self.unauthorized_label.setVisible(not is_admin)
         self.from_date.setEnabled(is_admin)
         self.to_date.setEnabled(is_admin)
         self.refresh_btn.setEnabled(is_admin)
         self.export_btn.setEnabled(is_admin)
+        self.receipts_btn.setEnabled(is_admin and self._export_worker is None)
         self.sales_by_day.setEnabled(is_admin)
         self.top_products.setEnabled(is_admin)
         self.low_stock.setEnabled(is_admin)
@@ -169,6 +204,7 @@ class ReportsScreen(QWidget):
         self.to_date.setDate(today)
         self.from_date.setDate(today.addDays(-30))
 
+    @tracked()
     def refresh(self):
         if not (self.current_user and getattr(self.current_user, 'role', None) == 'admin'):
             return
@@ -176,96 +212,36 @@ class ReportsScreen(QWidget):
         try:
             start = self.from_date.date().toPyDate()
             end = self.to_date.date().toPyDate()
-            start_dt = datetime.combine(start, time.min)
-            end_dt = datetime.combine(end, time.min) + timedelta(days=1)
-
-            totals_row = (
-                db_session.query(
-                    func.sum(TransactionItem.qty * TransactionItem.price).label('sales'),
-                    func.sum(TransactionItem.qty * TransactionItem.cost_price).label('cost'),
-                )
-                .join(Transaction, Transaction.id == TransactionItem.transaction_id)
-                .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
-                .one()
-            )
-
-            total_sales = float(totals_row.sales or 0)
-            total_cost = float(totals_row.cost or 0)
-            total_profit = total_sales - total_cost
-            total_orders = (
-                db_session.query(func.count(Transaction.id))
-                .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
-                .scalar()
-                or 0
-            )
-            avg_order = float(total_sales) / float(total_orders) if total_orders else 0
 
-            self.total_sales_label.setText(f"Total Sales: {format_currency(total_sales)}")
-            self.total_orders_label.setText(f"Orders: {total_orders}")
-            self.avg_order_label.setText(f"Avg Order: {format_currency(avg_order)}")
-            self.total_profit_label.setText(f"Profit: {format_currency(total_profit)}")
+            totals = reporting.sales_totals(db_session, start, end)
+            self.total_sales_label.setText(f"Total Sales: {format_currency(totals.sales)}")
+            self.total_orders_label.setText(f"Orders: {totals.orders}")
+            self.avg_order_label.setText(f"Avg Order: {format_currency(totals.avg_order)}")
+            self.total_profit_label.setText(f"Profit: {format_currency(totals.profit)}")
 
             # Sales by day
-            by_day = (
-                db_session.query(
-                    func.date(Transaction.created_at).label('d'),
-                    func.sum(TransactionItem.qty * TransactionItem.price).label('sales'),
-                    func.sum(TransactionItem.qty * TransactionItem.cost_price).label('cost'),
-                )
-                .join(TransactionItem, TransactionItem.transaction_id == Transaction.id)
-                .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
-                .group_by(func.date(Transaction.created_at))
-                .order_by(func.date(Transaction.created_at))
-                .all()
-            )
+            by_day = reporting.sales_by_day(db_session, start, end)
             self.sales_by_day.setRowCount(len(by_day))
             for row, r in enumerate(by_day):
-                sales = float(r.sales or 0)
-                cost = float(r.cost or 0)
-                profit = sales - cost
-                self.sales_by_day.setItem(row, 0, QTableWidgetItem(str(r.d)))
-                self.sales_by_day.setItem(row, 1, QTableWidgetItem(format_currency(sales)))
-                self.sales_by_day.setItem(row, 2, QTableWidgetItem(format_currency(cost)))
-                self.sales_by_day.setItem(row, 3, QTableWidgetItem(format_currency(profit)))
+                cells = currency_formatter.format_many((r.sales, r.cost, r.profit))
+                self.sales_by_day.setItem(row, 0, QTableWidgetItem(r.day))
+                for col, text in enumerate(cells, start=1):
+                    self.sales_by_day.setItem(row, col, QTableWidgetItem(text))
             self.sales_by_day.resizeRowsToContents()
 
             # Top products
-            top = (
-                db_session.query(
-                    Product.name,
-                    func.sum(TransactionItem.qty).label('qty'),
-                    func.sum(TransactionItem.qty * TransactionItem.price).label('sales'),
-                    func.sum(TransactionItem.qty * TransactionItem.cost_price).label('cost'),
-                )
-                .join(TransactionItem, TransactionItem.product_id == Product.id)
-                .join(Transaction, Transaction.id == TransactionItem.transaction_id)
-                .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
-                .group_by(Product.id, Product.name)
-                .order_by(desc(func.sum(TransactionItem.qty)))
-                .limit(int(self.top_n.currentData() or 15))
-                .all()
-            )
+            top = reporting.product_sales(db_session, start, end, limit=int(self.top_n.currentData() or 15))
             self.top_products.setRowCount(len(top))
             for row, r in enumerate(top):
-                sales = float(r.sales or 0)
-                cost = float(r.cost or 0)
-                profit = sales - cost
-                self.top_products.setItem(row, 0, QTableWidgetItem(r.name or ""))
-                self.top_products.setItem(row, 1, QTableWidgetItem(str(int(r.qty or 0))))
-                self.top_products.setItem(row, 2, QTableWidgetItem(format_currency(sales)))
-                self.top_products.setItem(row, 3, QTableWidgetItem(format_currency(cost)))
-                self.top_products.setItem(row, 4, QTableWidgetItem(format_currency(profit)))
+                cells = currency_formatter.format_many((r.sales, r.cost, r.profit))
+                self.top_products.setItem(row, 0, QTableWidgetItem(r.name))
+                self.top_products.setItem(row, 1, QTableWidgetItem(str(r.qty)))
+                for col, text in enumerate(cells, start=2):
+                    self.top_products.setItem(row, col, QTableWidgetItem(text))
             self.top_products.resizeRowsToContents()
 
             # Low stock
-            low = (
-                db_session.query(Product)
-                .filter(Product.is_service == False)
-                .order_by(Product.stock.asc())
-                .limit(25)
-                .all()
-            )
-            low = [p for p in low if int(p.stock or 0) <= 10]
+            low = reporting.low_stock(db_session)
             self.low_stock.setRowCount(len(low))
             for row, p in enumerate(low):
                 self.low_stock.setItem(row, 0, QTableWidgetItem(p.name))
@@ -282,8 +258,6 @@ class ReportsScreen(QWidget):
         try:
             start = self.from_date.date().toPyDate()
             end = self.to_date.date().toPyDate()
-            start_dt = datetime.combine(start, time.min)
-            end_dt = datetime.combine(end, time.min) + timedelta(days=1)
 
             filename, _ = QFileDialog.getSaveFileName(
                 self,
@@ -294,68 +268,82 @@ class ReportsScreen(QWidget):
             if not filename:
                 return
 
-            rows = (
-                db_session.query(
-                    Product.sku,
-                    Product.name,
-                    func.sum(TransactionItem.qty).label('qty'),
-                    func.sum(TransactionItem.qty * TransactionItem.price).label('sales'),
-                    func.sum(TransactionItem.qty * TransactionItem.cost_price).label('cost'),
-                )
-                .join(TransactionItem, TransactionItem.product_id == Product.id)
-                .join(Transaction, Transaction.id == TransactionItem.transaction_id)
-                .filter(Transaction.created_at >= start_dt, Transaction.created_at < end_dt)
-                .group_by(Product.id, Product.sku, Product.name)
-                .order_by(Product.name)
-                .all()
-            )
-
-            if not rows:
-                QMessageBox.information(self, "Export Sales Report", "No sales found for the selected period.")
-                return
-
             if not filename.lower().endswith(".csv"):
                 filename += ".csv"
 
-            total_sales = 0.0
-            total_cost = 0.0
-
-            with open(filename, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["SKU", "Product", "Quantity", "Sales", "Cost", "Profit", "Margin %"])
-
-                for r in rows:
-                    sales = float(r.sales or 0)
-                    cost = float(r.cost or 0)
-                    profit = sales - cost
-                    margin = (profit / sales * 100.0) if sales else 0.0
-
-                    total_sales += sales
-                    total_cost += cost
-
-                    writer.writerow([
-                        r.sku or "",
-                        r.name or "",
-                        int(r.qty or 0),
-                        format_currency(sales),
-                        format_currency(cost),
-                        format_currency(profit),
-                        f"{margin:.2f}",
-                    ])
-
-                total_profit = total_sales - total_cost
-                writer.writerow([])
-                writer.writerow([
-                    "TOTAL",
-                    "",
-                    "",
-                    format_currency(total_sales),
-                    format_currency(total_cost),
-                    format_currency(total_profit),
-                    "",
-                ])
+            if not reporting.export_sales_csv(db_session, start, end, filename):
+                QMessageBox.information(self, "Export Sales Report", "No sales found for the selected period.")
+                return
 
             QMessageBox.information(self, "Export Sales Report", "Sales report exported successfully.")
 
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
+
+    def export_receipts(self):
+        if not (self.current_user and getattr(self.current_user, 'role', None) == 'admin'):
+            return
+        if self._export_worker is not None:
+            return
+
+        start = self.from_date.date().toPyDate()
+        end = self.to_date.date().toPyDate()
+        filename, selected = QFileDialog.getSaveFileName(
+            self,
+            "Export Receipts",
+            f"receipts_{start:%Y%m%d}_{end:%Y%m%d}.pdf",
+            "Single PDF (*.pdf);;Zip of PDFs (*.zip)",
+        )
+        if not filename:
+            return
+        if not filename.lower().endswith((".pdf", ".zip")):
+            filename += ".zip" if "zip" in selected.lower() else ".pdf"
+
+        self._export_progress = QProgressDialog("Exporting receipts...", "Cancel", 0, 0, self)
+        self._export_progress.setWindowTitle("Export Receipts")
+        self._export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self._export_progress.setMinimumDuration(0)
+
+        worker = ReceiptExportWorker(start, end, filename, self)
+        worker.progress.connect(self._on_export_progress)
+        worker.succeeded.connect(self._on_export_finished)
+        worker.cancelled.connect(self._on_export_cancelled)
+        worker.failed.connect(self._on_export_failed)
+        self._export_progress.canceled.connect(worker.cancel)
+        self._export_worker = worker
+        self.receipts_btn.setEnabled(False)
+        worker.start()
+        self._export_progress.show()
+
+    def _on_export_progress(self, done, total):
+        if self._export_progress is not None:
+            self._export_progress.setMaximum(total)
+            self._export_progress.setValue(done)
+            self._export_progress.setLabelText(f"Exporting receipts... {done}/{total}")
+
+    def _end_export(self):
+        if self._export_progress is not None:
+            self._export_progress.reset()
+            self._export_progress.deleteLater()
+            self._export_progress = None
+        if self._export_worker is not None:
+            self._export_worker.wait()
+            self._export_worker.deleteLater()
+            self._export_worker = None
+        self.apply_permissions()
+
+    def _on_export_finished(self, count):
+        path = self._export_worker.path
+        self._end_export()
+        if count:
+            QMessageBox.information(self, "Export Receipts", f"Exported {count} receipts to {path}.")
+        else:
+            QMessageBox.information(self, "Export Receipts", "No receipts found for the selected period.")
+
+    def _on_export_cancelled(self):
+        self._end_export()
+        QMessageBox.information(self, "Export Receipts", "Export cancelled.")
+
+    def _on_export_failed(self, message):
+        self._end_export()
+        QMessageBox.critical(self, "Error", message)
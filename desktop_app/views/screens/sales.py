@@ -18,36 +18,36 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon, QPixmap
-from sqlalchemy import func
 import os
-from decimal import Decimal
 
-from ...controllers import db_session
-from ...models import Category, Product, Transaction, TransactionItem, StockChange
+from ...controllers import db_session, dashboard_metrics
+from ...controllers.instrumentation import tracked
+from ...services import NotFound, ServiceError, cart as cart_service, catalog, checkout as checkout_service
 from ...utils.helpers import (
     format_currency,
     get_icon_path,
     uploads_path,
     load_icon,
-    compute_ph_vat_breakdown,
     PH_VAT_RATE,
+    PH_VAT_RATE_BP,
 )
+from ...utils.currency import currency_formatter
+from ...utils.money import Money
 from ..dialogs.receipt_dialog import ReceiptDialog
+from .base import Screen, apply_product_changes
 
 
-class SalesScreen(QWidget):
+class SalesScreen(Screen):
     def __init__(self):
         super().__init__()
-        self.current_user = None
         self.cart = {}
         self._build_ui()
+
+    def reload_data(self):
         self._load_categories()
         self._load_products()
         self._update_totals()
 
-    def set_user(self, user):
-        self.current_user = user
-
     def _build_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -55,7 +55,7 @@ class SalesScreen(QWidget):
 
         header = QHBoxLayout()
         title = QLabel("Sales (POS)")
-        title.setStyleSheet("font-size: 24px; font-weight: bold;")
+        title.setProperty("role", "heading")
         header.addWidget(title)
         header.addStretch()
 
@@ -84,7 +84,7 @@ class SalesScreen(QWidget):
 
         left = QVBoxLayout()
         products_label = QLabel("Products")
-        products_label.setStyleSheet("font-size: 16px; font-weight: bold;")
+        products_label.setProperty("role", "subheading")
         left.addWidget(products_label)
         self.products_table = QTableWidget()
         self.products_table.setColumnCount(6)
@@ -104,7 +104,7 @@ class SalesScreen(QWidget):
 
         right = QVBoxLayout()
         cart_label = QLabel("Cart")
-        cart_label.setStyleSheet("font-size: 16px; font-weight: bold;")
+        cart_label.setProperty("role", "subheading")
         right.addWidget(cart_label)
         self.cart_table = QTableWidget()
         self.cart_table.setColumnCount(5)
@@ -122,14 +122,23 @@ class SalesScreen(QWidget):
 
         self.vatable_sales_label = QLabel(f"VATable Sales: {format_currency(0)}")
         self.vat_amount_label = QLabel(f"VAT ({int(PH_VAT_RATE * 100)}%): {format_currency(0)}")
-        self.vatable_sales_label.setStyleSheet("font-size: 12px;")
-        self.vat_amount_label.setStyleSheet("font-size: 12px;")
+        self.vatable_sales_label.setProperty("role", "caption")
+        self.vat_amount_label.setProperty("role", "caption")
 
         vatable_row = QHBoxLayout()
         vatable_row.addStretch()
         vatable_row.addWidget(self.vatable_sales_label)
         right.addLayout(vatable_row)
 
+        # Only shown when the cart holds VAT-exempt or zero-rated items
+        self.non_vat_label = QLabel()
+        self.non_vat_label.setProperty("role", "caption")
+        self.non_vat_label.setVisible(False)
+        non_vat_row = QHBoxLayout()
+        non_vat_row.addStretch()
+        non_vat_row.addWidget(self.non_vat_label)
+        right.addLayout(non_vat_row)
+
         vat_row = QHBoxLayout()
         vat_row.addStretch()
         vat_row.addWidget(self.vat_amount_label)
@@ -138,7 +147,7 @@ class SalesScreen(QWidget):
         totals_row = QHBoxLayout()
         totals_row.addStretch()
         self.total_label = QLabel(f"Total: {format_currency(0)}")
-        self.total_label.setStyleSheet("font-size: 22px; font-weight: 800; color: #00b050;")
+        self.total_label.setProperty("role", "total")
         self.total_label.setAlignment(Qt.AlignmentFlag.AlignRight)
         totals_row.addWidget(self.total_label)
         right.addLayout(totals_row)
@@ -164,7 +173,7 @@ class SalesScreen(QWidget):
 
         self.checkout_btn = QPushButton("Checkout")
         self.checkout_btn.setIcon(load_icon("payment.png"))
-        self.checkout_btn.setStyleSheet("background-color: #00b050; color: white; font-weight: bold; padding: 8px 18px; border-radius: 4px;")
+        self.checkout_btn.setObjectName("checkout_btn")
         self.checkout_btn.clicked.connect(self.checkout)
         payment_row.addWidget(self.checkout_btn)
 
@@ -176,56 +185,75 @@ class SalesScreen(QWidget):
         layout.addLayout(tables_row)
 
     def _load_categories(self):
+        """Refill the filter, keeping the selection; False if it no longer exists."""
+        current = self.category_filter.currentData()
         self.category_filter.blockSignals(True)
         self.category_filter.clear()
         self.category_filter.addItem("All Categories", None)
-        categories = db_session.query(Category).order_by(Category.name).all()
-        for c in categories:
+        for c in catalog.list_categories(db_session):
             self.category_filter.addItem(c.name, c.id)
+        index = self.category_filter.findData(current)
+        self.category_filter.setCurrentIndex(max(index, 0))
         self.category_filter.blockSignals(False)
+        return current is None or index >= 0
 
+    @tracked()
     def _load_products(self, *_):
-        search = (self.search_input.text() or "").strip()
-        category_id = self.category_filter.currentData()
-
-        query = db_session.query(Product)
-        if category_id:
-            query = query.filter(Product.category_id == category_id)
-        if search:
-            like = f"%{search}%"
-            query = query.filter(func.lower(Product.name).like(func.lower(like)) | func.lower(Product.sku).like(func.lower(like)))
-
-        products = query.order_by(Product.name).all()
+        products = catalog.search_products(
+            db_session, self.search_input.text(), self.category_filter.currentData()
+        )
 
         self.products_table.setRowCount(len(products))
+        prices = currency_formatter.format_many(p.price for p in products)
         for row, p in enumerate(products):
-            self.products_table.setItem(row, 0, QTableWidgetItem(str(p.id)))
-            name_item = QTableWidgetItem(p.name)
-            icon = None
-            if not p.is_service and getattr(p, "image_filename", None):
-                image_path = uploads_path(p.image_filename)
-                if image_path and os.path.exists(image_path):
-                    pixmap = QPixmap(image_path)
-                    if not pixmap.isNull():
-                        icon = QIcon(pixmap.scaled(32, 32, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-            elif p.is_service:
-                icon = load_icon("service.png")
-
-            if icon:
-                name_item.setIcon(icon)
-
-            self.products_table.setItem(row, 1, name_item)
-            self.products_table.setItem(row, 2, QTableWidgetItem("Service" if p.is_service else "Product"))
-            self.products_table.setItem(row, 3, QTableWidgetItem(format_currency(p.price)))
-            self.products_table.setItem(row, 4, QTableWidgetItem("N/A" if p.is_service else str(p.stock)))
-
-            add_btn = QPushButton("+")
-            add_btn.setFixedWidth(32)
-            add_btn.clicked.connect(lambda _, pid=p.id: self.add_to_cart(pid))
-            self.products_table.setCellWidget(row, 5, add_btn)
+            self._fill_product_row(row, p, prices[row])
 
         self.products_table.resizeRowsToContents()
 
+    def _fill_product_row(self, row, p, price_text):
+        self.products_table.setItem(row, 0, QTableWidgetItem(str(p.id)))
+        name_item = QTableWidgetItem(p.name)
+        icon = None
+        if not p.is_service and getattr(p, "image_filename", None):
+            image_path = uploads_path(p.image_filename)
+            if image_path and os.path.exists(image_path):
+                pixmap = QPixmap(image_path)
+                if not pixmap.isNull():
+                    icon = QIcon(pixmap.scaled(32, 32, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+        elif p.is_service:
+            icon = load_icon("service.png")
+
+        if icon:
+            name_item.setIcon(icon)
+
+        self.products_table.setItem(row, 1, name_item)
+        self.products_table.setItem(row, 2, QTableWidgetItem("Service" if p.is_service else "Product"))
+        self.products_table.setItem(row, 3, QTableWidgetItem(price_text))
+        self.products_table.setItem(row, 4, QTableWidgetItem("N/A" if p.is_service else str(p.stock)))
+
+        add_btn = QPushButton("+")
+        add_btn.setFixedWidth(32)
+        add_btn.clicked.connect(lambda _, pid=p.id: self.add_to_cart(pid))
+        self.products_table.setCellWidget(row, 5, add_btn)
+
+    def apply_changes(self, changes, products):
+        if self._data_stale:
+            return
+        if changes.categories and not self._load_categories():
+            # The selected category is gone; the filter fell back to "All"
+            self._load_products()
+        elif changes.products:
+            apply_product_changes(
+                self.products_table, changes.products, products,
+                lambda p: catalog.matches(p, self.search_input.text(), self.category_filter.currentData()),
+                lambda row, p: self._fill_product_row(row, p, format_currency(p.price)),
+                self._load_products,
+            )
+        if any(pid in self.cart for pid in changes.products):
+            # Deleted products leave the cart; prices and VAT are re-read
+            self.cart = {pid: qty for pid, qty in self.cart.items() if pid in products or pid not in changes.products}
+            self._refresh_cart_table()
+
     def _add_selected_product(self, row, col):
         try:
             pid = int(self.products_table.item(row, 0).text())
@@ -233,69 +261,50 @@ class SalesScreen(QWidget):
             return
         self.add_to_cart(pid)
 
+    @tracked()
     def add_to_cart(self, product_id: int):
-        product = db_session.get(Product, product_id)
-        if not product:
+        try:
+            self.cart = cart_service.add_item(db_session, self.cart, product_id)
+        except NotFound:
+            return
+        except ServiceError as e:
+            QMessageBox.warning(self, "Insufficient Stock", str(e))
             return
-
-        qty = self.cart.get(product_id, 0) + 1
-
-        if not product.is_service:
-            if product.stock <= 0:
-                QMessageBox.warning(self, "Out of Stock", f"{product.name} is out of stock")
-                return
-            if qty > product.stock:
-                QMessageBox.warning(self, "Insufficient Stock", f"Only {product.stock} units available")
-                return
-
-        self.cart[product_id] = qty
         self._refresh_cart_table()
 
     def _refresh_cart_table(self):
-        items = []
-        for pid, qty in self.cart.items():
-            p = db_session.get(Product, pid)
-            if p:
-                items.append((p, qty))
-
-        self.cart_table.setRowCount(len(items))
+        priced = cart_service.price_cart(db_session, self.cart)
+        self.cart_table.setRowCount(len(priced.lines))
 
-        for row, (p, qty) in enumerate(items):
-            price = float(p.price)
-            total = price * qty
-
-            self.cart_table.setItem(row, 0, QTableWidgetItem(p.name))
-            self.cart_table.setItem(row, 1, QTableWidgetItem(format_currency(price)))
+        for row, line in enumerate(priced.lines):
+            self.cart_table.setItem(row, 0, QTableWidgetItem(line.name))
+            self.cart_table.setItem(row, 1, QTableWidgetItem(format_currency(line.price)))
 
             qty_widget = QSpinBox()
             qty_widget.setMinimum(1)
             qty_widget.setMaximum(9999)
-            qty_widget.setValue(qty)
-            qty_widget.valueChanged.connect(lambda v, pid=p.id: self._set_qty(pid, v))
+            qty_widget.setValue(line.qty)
+            qty_widget.valueChanged.connect(lambda v, pid=line.product_id: self._set_qty(pid, v))
             self.cart_table.setCellWidget(row, 2, qty_widget)
 
-            self.cart_table.setItem(row, 3, QTableWidgetItem(format_currency(total)))
+            self.cart_table.setItem(row, 3, QTableWidgetItem(format_currency(line.total)))
 
             rm_btn = QPushButton("X")
             rm_btn.setFixedWidth(32)
-            rm_btn.setStyleSheet("background-color: #000000; color: white;")
-            rm_btn.clicked.connect(lambda _, pid=p.id: self._remove_item(pid))
+            rm_btn.setObjectName("cart_remove_btn")
+            rm_btn.clicked.connect(lambda _, pid=line.product_id: self._remove_item(pid))
             self.cart_table.setCellWidget(row, 4, rm_btn)
 
         self.cart_table.resizeRowsToContents()
-        self._update_totals()
+        self._update_totals(priced)
 
     def _set_qty(self, product_id: int, qty: int):
-        product = db_session.get(Product, product_id)
-        if not product:
-            return
-
-        if not product.is_service and qty > product.stock:
-            QMessageBox.warning(self, "Insufficient Stock", f"Only {product.stock} units available")
-            self._refresh_cart_table()
+        try:
+            self.cart = cart_service.set_quantity(db_session, self.cart, product_id, qty)
+        except NotFound:
             return
-
-        self.cart[product_id] = qty
+        except ServiceError as e:
+            QMessageBox.warning(self, "Insufficient Stock", str(e))
         self._refresh_cart_table()
 
     def _remove_item(self, product_id: int):
@@ -303,17 +312,20 @@ class SalesScreen(QWidget):
             del self.cart[product_id]
         self._refresh_cart_table()
 
-    def _update_totals(self):
-        gross_total = Decimal("0")
-        for pid, qty in self.cart.items():
-            p = db_session.get(Product, pid)
-            if p:
-                gross_total += Decimal(str(p.price)) * int(qty)
-
-        vatable_sales, vat_amount, total = compute_ph_vat_breakdown(gross_total, prices_include_vat=True)
-        self.vatable_sales_label.setText(f"VATable Sales: {format_currency(vatable_sales)}")
-        self.vat_amount_label.setText(f"VAT ({int(PH_VAT_RATE * 100)}%): {format_currency(vat_amount)}")
-        self.total_label.setText(f"Total: {format_currency(total)}")
+    def _update_totals(self, priced=None):
+        if priced is None:
+            priced = cart_service.price_cart(db_session, self.cart, PH_VAT_RATE_BP)
+        summary = priced.summary
+        self.vatable_sales_label.setText(f"VATable Sales: {format_currency(summary.vatable)}")
+        non_vat = []
+        if summary.exempt_cents:
+            non_vat.append(f"VAT-Exempt: {format_currency(summary.exempt)}")
+        if summary.zero_rated_cents:
+            non_vat.append(f"Zero-Rated: {format_currency(summary.zero_rated)}")
+        self.non_vat_label.setText("   ".join(non_vat))
+        self.non_vat_label.setVisible(bool(non_vat))
+        self.vat_amount_label.setText(f"VAT ({int(PH_VAT_RATE * 100)}%): {format_currency(summary.vat)}")
+        self.total_label.setText(f"Total: {format_currency(summary.total)}")
 
     def new_sale(self):
         if self.cart:
@@ -331,6 +343,7 @@ class SalesScreen(QWidget):
         self.customer_phone.clear()
         self._refresh_cart_table()
 
+    @tracked()
     def checkout(self):
         if not self.current_user:
             QMessageBox.warning(self, "Not logged in", "Please login again.")
@@ -341,91 +354,49 @@ class SalesScreen(QWidget):
             return
 
         try:
-            gross_total = Decimal("0")
-            items = []
-            for pid, qty in self.cart.items():
-                p = db_session.get(Product, pid)
-                if not p:
-                    continue
-                if not p.is_service and qty > p.stock:
-                    raise Exception(f"Insufficient stock for {p.name}")
-                price = Decimal(str(p.price))
-                gross_total += price * int(qty)
-                items.append((p, qty, price))
-
-            _, _, total = compute_ph_vat_breakdown(gross_total, prices_include_vat=True)
-
+            # VAT-inclusive prices: the total is the gross sum itself.
+            total = cart_service.price_cart(db_session, self.cart).total
             pm = self.payment_method.currentData()
-
-            cash_received = None
-            change_amount = None
-            gcash_ref = None
+            payment = checkout_service.Payment(pm)
 
             # Prompt for payment-specific details
             if pm == 'cash':
-                ok = False
                 # ask for cash given
                 cash, ok = QInputDialog.getDouble(self, 'Cash Received', 'Enter cash handed by customer:', float(total), 0, 1000000, 2)
                 if not ok:
                     return
-                cash_received = cash
-                change_amount = float(Decimal(str(cash)) - Decimal(str(total)))
+                payment = payment._replace(cash_received=Money.of(cash))
             elif pm == 'gcash':
                 text, ok = QInputDialog.getText(self, 'GCash Reference', 'Enter GCash reference / transaction ID:')
                 if not ok:
                     return
-                gcash_ref = text.strip() or None
-
-            tx = Transaction(
-                employee_id=self.current_user.id,
-                total=total,
-                payment_method=pm,
-                cash_received=cash_received,
-                change_amount=change_amount,
-                gcash_ref=gcash_ref,
-                customer_name=(self.customer_name.text() or "").strip() or None,
-                customer_phone=(self.customer_phone.text() or "").strip() or None,
+                payment = payment._replace(gcash_ref=text.strip() or None)
+
+            result = checkout_service.checkout(
+                db_session,
+                self.current_user.id,
+                self.cart,
+                payment,
+                customer_name=self.customer_name.text(),
+                customer_phone=self.customer_phone.text(),
             )
-            db_session.add(tx)
-            db_session.flush()
-
-            for p, qty, price in items:
-                db_session.add(
-                    TransactionItem(
-                        transaction_id=tx.id,
-                        product_id=p.id,
-                        qty=qty,
-                        price=price,
-                        cost_price=float(getattr(p, "cost_price", 0.0) or 0.0),
-                    )
-                )
-
-                if not p.is_service:
-                    p.stock = max(0, int(p.stock) - int(qty))
-                    db_session.add(
-                        StockChange(
-                            product_id=p.id,
-                            user_id=self.current_user.id,
-                            qty_change=-int(qty),
-                            note=f"Sold in transaction #{tx.id}",
-                        )
-                    )
-
-            db_session.commit()
+            dashboard_metrics.record_transaction(result.transaction_id, result.total, result.customer_name, result.created_at)
 
             reply = QMessageBox.question(
                 self,
                 "Checkout Complete",
-                f"Transaction #{tx.id} saved. Print/View receipt?",
+                f"Transaction #{result.transaction_id} saved. Print/View receipt?",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                 QMessageBox.StandardButton.Yes,
             )
             if reply == QMessageBox.StandardButton.Yes:
-                ReceiptDialog(tx.id, self).exec()
+                ReceiptDialog(result.transaction_id, self, new_sale=True).exec()
 
             self.new_sale()
             self._load_products()
 
+        except ServiceError as e:
+            QMessageBox.warning(self, "Checkout", str(e))
         except Exception as e:
             db_session.rollback()
             QMessageBox.critical(self, "Error", str(e))
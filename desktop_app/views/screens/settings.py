@@ -8,25 +8,25 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 from sqlalchemy import desc
 
-from ...controllers import db_session
+from ...controllers import db_session, user_roster
+from ...controllers.instrumentation import action_timings, query_stats
 from ...models import User, StockChange
 from ...utils.helpers import load_icon
+from .. import watchdog
 from ..widgets import (
     ModernTable, ActionButton, SectionHeader, IconButton, ModernDialog
 )
+from .base import Screen
 
 
-class SettingsScreen(QWidget):
+class SettingsScreen(Screen):
     """Settings screen with employees and stock logs management."""
     
     def __init__(self):
         super().__init__()
-        self.current_user = None
         self._build_ui()
 
-    def set_user(self, user):
-        self.current_user = user
-        self._apply_permissions()
+    def reload_data(self):
         self.refresh_all()
 
     def _build_ui(self):
@@ -42,7 +42,7 @@ class SettingsScreen(QWidget):
         title_font.setPointSize(24)
         title_font.setBold(True)
         title.setFont(title_font)
-        title.setStyleSheet("color: #00b050;")
+        title.setProperty("accent", "primary")
         header.addWidget(title)
         header.addStretch()
 
@@ -54,31 +54,12 @@ class SettingsScreen(QWidget):
 
         # Unauthorized message
         self.unauthorized_label = QLabel("⚠️  Admin access required to manage settings")
-        self.unauthorized_label.setStyleSheet("""
-            color: #f44336;
-            font-weight: bold;
-            padding: 12px;
-            background-color: #ffebee;
-            border-radius: 4px;
-        """)
+        self.unauthorized_label.setProperty("role", "error-banner")
         self.unauthorized_label.setVisible(False)
         layout.addWidget(self.unauthorized_label)
 
         # Tabs
         self.tabs = QTabWidget()
-        self.tabs.setStyleSheet("""
-            QTabBar::tab {
-                background-color: #f5f5f5;
-                color: #333333;
-                padding: 8px 16px;
-                border: none;
-                border-bottom: 2px solid transparent;
-            }
-            QTabBar::tab:selected {
-                background-color: white;
-                border-bottom: 2px solid #00b050;
-            }
-        """)
         layout.addWidget(self.tabs, 1)
 
         # === Employees Tab ===
@@ -100,6 +81,10 @@ class SettingsScreen(QWidget):
         self.reset_pw_btn.clicked.connect(self.reset_password)
         btn_row.addWidget(self.reset_pw_btn)
 
+        self.set_pin_btn = ActionButton("Set PIN", "edit.png", "#000000")
+        self.set_pin_btn.clicked.connect(self.set_pin)
+        btn_row.addWidget(self.set_pin_btn)
+
         self.delete_emp_btn = ActionButton("Delete", "delete.png", "#f44336")
         self.delete_emp_btn.clicked.connect(self.delete_employee)
         btn_row.addWidget(self.delete_emp_btn)
@@ -145,10 +130,60 @@ class SettingsScreen(QWidget):
         logs_layout.addWidget(self.logs_table, 1)
         self.tabs.addTab(logs_tab, "Stock Logs")
 
+        # === Diagnostics Tab ===
+        diag_tab = QWidget()
+        diag_layout = QVBoxLayout(diag_tab)
+        diag_layout.setContentsMargins(0, 15, 0, 0)
+        diag_layout.setSpacing(12)
+
+        diag_row = QHBoxLayout()
+        diag_row.addWidget(SectionHeader("Performance"))
+        diag_row.addStretch()
+        self.diag_summary = QLabel("")
+        self.diag_summary.setProperty("role", "caption")
+        diag_row.addWidget(self.diag_summary)
+        diag_refresh_btn = ActionButton("Refresh", "refresh.png", "#000000")
+        diag_refresh_btn.clicked.connect(self.load_diagnostics)
+        diag_row.addWidget(diag_refresh_btn)
+        diag_reset_btn = ActionButton("Reset", "delete.png", "#f44336")
+        diag_reset_btn.clicked.connect(self.reset_diagnostics)
+        diag_row.addWidget(diag_reset_btn)
+        diag_layout.addLayout(diag_row)
+
+        diag_tabs = QTabWidget()
+        stat_labels = ["Calls", "Total ms", "p50 ms", "p95 ms", "Max ms"]
+        self.ui_table = self._stats_table(["Action"] + stat_labels)
+        diag_tabs.addTab(self.ui_table, "UI Actions")
+        self.stall_table = self._stats_table(["Time", "ms", "Slot", "Hot Frame", "Samples"])
+        diag_tabs.addTab(self.stall_table, "UI Stalls")
+        self.stmt_table = self._stats_table(["Statement"] + stat_labels + ["Top Action"])
+        diag_tabs.addTab(self.stmt_table, "SQL Statements")
+        self.action_table = self._stats_table(["Action"] + stat_labels)
+        diag_tabs.addTab(self.action_table, "SQL by Action")
+        self.slow_table = self._stats_table(["Time", "ms", "Action", "Statement"])
+        diag_tabs.addTab(self.slow_table, "Slow Queries")
+        diag_layout.addWidget(diag_tabs, 1)
+
+        self.diag_tab = diag_tab
+        self.tabs.addTab(diag_tab, "Diagnostics")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+
+    def _stats_table(self, labels):
+        table = ModernTable()
+        table.setColumnCount(len(labels))
+        table.setHorizontalHeaderLabels(labels)
+        header = table.horizontalHeader()
+        for col in range(len(labels)):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+        # The statement (or slot) column takes the remaining width
+        stretch = next((labels.index(l) for l in ("Statement", "Slot") if l in labels), 0)
+        header.setSectionResizeMode(stretch, QHeaderView.ResizeMode.Stretch)
+        return table
+
     def _is_admin(self) -> bool:
         return bool(self.current_user and getattr(self.current_user, 'role', None) == 'admin')
 
-    def _apply_permissions(self):
+    def apply_permissions(self):
         admin = self._is_admin()
         self.unauthorized_label.setVisible(not admin)
         self.tabs.setEnabled(admin)
@@ -158,6 +193,12 @@ class SettingsScreen(QWidget):
             return
         self.load_users()
         self.load_stock_logs()
+        if self.tabs.currentWidget() is self.diag_tab:
+            self.load_diagnostics()
+
+    def _on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.diag_tab and self._is_admin():
+            self.load_diagnostics()
 
     def load_users(self):
         users = db_session.query(User).order_by(User.username).all()
@@ -202,6 +243,29 @@ class SettingsScreen(QWidget):
         db_session.commit()
         QMessageBox.information(self, "Updated", "Password updated.")
 
+    def set_pin(self):
+        if not self._is_admin():
+            return
+        u = self.selected_user()
+        if not u:
+            return
+        pin, ok = QInputDialog.getText(
+            self,
+            "Set PIN",
+            f"Quick-switch PIN for {u.username} (4-8 digits, blank to remove):",
+            QLineEdit.EchoMode.Password,
+        )
+        if not ok:
+            return
+        pin = (pin or "").strip()
+        if pin and not (pin.isdigit() and 4 <= len(pin) <= 8):
+            QMessageBox.warning(self, "Error", "PIN must be 4 to 8 digits.")
+            return
+        u.set_pin(pin or None)
+        db_session.commit()
+        user_roster.invalidate()
+        QMessageBox.information(self, "Updated", "PIN updated." if pin else "PIN removed.")
+
     def delete_employee(self):
         if not self._is_admin():
             return
@@ -222,6 +286,7 @@ class SettingsScreen(QWidget):
             return
         db_session.delete(u)
         db_session.commit()
+        user_roster.invalidate()
         self.load_users()
 
     def load_stock_logs(self):
@@ -242,6 +307,77 @@ class SettingsScreen(QWidget):
             self.logs_table.setItem(row, 4, QTableWidgetItem(l.note or ""))
         self.logs_table.resizeRowsToContents()
 
+    def load_diagnostics(self):
+        """Fill the Diagnostics tab from the in-memory stats (no database access)."""
+        if not self._is_admin():
+            return
+        statements = query_stats.statements()
+        actions = query_stats.actions()
+        slow = list(reversed(query_stats.slow))
+        ui_actions = action_timings.rows()
+        monitor = watchdog.event_loop_watchdog
+        stalls = list(reversed(monitor.stalls)) if monitor else []
+
+        self.ui_table.setRowCount(len(ui_actions))
+        for row, r in enumerate(ui_actions):
+            self._fill_stat_row(self.ui_table, row, r)
+
+        self.stall_table.setRowCount(len(stalls))
+        for row, st in enumerate(stalls):
+            self.stall_table.setItem(row, 0, QTableWidgetItem(st.at.strftime('%Y-%m-%d %H:%M:%S')))
+            self.stall_table.setItem(row, 1, QTableWidgetItem(f"{st.ms:.0f}"))
+            slot = QTableWidgetItem(st.slot)
+            slot.setToolTip(st.stack)
+            self.stall_table.setItem(row, 2, slot)
+            self.stall_table.setItem(row, 3, QTableWidgetItem(st.hot))
+            self.stall_table.setItem(row, 4, QTableWidgetItem(str(st.samples)))
+
+        self.stmt_table.setRowCount(len(statements))
+        for row, r in enumerate(statements):
+            self._fill_stat_row(self.stmt_table, row, r)
+            self.stmt_table.setItem(row, 6, QTableWidgetItem(r.top_action))
+
+        self.action_table.setRowCount(len(actions))
+        for row, r in enumerate(actions):
+            self._fill_stat_row(self.action_table, row, r)
+
+        self.slow_table.setRowCount(len(slow))
+        for row, q in enumerate(slow):
+            self.slow_table.setItem(row, 0, QTableWidgetItem(q.at.strftime('%Y-%m-%d %H:%M:%S')))
+            self.slow_table.setItem(row, 1, QTableWidgetItem(f"{q.ms:.1f}"))
+            self.slow_table.setItem(row, 2, QTableWidgetItem(q.action))
+            item = QTableWidgetItem(q.statement)
+            item.setToolTip(f"{q.statement}\n{q.params}")
+            self.slow_table.setItem(row, 3, item)
+
+        calls = sum(r.calls for r in actions)
+        total_ms = sum(r.total_ms for r in actions)
+        lag = next((r for r in ui_actions if r.key == watchdog.EVENT_LOOP), None)
+        parts = [f"{calls} statements, {total_ms:,.0f} ms in the last {2 * query_stats.window_s / 60:g} min"]
+        if lag:
+            parts.append(f"loop lag p95 {lag.p95_ms:.0f} ms")
+        parts.append(f"{len(stalls)} stalls" if monitor else "watchdog off")
+        self.diag_summary.setText(" · ".join(parts))
+
+    def _fill_stat_row(self, table, row, r):
+        item = QTableWidgetItem(r.key)
+        item.setToolTip(r.key)
+        table.setItem(row, 0, item)
+        for col, value in enumerate((r.calls, r.total_ms, r.p50_ms, r.p95_ms, r.max_ms), start=1):
+            text = str(value) if col == 1 else f"{value:,.1f}"
+            cell = QTableWidgetItem(text)
+            cell.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            table.setItem(row, col, cell)
+
+    def reset_diagnostics(self):
+        if not self._is_admin():
+            return
+        query_stats.reset()
+        action_timings.reset()
+        if watchdog.event_loop_watchdog:
+            watchdog.event_loop_watchdog.reset()
+        self.load_diagnostics()
+
 
 class AddEmployeeDialog(ModernDialog):
     """Modern dialog for adding new employees."""
@@ -0,0 +1,283 @@
+"""Application-wide stylesheet.
+
+All styling lives in one stylesheet that ``apply_theme`` installs on the
+QApplication once. Widgets opt in through their object name, their class
+name (``ModernTable``, ``ActionButton``...) or a dynamic property:
+
+    role     QLabel text styles: heading, subheading, caption, emphasis,
+             total, error-banner, field-label
+    accent   color variant: primary, dark, info, danger (see ACCENTS)
+    trend    up / down change indicators on the dashboard
+    status   StatusBadge state: success, warning, error, info
+
+Qt parses and caches a single sheet instead of one per widget, which keeps
+screen construction and polish cheap.
+"""
+
+from string import Template
+from typing import Optional
+
+from PyQt6.QtCore import Qt
+
+GREEN = "#00b050"
+BLACK = "#000000"
+BLUE = "#2196f3"
+RED = "#f44336"
+ORANGE = "#ff9800"
+
+# Colors passed around by the screens, mapped to the ``accent`` property.
+ACCENTS = {
+    GREEN: "primary",
+    BLACK: "dark",
+    BLUE: "info",
+    RED: "danger",
+}
+
+
+def shade(hex_color: str, percent: float) -> str:
+    """Shade a hex color by percent."""
+    try:
+        hex_color = hex_color.lstrip('#')
+        rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        r, g, b = (max(0, min(255, int(c * (1 + percent / 100)))) for c in rgb)
+        return f"#{r:02x}{g:02x}{b:02x}"
+    except ValueError:
+        return hex_color
+
+
+def accent_for(color: str) -> Optional[str]:
+    return ACCENTS.get((color or "").lower())
+
+
+def set_accent(widget, color: str, fallback_css: str = "") -> bool:
+    """Tag ``widget`` with the accent for ``color``.
+
+    Colors outside ACCENTS have no rule in the stylesheet, so
+    ``fallback_css`` is applied inline instead. Returns True if themed.
+    """
+    accent = accent_for(color)
+    if accent is not None:
+        widget.setProperty("accent", accent)
+        return True
+    if fallback_css:
+        widget.setStyleSheet(fallback_css)
+    return False
+
+
+def set_state(widget, name: str, value):
+    """Change a styling property after the widget was polished."""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    # Unpolished widgets pick the property up on their first polish.
+    if widget.testAttribute(Qt.WidgetAttribute.WA_WState_Polished):
+        style = widget.style()
+        style.unpolish(widget)
+        style.polish(widget)
+
+
+_ACCENT_RULES = Template("""
+ActionButton[accent="$name"] { background-color: $color; }
+ActionButton[accent="$name"]:hover { background-color: $hover; }
+ActionButton[accent="$name"]:pressed { background-color: $pressed; }
+MetricCard[accent="$name"] { border-left: 4px solid $color; }
+QuickActionCard[accent="$name"]:hover { border: 1px solid $color; }
+QFrame#metric_bar[accent="$name"], QLabel#metric_icon[accent="$name"],
+QLabel#action_icon[accent="$name"], QLabel#card_icon[accent="$name"] { background-color: $color; }
+""")
+
+_STYLESHEET = Template("""
+/* ---- Login ---- */
+QWidget#LoginWindow, QWidget#LoginWindow QWidget { font-family: 'Segoe UI', Arial, sans-serif; }
+QFrame#LeftPanel { background-color: #000000; }
+QLabel#SystemTitle { color: white; font-size: 26px; font-weight: 700; }
+QLabel#SystemSubtitle { color: rgba(255,255,255,0.85); font-size: 13px; }
+QLabel#FooterText { color: rgba(255,255,255,0.6); font-size: 11px; }
+QFrame#RightPanel { background-color: white; }
+QLabel#LoginTitle { font-size: 22px; font-weight: 700; color: #111827; }
+QLabel#LoginSubtitle { font-size: 13px; color: #6b7280; }
+QWidget#LoginWindow QLineEdit {
+    height: 42px; border-radius: 6px; border: 1px solid #d1d5db;
+    padding-left: 14px; font-size: 14px;
+}
+QWidget#LoginWindow QLineEdit:focus { border: 1px solid #1677ff; }
+QPushButton#LoginButton {
+    height: 44px; border-radius: 6px; background-color: #1677ff; color: white;
+    font-size: 14px; font-weight: 600; border: none;
+}
+QPushButton#LoginButton:hover { background-color: #0f63d1; }
+QPushButton#LinkButton { background: transparent; border: none; color: #1677ff; font-size: 12px; }
+QPushButton#LinkButton:hover { text-decoration: underline; }
+
+/* ---- Main window ---- */
+QToolBar {
+    background: #ffffff; border: none; border-bottom: 1px solid $green;
+    padding: 6px; spacing: 6px;
+}
+QToolBar QToolButton { color: #000000; padding: 6px 10px; border-radius: 6px; }
+QToolBar QToolButton:hover { background: $green; color: #ffffff; }
+QStatusBar { background: #ffffff; border-top: 1px solid $green; padding: 6px; }
+QStatusBar QLabel { color: #000000; }
+QSplitter::handle { background: $green; }
+QLabel#page_title { color: $green; padding-left: 6px; }
+
+QFrame#sidebar { background-color: #000000; color: #ffffff; }
+QLabel#app_name { font-size: 18px; font-weight: bold; padding: 8px 0px; color: $green; }
+QLabel#user_info {
+    padding: 12px; border-radius: 6px; background: rgba(0, 176, 80, 0.15);
+    font-size: 11px; color: #e0e0e0; border: 1px solid rgba(0, 176, 80, 0.25);
+}
+QListWidget#nav_list { background: transparent; border: none; outline: none; }
+QListWidget#nav_list::item {
+    padding: 12px 10px; margin: 4px 0px; border-radius: 6px; color: #cccccc; icon-size: 18px;
+}
+QListWidget#nav_list::item:hover { background: rgba(0, 176, 80, 0.2); color: #ffffff; }
+QListWidget#nav_list::item:selected { background: $green; color: #000000; font-weight: bold; }
+QToolButton#logout_btn, QToolButton#switch_user_btn {
+    padding: 10px 10px; border-radius: 6px; text-align: left; color: #ffffff;
+    background: transparent; border: 1px solid rgba(0, 176, 80, 0.2);
+}
+QToolButton#logout_btn:hover, QToolButton#switch_user_btn:hover {
+    background: rgba(0, 176, 80, 0.25); border: 1px solid rgba(0, 176, 80, 0.4);
+}
+
+QWidget#content { background-color: #ffffff; }
+QWidget#content QPushButton { font-size: 13px; }
+QTableWidget {
+    background-color: #ffffff; color: #000000;
+    alternate-background-color: rgba(0, 176, 80, 0.06); gridline-color: $green;
+    selection-background-color: $green; selection-color: #ffffff;
+}
+QHeaderView::section { background-color: #000000; color: #ffffff; border: 1px solid $green; }
+QTabBar::tab {
+    background-color: #f5f5f5; color: #333333; padding: 8px 16px;
+    border: none; border-bottom: 2px solid transparent;
+}
+QTabBar::tab:selected { background-color: white; border-bottom: 2px solid $green; }
+
+/* ---- Text roles ---- */
+QLabel[accent="primary"] { color: $green; }
+QLabel[role="heading"] { font-size: 24px; font-weight: bold; }
+QLabel[role="subheading"] { font-size: 16px; font-weight: bold; }
+QLabel[role="caption"] { font-size: 12px; }
+QLabel[role="emphasis"] { font-weight: bold; color: $green; }
+QLabel[role="field-label"] { font-weight: 600; }
+QLabel[role="total"] { font-size: 22px; font-weight: 800; color: $green; }
+QLabel[role="error-banner"] {
+    color: $red; font-weight: bold; padding: 12px; background-color: #ffebee; border-radius: 4px;
+}
+
+/* ---- Dialogs ---- */
+ModernDialog { background-color: #f5f5f5; }
+ModernDialog QLineEdit, ModernDialog QComboBox, ModernDialog QSpinBox, ModernDialog QDoubleSpinBox {
+    padding: 8px 10px; border: 1px solid #d0d0d0; border-radius: 6px;
+    background-color: white; font-size: 13px; min-height: 28px;
+}
+ModernDialog QLineEdit:focus, ModernDialog QComboBox:focus,
+ModernDialog QSpinBox:focus, ModernDialog QDoubleSpinBox:focus { border: 2px solid $green; }
+ModernDialog QLabel { color: #333333; font-size: 12px; font-weight: 500; }
+QLabel#image_drop { background-color: #f5f5f5; border: 2px dashed $green; border-radius: 6px; }
+QTextEdit#receipt_text { background: #ffffff; color: #000000; }
+
+/* ---- Modern widgets ---- */
+ModernCard { background: white; border-radius: 8px; border: 1px solid #e0e0e0; }
+MetricCard { background: white; border-radius: 8px; }
+MetricCard QLabel#card_title { color: #666666; font-size: 12px; font-weight: 600; }
+MetricCard QLabel#card_value { color: #1a1a1a; font-size: 24px; font-weight: 700; }
+QuickActionCard, ProductCard { background: white; border-radius: 8px; border: 1px solid #e0e0e0; }
+ProductCard:hover { border: 2px solid $green; }
+QLabel#card_icon { border-radius: 8px; }
+QuickActionCard QLabel#card_title { font-size: 14px; font-weight: 600; color: #1a1a1a; }
+ProductCard QLabel#card_title { font-size: 13px; font-weight: 600; color: #1a1a1a; }
+ProductCard QLabel#card_price { font-size: 14px; font-weight: 700; color: $green; }
+
+ActionButton {
+    color: white; border: none; border-radius: 6px; padding: 8px 16px;
+    font-weight: 600; font-size: 13px;
+}
+IconButton {
+    background-color: transparent; border: 1px solid #cccccc; border-radius: 4px; padding: 2px;
+}
+IconButton:hover { background-color: #f0f0f0; border: 1px solid $green; }
+
+ModernTable {
+    background-color: white; color: #1a1a1a; alternate-background-color: #f5f5f5;
+    gridline-color: #e0e0e0; selection-background-color: $green;
+}
+ModernTable::item { padding: 4px; border: none; }
+ModernTable::item:selected { background-color: $green; color: white; }
+ModernTable QHeaderView::section {
+    background-color: #000000; color: white; padding: 6px; border: none;
+    font-weight: 600; font-size: 12px;
+}
+
+SearchBar, ModernDialog SearchBar { padding: 8px 12px; border: 1px solid #d0d0d0; border-radius: 6px; font-size: 13px; }
+SearchBar:focus, ModernDialog SearchBar:focus { border: 2px solid $green; }
+FilterComboBox, ModernDialog FilterComboBox {
+    padding: 6px 10px; border: 1px solid #d0d0d0; border-radius: 6px;
+    background-color: white; font-size: 13px;
+}
+FilterComboBox:focus, ModernDialog FilterComboBox:focus { border: 2px solid $green; }
+FilterComboBox::drop-down { border: none; width: 20px; }
+FilterComboBox::down-arrow { image: none; }
+
+StatusBadge { padding: 4px 10px; border-radius: 4px; font-size: 11px; font-weight: 600; }
+StatusBadge[status="success"] { color: $green; background-color: #e8f5e9; border: 1px solid $green; }
+StatusBadge[status="warning"] { color: $orange; background-color: #fff3e0; border: 1px solid $orange; }
+StatusBadge[status="error"] { color: $red; background-color: #ffebee; border: 1px solid $red; }
+StatusBadge[status="info"] { color: $blue; background-color: #e3f2fd; border: 1px solid $blue; }
+
+SectionHeader, ModernDialog SectionHeader {
+    font-size: 16px; font-weight: 700; color: $green; padding: 8px 0px;
+    border-bottom: 2px solid $green;
+}
+LoadingSpinner { background: transparent; border: none; }
+LoadingSpinner QLabel { font-size: 13px; color: #666666; font-weight: 600; }
+
+/* ---- Sales ---- */
+QPushButton#checkout_btn {
+    background-color: $green; color: white; font-weight: bold; padding: 8px 18px; border-radius: 4px;
+}
+QPushButton#cart_remove_btn { background-color: #000000; color: white; }
+
+/* ---- Dashboard ---- */
+QScrollArea#dashboard_scroll { background-color: #f5f5f5; border: none; }
+QFrame#metrics_container { background: transparent; }
+QLabel#dashboard_title { font-size: 32px; font-weight: 700; color: $green; letter-spacing: -0.5px; }
+QLabel#dashboard_date { font-size: 14px; color: #666666; font-weight: 500; }
+QLabel#dashboard_section { font-size: 20px; font-weight: 700; color: $green; padding-bottom: 8px; }
+QFrame#metric_card { background: white; border-radius: 12px; padding: 0px; }
+QFrame#metric_bar { border-radius: 2px; }
+QLabel#metric_icon { border-radius: 8px; padding: 8px; }
+QLabel#metric_title {
+    color: #666666; font-size: 13px; font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px;
+}
+QLabel#metric_value { font-size: 28px; font-weight: 700; color: #1a1a1a; }
+QLabel[trend] { font-size: 12px; font-weight: 600; }
+QLabel[trend="up"] { color: $green; }
+QLabel[trend="down"] { color: $red; }
+QFrame#action_card { background: white; border-radius: 12px; padding: 20px; }
+QFrame#action_card:hover { background: #f8f9fa; }
+QLabel#action_icon { border-radius: 10px; padding: 10px; }
+QLabel#action_title { font-size: 16px; font-weight: 600; color: #1a1a1a; }
+QLabel#action_desc { font-size: 13px; color: #666666; }
+""")
+
+
+def _build_stylesheet() -> str:
+    palette = {"green": GREEN, "blue": BLUE, "red": RED, "orange": ORANGE}
+    parts = [_STYLESHEET.substitute(palette)]
+    for color, name in ACCENTS.items():
+        parts.append(_ACCENT_RULES.substitute(
+            name=name, color=color, hover=shade(color, -10), pressed=shade(color, -20),
+        ))
+    return "".join(parts)
+
+
+# Built once at import; Qt parses it once in apply_theme().
+STYLESHEET = _build_stylesheet()
+
+
+def apply_theme(app):
+    """Install the application stylesheet on ``app``."""
+    app.setStyleSheet(STYLESHEET)
@@ -0,0 +1,167 @@
+"""Event-loop watchdog: finds the slots that freeze the UI.
+
+A heartbeat QTimer fires every POS_WATCHDOG_INTERVAL_MS (default 50) on the
+GUI thread, and each beat records how late it ran as "event loop lag". A
+sampler thread wakes at the same interval. When the last beat is older than
+POS_STALL_MS (default 250), the sampler captures the GUI thread's stack via
+``sys._current_frames``. Once the loop comes back, the stall is logged:
+- its duration;
+- the slot that was running (the outermost application frame);
+- the hottest application frame among the samples.
+
+Stalls are printed to stderr, kept for the Settings > Diagnostics tab and,
+when POS_STALL_LOG names a file, appended there. Per-action latencies come
+from ``controllers.instrumentation.action_timings``. Set POS_WATCHDOG=0 to
+turn the watchdog off.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import NamedTuple
+
+from PyQt6.QtCore import QObject, QTimer
+
+from ..controllers.instrumentation import action_timings
+
+INTERVAL_MS = int(os.getenv('POS_WATCHDOG_INTERVAL_MS', '50'))
+STALL_MS = float(os.getenv('POS_STALL_MS', '250'))
+STALL_LOG = os.getenv('POS_STALL_LOG', '')
+ENABLED = os.getenv('POS_WATCHDOG', '1') != '0'
+
+EVENT_LOOP = "<event loop lag>"
+STALLS_KEPT = 100
+_APP_PACKAGE = __name__.split(".")[0]  # "desktop_app"
+# Frames that only drive the event loop or wrap slots; never reported.
+_LOOP_FRAMES = {(f"{_APP_PACKAGE}.main", "main"), (f"{_APP_PACKAGE}.__main__", "<module>")}
+_SKIP_MODULES = {f"{_APP_PACKAGE}.controllers.instrumentation"}
+
+
+class Stall(NamedTuple):
+    at: datetime
+    ms: float
+    slot: str
+    hot: str
+    samples: int
+    stack: str
+
+
+def _app_frames(frame):
+    """Application frames from innermost to outermost as (label, location)."""
+    frames = []
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        code = frame.f_code
+        if (module.startswith(_APP_PACKAGE) and module not in _SKIP_MODULES
+                and (module, code.co_name) not in _LOOP_FRAMES):
+            name = getattr(code, "co_qualname", code.co_name)
+            frames.append((f"{module[len(_APP_PACKAGE) + 1:]}.{name}", f"{code.co_filename}:{frame.f_lineno}"))
+        frame = frame.f_back
+    return frames
+
+
+class EventLoopWatchdog(QObject):
+    """Heartbeat timer plus stack sampler; see the module docstring."""
+
+    def __init__(self, interval_ms: int = INTERVAL_MS, stall_ms: float = STALL_MS,
+                 stall_log: str = STALL_LOG, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self.stall_log = stall_log
+        self.stalls = deque(maxlen=STALLS_KEPT)
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._beat)
+        self._lock = threading.Lock()
+        self._samples = []
+        self._last_beat = time.perf_counter()
+        self._gui_ident = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """Start on the GUI thread (the thread that will be sampled)."""
+        if self.running:
+            return
+        self._gui_ident = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._timer.start()
+        self._thread = threading.Thread(target=self._sample_loop, name="pos-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._timer.stop()
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def _beat(self):
+        now = time.perf_counter()
+        gap_ms = (now - self._last_beat) * 1000.0
+        self._last_beat = now
+        action_timings.add(EVENT_LOOP, max(0.0, gap_ms - self.interval_ms))
+        with self._lock:
+            samples, self._samples = self._samples, []
+        if gap_ms >= self.stall_ms:
+            self._record(gap_ms, samples)
+
+    def _sample_loop(self):
+        interval = self.interval_ms / 1000.0
+        stall = self.stall_ms / 1000.0
+        while not self._stop.wait(interval):
+            if time.perf_counter() - self._last_beat < stall:
+                continue
+            frame = sys._current_frames().get(self._gui_ident)
+            if frame is None:
+                continue
+            frames = _app_frames(frame)
+            del frame
+            with self._lock:
+                self._samples.append(frames)
+
+    def _record(self, ms, samples):
+        samples = [s for s in samples if s]
+        if samples:
+            slot = Counter(s[-1][0] for s in samples).most_common(1)[0][0]
+            hot = Counter(s[0][0] for s in samples).most_common(1)[0][0]
+            stack = "\n".join(f"{label} ({where})" for label, where in reversed(samples[-1]))
+        else:
+            # Nothing of ours on the stack: Qt itself, a native dialog, or a suspended machine.
+            slot = hot = "<outside the app>"
+            stack = ""
+        stall = Stall(datetime.now(), ms, slot, hot, len(samples), stack)
+        self.stalls.append(stall)
+        line = f"UI stall {ms:.0f} ms in {slot} (hot: {hot}, {len(samples)} samples)"
+        print(line, file=sys.stderr)
+        if self.stall_log:
+            try:
+                with open(self.stall_log, "a", encoding="utf-8") as f:
+                    f.write(f"{stall.at.isoformat(timespec='seconds')}\t{line}\n{stack}\n\n")
+            except OSError as e:
+                print(f"Error writing stall log: {e}")
+
+    def reset(self):
+        self.stalls.clear()
+
+
+event_loop_watchdog = None
+
+
+def start_watchdog(parent=None):
+    """Create and start the shared watchdog (unless POS_WATCHDOG=0)."""
+    global event_loop_watchdog
+    if ENABLED and event_loop_watchdog is None:
+        event_loop_watchdog = EventLoopWatchdog(parent=parent)
+        event_loop_watchdog.start()
+    return event_loop_watchdog
@@ -14,6 +14,11 @@ from .modern_widgets import (
     QuickActionCard,
     ProductCard,
     LoadingSpinner,
+    NineSliceShadow,
+    apply_shadow,
+    shadow_mode,
+    set_shadow_mode,
+    SHADOW_MODES,
 )
 
 __all__ = [
@@ -30,4 +35,9 @@ __all__ = [
     "QuickActionCard",
     "ProductCard",
     "LoadingSpinner",
+    "NineSliceShadow",
+    "apply_shadow",
+    "shadow_mode",
+    "set_shadow_mode",
+    "SHADOW_MODES",
 ]
@@ -1,14 +1,176 @@
 """Modern widget components for POS UI."""
 
+import os
+
 from PyQt6.QtWidgets import (
     QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QLineEdit, QComboBox, QTableWidget, QTableWidgetItem,
     QHeaderView, QWidget, QDialog, QDialogButtonBox,
-    QGraphicsDropShadowEffect, QAbstractItemView
+    QGraphicsDropShadowEffect, QAbstractItemView,
+    QGraphicsScene, QGraphicsPixmapItem
 )
-from PyQt6.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve
-from PyQt6.QtGui import QFont, QColor, QIcon
+from PyQt6.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, QEvent, QRect, QRectF, QSettings
+from PyQt6.QtGui import QFont, QColor, QIcon, QImage, QPainter, QPixmap
 from ...utils.helpers import load_icon
+from ..theme import set_accent, set_state, shade
+
+
+# =======================
+# SHADOW RENDERING
+# =======================
+# "effect": QGraphicsDropShadowEffect (offscreen render + blur on every repaint)
+# "cached": blur once into a 9-slice pixmap and paint it behind the widget
+# "none":   no shadows at all, for the slowest lane PCs
+SHADOW_MODES = ("effect", "cached", "none")
+DEFAULT_SHADOW_MODE = "cached"
+
+_shadow_mode = None
+_shadow_tiles = {}
+
+
+def shadow_mode() -> str:
+    """Shadow mode for this terminal: POS_SHADOW_MODE, else QSettings render/shadow_mode."""
+    global _shadow_mode
+    if _shadow_mode is None:
+        mode = os.getenv('POS_SHADOW_MODE', '')
+        if not mode:
+            mode = QSettings("POS", "POS Desktop").value("render/shadow_mode", DEFAULT_SHADOW_MODE)
+        _shadow_mode = mode if mode in SHADOW_MODES else DEFAULT_SHADOW_MODE
+    return _shadow_mode
+
+
+def set_shadow_mode(mode: str, persist: bool = False):
+    """Change the mode for widgets created from now on (optionally saving it for this terminal)."""
+    global _shadow_mode
+    if mode not in SHADOW_MODES:
+        raise ValueError(f"Unknown shadow mode: {mode}")
+    _shadow_mode = mode
+    if persist:
+        QSettings("POS", "POS Desktop").setValue("render/shadow_mode", mode)
+
+
+def _shadow_tile(blur: int, radius: int, color: QColor) -> QPixmap:
+    """Blurred rounded-rect shadow with a transparent centre, rendered once per style."""
+    key = (blur, radius, color.rgba())
+    tile = _shadow_tiles.get(key)
+    if tile is not None:
+        return tile
+
+    margin = blur + radius
+    size = 2 * margin + 1
+    body = QRectF(blur, blur, size - 2 * blur, size - 2 * blur)
+
+    source = QPixmap(size, size)
+    source.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(source)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QColor(0, 0, 0))
+    painter.drawRoundedRect(body, radius, radius)
+    painter.end()
+
+    # Let Qt's own blur produce the shadow, exactly once.
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(source)
+    effect = QGraphicsDropShadowEffect()
+    effect.setBlurRadius(blur)
+    effect.setOffset(0, 0)
+    effect.setColor(color)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+
+    image = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(0, 0, size, size), QRectF(0, 0, size, size))
+    # The widget itself covers the body; cut it out so only the shadow remains.
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QColor(0, 0, 0))
+    painter.drawRoundedRect(body, radius, radius)
+    painter.end()
+
+    tile = QPixmap.fromImage(image)
+    _shadow_tiles[key] = tile
+    return tile
+
+
+class NineSliceShadow(QWidget):
+    """Sibling widget that paints a cached shadow pixmap behind ``target``."""
+
+    def __init__(self, target, blur=12, x_offset=0, y_offset=2, color=None, radius=8):
+        super().__init__(target.parentWidget())
+        self.target = target
+        self.blur = blur
+        self.offset = (x_offset, y_offset)
+        self.margin = blur + radius
+        self.tile = _shadow_tile(blur, radius, color if color is not None else QColor(0, 0, 0, 30))
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        target.installEventFilter(self)
+        # A sibling isn't deleted with the target, so go when it does
+        target.destroyed.connect(self.deleteLater)
+        self.sync()
+
+    def sync(self):
+        parent = self.target.parentWidget()
+        if parent is not self.parentWidget():
+            self.setParent(parent)
+        if parent is None or self.target.isHidden():
+            self.hide()
+            return
+        g = self.target.geometry()
+        dx, dy = self.offset
+        self.setGeometry(g.adjusted(-self.blur + dx, -self.blur + dy, self.blur + dx, self.blur + dy))
+        self.stackUnder(self.target)
+        self.show()
+
+    def eventFilter(self, obj, event):
+        if obj is self.target and event.type() in (
+            QEvent.Type.Move, QEvent.Type.Resize, QEvent.Type.Show,
+            QEvent.Type.Hide, QEvent.Type.ParentChange, QEvent.Type.ZOrderChange,
+        ):
+            self.sync()
+        return False
+
+    def paintEvent(self, event):
+        w, h, m = self.width(), self.height(), self.margin
+        if w < 2 * m or h < 2 * m:
+            return
+        t = self.tile.width() - 2 * m  # 1px stretchable middle
+        painter = QPainter(self)
+        tile = self.tile
+        # Corners
+        painter.drawPixmap(QRect(0, 0, m, m), tile, QRect(0, 0, m, m))
+        painter.drawPixmap(QRect(w - m, 0, m, m), tile, QRect(m + t, 0, m, m))
+        painter.drawPixmap(QRect(0, h - m, m, m), tile, QRect(0, m + t, m, m))
+        painter.drawPixmap(QRect(w - m, h - m, m, m), tile, QRect(m + t, m + t, m, m))
+        # Edges (the centre is transparent and covered by the target anyway)
+        painter.drawPixmap(QRect(m, 0, w - 2 * m, m), tile, QRect(m, 0, t, m))
+        painter.drawPixmap(QRect(m, h - m, w - 2 * m, m), tile, QRect(m, m + t, t, m))
+        painter.drawPixmap(QRect(0, m, m, h - 2 * m), tile, QRect(0, m, m, t))
+        painter.drawPixmap(QRect(w - m, m, m, h - 2 * m), tile, QRect(m + t, m, m, t))
+        painter.end()
+
+
+def apply_shadow(widget, blur=12, x_offset=0, y_offset=2, color=None, radius=8):
+    """Give ``widget`` a drop shadow using this terminal's shadow mode."""
+    color = color if color is not None else QColor(0, 0, 0, 30)
+    mode = shadow_mode()
+    if mode == "effect":
+        shadow = QGraphicsDropShadowEffect()
+        shadow.setBlurRadius(blur)
+        shadow.setXOffset(x_offset)
+        shadow.setYOffset(y_offset)
+        shadow.setColor(color)
+        widget.setGraphicsEffect(shadow)
+        return shadow
+    if mode == "cached":
+        widget._shadow = NineSliceShadow(widget, blur, x_offset, y_offset, color, radius)
+        return widget._shadow
+    return None
 
 
 class ModernCard(QFrame):
@@ -16,23 +178,11 @@ class ModernCard(QFrame):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QFrame {
-                background: white;
-                border-radius: 8px;
-                border: 1px solid #e0e0e0;
-            }
-        """)
         self.add_shadow()
     
     def add_shadow(self):
-        """Add drop shadow effect."""
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(15)
-        shadow.setXOffset(0)
-        shadow.setYOffset(2)
-        shadow.setColor(QColor(0, 0, 0, 30))
-        self.setGraphicsEffect(shadow)
+        """Add drop shadow (see apply_shadow for the rendering modes)."""
+        apply_shadow(self, blur=15, y_offset=2, color=QColor(0, 0, 0, 30))
 
 
 class MetricCard(QFrame):
@@ -40,36 +190,25 @@ class MetricCard(QFrame):
     
     def __init__(self, title="", value="0", color="#00b050", parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QFrame {
-                background: white;
-                border-radius: 8px;
-                border-left: 4px solid """ + color + """;
-            }
-        """)
+        set_accent(self, color, f"MetricCard {{ border-left: 4px solid {color}; }}")
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(16, 12, 16, 12)
         layout.setSpacing(6)
         
         title_label = QLabel(title)
-        title_label.setStyleSheet("color: #666666; font-size: 12px; font-weight: 600;")
+        title_label.setObjectName("card_title")
         layout.addWidget(title_label)
         
         value_label = QLabel(value)
-        value_label.setStyleSheet("color: #1a1a1a; font-size: 24px; font-weight: 700;")
+        value_label.setObjectName("card_value")
         layout.addWidget(value_label)
         
         self.add_shadow()
     
     def add_shadow(self):
-        """Add drop shadow effect."""
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(12)
-        shadow.setXOffset(0)
-        shadow.setYOffset(2)
-        shadow.setColor(QColor(0, 0, 0, 20))
-        self.setGraphicsEffect(shadow)
+        """Add drop shadow (see apply_shadow for the rendering modes)."""
+        apply_shadow(self, blur=12, y_offset=2, color=QColor(0, 0, 0, 20))
 
 
 class ActionButton(QPushButton):
@@ -77,22 +216,11 @@ class ActionButton(QPushButton):
     
     def __init__(self, text="", icon_name="", color="#00b050", parent=None):
         super().__init__(text, parent)
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {color};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-weight: 600;
-                font-size: 13px;
-            }}
-            QPushButton:hover {{
-                background-color: {self._shade_color(color, -10)};
-            }}
-            QPushButton:pressed {{
-                background-color: {self._shade_color(color, -20)};
-            }}
+        # Theme colors are styled by the app stylesheet; anything else inline.
+        set_accent(self, color, f"""
+            ActionButton {{ background-color: {color}; }}
+            ActionButton:hover {{ background-color: {shade(color, -10)}; }}
+            ActionButton:pressed {{ background-color: {shade(color, -20)}; }}
         """)
         
         if icon_name:
@@ -104,15 +232,7 @@ class ActionButton(QPushButton):
     @staticmethod
     def _shade_color(hex_color, percent):
         """Shade a hex color by percent."""
-        try:
-            hex_color = hex_color.lstrip('#')
-            rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-            r = max(0, min(255, int(rgb[0] * (1 + percent / 100))))
-            g = max(0, min(255, int(rgb[1] * (1 + percent / 100))))
-            b = max(0, min(255, int(rgb[2] * (1 + percent / 100))))
-            return f"#{r:02x}{g:02x}{b:02x}"
-        except:
-            return hex_color
+        return shade(hex_color, percent)
 
 
 class IconButton(QPushButton):
@@ -121,18 +241,6 @@ class IconButton(QPushButton):
     def __init__(self, icon_name="", tooltip="", size=24, parent=None):
         super().__init__(parent)
         self.setFixedSize(size, size)
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                border: 1px solid #cccccc;
-                border-radius: 4px;
-                padding: 2px;
-            }
-            QPushButton:hover {
-                background-color: #f0f0f0;
-                border: 1px solid #00b050;
-            }
-        """)
         
         if tooltip:
             self.setToolTip(tooltip)
@@ -149,35 +257,6 @@ class ModernTable(QTableWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QTableWidget {
-                background-color: white;
-                color: #1a1a1a;
-                alternate-background-color: #f5f5f5;
-                gridline-color: #e0e0e0;
-                selection-background-color: #00b050;
-            }
-            QTableWidget::item {
-                padding: 4px;
-                border: none;
-            }
-            QTableWidget::item:selected {
-                background-color: #00b050;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #000000;
-                color: white;
-                padding: 6px;
-                border: none;
-                font-weight: 600;
-                font-size: 12px;
-            }
-            QTableWidget::horizontalHeader {
-                border-top: 1px solid #e0e0e0;
-            }
-        """)
-        
         self.setAlternatingRowColors(True)
         self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
@@ -191,17 +270,6 @@ class SearchBar(QLineEdit):
     def __init__(self, placeholder="Search...", parent=None):
         super().__init__(parent)
         self.setPlaceholderText(placeholder)
-        self.setStyleSheet("""
-            QLineEdit {
-                padding: 8px 12px;
-                border: 1px solid #d0d0d0;
-                border-radius: 6px;
-                font-size: 13px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #00b050;
-            }
-        """)
         self.setMinimumHeight(36)
 
 
@@ -210,25 +278,6 @@ class FilterComboBox(QComboBox):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QComboBox {
-                padding: 6px 10px;
-                border: 1px solid #d0d0d0;
-                border-radius: 6px;
-                background-color: white;
-                font-size: 13px;
-            }
-            QComboBox:focus {
-                border: 2px solid #00b050;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-            }
-        """)
         self.setMinimumHeight(34)
 
 
@@ -239,27 +288,6 @@ class ModernDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle(title)
         self.setMinimumWidth(500)
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #f5f5f5;
-            }
-            QLineEdit, QComboBox, QSpinBox, QDoubleSpinBox {
-                padding: 8px 10px;
-                border: 1px solid #d0d0d0;
-                border-radius: 6px;
-                background-color: white;
-                font-size: 13px;
-                min-height: 28px;
-            }
-            QLineEdit:focus, QComboBox:focus, QSpinBox:focus, QDoubleSpinBox:focus {
-                border: 2px solid #00b050;
-            }
-            QLabel {
-                color: #333333;
-                font-size: 12px;
-                font-weight: 500;
-            }
-        """)
         
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(20, 20, 20, 20)
@@ -277,7 +305,7 @@ class ModernDialog(QDialog):
             
             if label_text:
                 label = QLabel(label_text)
-                label.setStyleSheet("font-weight: 600;")
+                label.setProperty("role", "field-label")
                 field_layout.addWidget(label)
             
             field_layout.addWidget(widget)
@@ -305,37 +333,11 @@ class StatusBadge(QLabel):
     def __init__(self, text="", status="info", parent=None):
         super().__init__(text, parent)
         self.set_status(status)
-        self.setStyleSheet("""
-            QLabel {
-                padding: 4px 10px;
-                border-radius: 4px;
-                font-size: 11px;
-                font-weight: 600;
-            }
-        """)
     
     def set_status(self, status):
         """Set status color."""
-        colors = {
-            "success": ("#00b050", "#e8f5e9"),
-            "warning": ("#ff9800", "#fff3e0"),
-            "error": ("#f44336", "#ffebee"),
-            "info": ("#2196f3", "#e3f2fd"),
-        }
-        
-        if status in colors:
-            fg, bg = colors[status]
-            self.setStyleSheet(f"""
-                QLabel {{
-                    color: {fg};
-                    background-color: {bg};
-                    border: 1px solid {fg};
-                    padding: 4px 10px;
-                    border-radius: 4px;
-                    font-size: 11px;
-                    font-weight: 600;
-                }}
-            """)
+        if status in ("success", "warning", "error", "info"):
+            set_state(self, "status", status)
 
 
 class SectionHeader(QLabel):
@@ -343,15 +345,6 @@ class SectionHeader(QLabel):
     
     def __init__(self, text="", parent=None):
         super().__init__(text, parent)
-        self.setStyleSheet("""
-            QLabel {
-                font-size: 16px;
-                font-weight: 700;
-                color: #00b050;
-                padding: 8px 0px;
-                border-bottom: 2px solid #00b050;
-            }
-        """)
         self.setMinimumHeight(32)
 
 
@@ -360,16 +353,7 @@ class QuickActionCard(QFrame):
     
     def __init__(self, title="", icon_name="", color="#00b050", parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QFrame {
-                background: white;
-                border-radius: 8px;
-                border: 1px solid #e0e0e0;
-            }
-            QFrame:hover {
-                border: 1px solid """ + color + """;
-            }
-        """)
+        set_accent(self, color, f"QuickActionCard:hover {{ border: 1px solid {color}; }}")
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(16, 16, 16, 16)
@@ -377,11 +361,9 @@ class QuickActionCard(QFrame):
         
         # Icon
         icon_label = QLabel()
+        icon_label.setObjectName("card_icon")
         icon_label.setFixedSize(40, 40)
-        icon_label.setStyleSheet(f"""
-            background-color: {color};
-            border-radius: 8px;
-        """)
+        set_accent(icon_label, color, f"background-color: {color}; border-radius: 8px;")
         if icon_name:
             icon = load_icon(icon_name)
             if icon:
@@ -391,7 +373,7 @@ class QuickActionCard(QFrame):
         
         # Title
         title_label = QLabel(title)
-        title_label.setStyleSheet("font-size: 14px; font-weight: 600; color: #1a1a1a;")
+        title_label.setObjectName("card_title")
         layout.addWidget(title_label)
         
         layout.addStretch()
@@ -399,13 +381,8 @@ class QuickActionCard(QFrame):
         self.add_shadow()
     
     def add_shadow(self):
-        """Add drop shadow effect."""
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(12)
-        shadow.setXOffset(0)
-        shadow.setYOffset(2)
-        shadow.setColor(QColor(0, 0, 0, 20))
-        self.setGraphicsEffect(shadow)
+        """Add drop shadow (see apply_shadow for the rendering modes)."""
+        apply_shadow(self, blur=12, y_offset=2, color=QColor(0, 0, 0, 20))
 
 
 class ProductCard(QFrame):
@@ -413,16 +390,6 @@ class ProductCard(QFrame):
     
     def __init__(self, product_name="", price="$0.00", image_pixmap=None, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QFrame {
-                background: white;
-                border-radius: 8px;
-                border: 1px solid #e0e0e0;
-            }
-            QFrame:hover {
-                border: 2px solid #00b050;
-            }
-        """)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(12, 12, 12, 12)
@@ -437,13 +404,13 @@ class ProductCard(QFrame):
         
         # Product name
         name_label = QLabel(product_name)
-        name_label.setStyleSheet("font-size: 13px; font-weight: 600; color: #1a1a1a;")
+        name_label.setObjectName("card_title")
         name_label.setWordWrap(True)
         layout.addWidget(name_label)
         
         # Price
         price_label = QLabel(price)
-        price_label.setStyleSheet("font-size: 14px; font-weight: 700; color: #00b050;")
+        price_label.setObjectName("card_price")
         layout.addWidget(price_label)
         
         layout.addStretch()
@@ -451,13 +418,8 @@ class ProductCard(QFrame):
         self.add_shadow()
     
     def add_shadow(self):
-        """Add drop shadow effect."""
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(12)
-        shadow.setXOffset(0)
-        shadow.setYOffset(2)
-        shadow.setColor(QColor(0, 0, 0, 20))
-        self.setGraphicsEffect(shadow)
+        """Add drop shadow (see apply_shadow for the rendering modes)."""
+        apply_shadow(self, blur=12, y_offset=2, color=QColor(0, 0, 0, 20))
 
 
 class LoadingSpinner(QFrame):
@@ -465,18 +427,12 @@ class LoadingSpinner(QFrame):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("background: transparent; border: none;")
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         
         self.label = QLabel("Loading...")
         self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.label.setStyleSheet("""
-            font-size: 13px;
-            color: #666666;
-            font-weight: 600;
-        """)
         layout.addWidget(self.label)
         
         self.animation = None
@@ -0,0 +1,66 @@
+"""QThread base for database work off the GUI thread."""
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from sqlalchemy.engine import Row
+
+from ..controllers.database import db_session, session_scope
+
+
+def ensure_plain(value, owner="work()"):
+    """Raise TypeError if ``value`` holds an ORM instance.
+
+    Task sessions are closed when the task ends, so any ORM object handed to
+    the GUI would be detached; workers return DTOs, row tuples or ids instead.
+    """
+    if hasattr(value, "_sa_instance_state"):
+        raise TypeError(f"{owner} returned a {type(value).__name__} instance; return DTOs, row tuples or ids")
+    if isinstance(value, dict):
+        for item in value.values():
+            ensure_plain(item, owner)
+    elif isinstance(value, (list, tuple, set, frozenset, Row)):
+        for item in value:
+            ensure_plain(item, owner)
+
+
+class DbWorker(QThread):
+    """Runs ``work(session)`` in a thread with a task session of its own.
+
+    Subclasses implement ``work`` and return plain data, which is emitted with
+    ``succeeded``; an exception is passed to ``handle_error``, which emits
+    ``failed`` by default. The session is committed after ``work`` returns.
+    """
+
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancel = False
+
+    def cancel(self):
+        self._cancel = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancel
+
+    def work(self, session):
+        raise NotImplementedError
+
+    def handle_error(self, error: Exception):
+        self.failed.emit(str(error))
+
+    def run(self):
+        try:
+            with session_scope() as session:
+                result = self.work(session)
+            ensure_plain(result, f"{type(self).__name__}.work()")
+        except Exception as e:
+            self.handle_error(e)
+        else:
+            self.succeeded.emit(result)
+        finally:
+            # db_session is thread-local: touching it here made a second,
+            # never-closed session instead of sharing the GUI's.
+            if db_session.registry.has():
+                print(f"Session leak: {type(self).__name__} used db_session; use the session passed to work()")
+                db_session.remove()